@@ -2,9 +2,135 @@
 智谱清言API客户端
 """
 import requests
+import httpx
+import asyncio
 import json
-from typing import Dict, List, Any, Optional
-from config import ZHIPU_API_KEY, ZHIPU_API_URL
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Any, AsyncIterator, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from starlette.concurrency import run_in_threadpool
+from config import (
+    ZHIPU_API_KEY, ZHIPU_API_URL, ZHIPU_MODEL, ZHIPU_RPM_LIMIT, ZHIPU_TPM_LIMIT,
+    ZHIPU_MAX_RETRIES, ZHIPU_RETRY_BASE_DELAY, ZHIPU_RETRY_MAX_DELAY,
+    ZHIPU_BREAKER_FAILURES, ZHIPU_BREAKER_RESET_TIMEOUT,
+    LLM_HEDGE_ENABLED, LLM_HEDGE_QUANTILE, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_MIN_DELAY
+)
+from llm_cache import get_llm_cache, build_cache_key
+from skills import extract_skills
+from rate_limiter import RequestRateLimiter
+from circuit_breaker import CircuitBreaker
+from latency import llm_latency, run_hedged
+from metrics import llm_request_duration, llm_requests, llm_in_flight, llm_parse_results
+from prompt_builder import (
+    estimate_message_tokens, compact_json, compact_resume, fit_resume_text, fit_job_description,
+    user_messages, token_usage
+)
+
+class ResumeParseError(Exception):
+    """大模型返回的简历解析结果不是有效的JSON"""
+
+# 需要重试的响应状态码：限流与服务端错误
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 进程内共享的异步HTTP连接池，所有AsyncZhipuClient实例复用同一组keep-alive连接
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """获取共享的异步HTTP客户端（懒加载）"""
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _async_http_client
+
+# 同步客户端共享的requests会话，复用keep-alive连接并由urllib3按Retry-After重试
+_http_session: Optional[requests.Session] = None
+
+def get_http_session() -> requests.Session:
+    """获取共享的同步HTTP会话（懒加载）"""
+    global _http_session
+    if _http_session is None:
+        retry = Retry(
+            total=ZHIPU_MAX_RETRIES,
+            backoff_factor=ZHIPU_RETRY_BASE_DELAY,
+            status_forcelist=sorted(RETRYABLE_STATUS_CODES),
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        _http_session = requests.Session()
+        _http_session.mount("https://", HTTPAdapter(pool_maxsize=20, max_retries=retry))
+    return _http_session
+
+# 进程内共享的请求限流器，所有并发分析共用同一个速率配额
+_request_limiter: Optional[RequestRateLimiter] = None
+
+def get_request_limiter() -> Optional[RequestRateLimiter]:
+    """获取共享的请求限流器（RPM+TPM），两项都为0时不限流"""
+    global _request_limiter
+    if ZHIPU_RPM_LIMIT <= 0 and ZHIPU_TPM_LIMIT <= 0:
+        return None
+    if _request_limiter is None:
+        _request_limiter = RequestRateLimiter(ZHIPU_RPM_LIMIT, ZHIPU_TPM_LIMIT)
+    return _request_limiter
+
+# 进程内共享的熔断器，智谱API持续不可用时快速失败
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取共享的熔断器"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker("智谱API", ZHIPU_BREAKER_FAILURES, ZHIPU_BREAKER_RESET_TIMEOUT)
+    return _circuit_breaker
+
+async def close_async_http_client():
+    """关闭共享的异步HTTP客户端，在应用关闭时调用"""
+    global _async_http_client
+    if _async_http_client is not None and not _async_http_client.is_closed:
+        await _async_http_client.aclose()
+    _async_http_client = None
+
+# 进程内共享的AI客户端
+_ai_client = None
+
+def get_ai_client():
+    """获取进程内共享的异步AI客户端，根据USE_MOCK_AI环境变量决定是否使用模拟客户端"""
+    global _ai_client
+    if _ai_client is None:
+        if os.getenv("USE_MOCK_AI", "true").lower() == "true":
+            from mock_ai_client import AsyncMockAIClient
+            _ai_client = AsyncMockAIClient(latency=float(os.getenv("MOCK_AI_LATENCY", "0")))
+        else:
+            _ai_client = AsyncZhipuClient()
+    return _ai_client
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """第attempt次重试前的等待时间：指数退避加全抖动，服务端给出Retry-After时不早于该时间"""
+    delay = random.uniform(0, min(ZHIPU_RETRY_MAX_DELAY, ZHIPU_RETRY_BASE_DELAY * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
 
 class ZhipuClient:
     """智谱清言API客户端"""
@@ -12,22 +138,27 @@ class ZhipuClient:
     def __init__(self):
         self.api_key = ZHIPU_API_KEY
         self.base_url = ZHIPU_API_URL
+        self.model = ZHIPU_MODEL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
     
-    def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
-        """调用智谱清言API"""
-        data = {
-            "model": "glm-4.5",
+    def _build_payload(self, messages: List[Dict[str, str]], temperature: float) -> Dict[str, Any]:
+        """构建请求体"""
+        return {
+            "model": self.model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": 4000
         }
+    
+    def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+        """调用智谱清言API"""
+        data = self._build_payload(messages, temperature)
         
         try:
-            response = requests.post(
+            response = get_http_session().post(
                 self.base_url,
                 headers=self.headers,
                 json=data,
@@ -41,13 +172,13 @@ class ZhipuClient:
         except Exception as e:
             raise Exception(f"API调用失败: {str(e)}")
     
-    def parse_resume(self, resume_content: str) -> Dict[str, Any]:
-        """解析简历内容"""
+    def _build_parse_resume_messages(self, resume_content: str) -> List[Dict[str, str]]:
+        """构建简历解析的提示词"""
         prompt = f"""
         请解析以下简历内容，提取关键信息并以JSON格式返回：
         
         简历内容：
-        {resume_content}
+        {fit_resume_text(resume_content)}
         
         请返回以下格式的JSON：
         {{
@@ -81,43 +212,40 @@ class ZhipuClient:
         
         请确保返回有效的JSON格式。
         """
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self._call_api(messages)
-        
+
+        return user_messages(prompt)
+
+    def _parse_resume_response(self, response: str, resume_content: str) -> Dict[str, Any]:
+        """解析简历解析接口的返回内容"""
         try:
             # 提取JSON部分
             json_start = response.find('{')
             json_end = response.rfind('}') + 1
             json_str = response[json_start:json_end]
             
-            return json.loads(json_str)
-        except:
-            # 如果解析失败，返回默认结构
-            return {
-                "name": "未知",
-                "contact_info": {},
-                "summary": resume_content[:200] + "...",
-                "skills": [],
-                "experience": [],
-                "education": [],
-                "projects": [],
-                "certifications": []
-            }
-    
-    def analyze_match(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
-        """分析简历与职位描述的匹配度"""
+            parsed = json.loads(json_str)
+            llm_parse_results.inc(operation="parse_resume", source="llm")
+            return parsed
+        except ValueError:
+            # 不返回默认结构：占位数据一旦被保存，之后的分析都会基于它，由调用方标记为解析失败
+            llm_parse_results.inc(operation="parse_resume", source="fallback")
+            raise ResumeParseError("大模型返回的简历解析结果不是有效的JSON")
+
+    def parse_resume(self, resume_content: str) -> Dict[str, Any]:
+        """解析简历内容"""
+        response = self._call_api(self._build_parse_resume_messages(resume_content))
+        return self._parse_resume_response(response, resume_content)
+
+    def _build_analyze_match_messages(self, resume_data: Dict[str, Any], job_description: str) -> List[Dict[str, str]]:
+        """构建匹配度分析的提示词"""
         prompt = f"""
         请分析以下候选人简历与职位描述的匹配度：
         
         候选人信息：
-        {json.dumps(resume_data, ensure_ascii=False, indent=2)}
+        {compact_resume(resume_data)}
         
         职位描述：
-        {job_description}
+        {fit_job_description(job_description)}
         
         请返回以下格式的JSON分析结果：
         {{
@@ -150,13 +278,11 @@ class ZhipuClient:
         
         请确保返回有效的JSON格式，match_score为0-100的数值。
         """
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self._call_api(messages)
-        
+
+        return user_messages(prompt)
+
+    def _parse_analyze_match_response(self, response: str, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """解析匹配度分析接口的返回内容"""
         try:
             json_start = response.find('{')
             json_end = response.rfind('}') + 1
@@ -192,20 +318,25 @@ class ZhipuClient:
                 "weaknesses": ["信息不足"],
                 "potential": "需要进一步了解"
             }
-    
-    def generate_interview_questions(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any]) -> List[str]:
-        """生成个性化面试问题"""
+
+    def analyze_match(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """分析简历与职位描述的匹配度"""
+        response = self._call_api(self._build_analyze_match_messages(resume_data, job_description))
+        return self._parse_analyze_match_response(response, resume_data)
+
+    def _build_interview_questions_messages(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建面试问题生成的提示词"""
         prompt = f"""
         基于以下信息，为候选人生成10个个性化的面试问题：
         
         候选人简历：
-        {json.dumps(resume_data, ensure_ascii=False, indent=2)}
+        {compact_resume(resume_data)}
         
         职位描述：
-        {job_description}
+        {fit_job_description(job_description)}
         
         匹配分析结果：
-        {json.dumps(analysis_result, ensure_ascii=False, indent=2)}
+        {compact_json(analysis_result)}
         
         请生成涵盖以下方面的问题：
         1. 技术能力验证
@@ -218,13 +349,11 @@ class ZhipuClient:
         请以JSON数组格式返回问题列表：
         ["问题1", "问题2", "问题3", ...]
         """
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self._call_api(messages)
-        
+
+        return user_messages(prompt)
+
+    def _parse_interview_questions_response(self, response: str) -> List[str]:
+        """解析面试问题接口的返回内容"""
         try:
             json_start = response.find('[')
             json_end = response.rfind(']') + 1
@@ -245,23 +374,28 @@ class ZhipuClient:
                 "您希望从这份工作中获得什么？",
                 "您还有什么问题要问我们？"
             ]
-    
-    def generate_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> str:
-        """生成完整的分析报告"""
+
+    def generate_interview_questions(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any]) -> List[str]:
+        """生成个性化面试问题"""
+        response = self._call_api(self._build_interview_questions_messages(resume_data, job_description, analysis_result))
+        return self._parse_interview_questions_response(response)
+
+    def _build_analysis_report_messages(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> List[Dict[str, str]]:
+        """构建分析报告的提示词"""
         prompt = f"""
         请基于以下信息生成一份详细的候选人分析报告：
         
         候选人信息：
-        {json.dumps(resume_data, ensure_ascii=False, indent=2)}
+        {compact_resume(resume_data)}
         
         职位描述：
-        {job_description}
+        {fit_job_description(job_description)}
         
         匹配分析：
-        {json.dumps(analysis_result, ensure_ascii=False, indent=2)}
+        {compact_json(analysis_result)}
         
         面试问题：
-        {json.dumps(interview_questions, ensure_ascii=False, indent=2)}
+        {compact_json(interview_questions)}
         
         请生成一份专业的Markdown格式分析报告，包含以下部分：
         
@@ -301,13 +435,13 @@ class ZhipuClient:
         
         请确保报告内容详实、客观，便于HR和面试官参考。
         """
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self._call_api(messages, temperature=0.8)
-        return response
+
+        return user_messages(prompt)
+
+    def generate_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> str:
+        """生成完整的分析报告"""
+        messages = self._build_analysis_report_messages(resume_data, job_description, analysis_result, interview_questions)
+        return self._call_api(messages, temperature=0.8)
     
     def generate_chart_data(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """生成图表数据"""
@@ -416,16 +550,16 @@ class ZhipuClient:
             "match_score": analysis_result.get("match_score", 0)
         }
     
-    def comprehensive_analysis(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
-        """综合分析：一次API调用完成所有分析任务"""
+    def _build_comprehensive_analysis_messages(self, resume_data: Dict[str, Any], job_description: str) -> List[Dict[str, str]]:
+        """构建综合分析的提示词"""
         prompt = f"""
         作为AI招聘专家，请对以下候选人进行全面的招聘分析。
 
         候选人简历：
-        {json.dumps(resume_data, ensure_ascii=False, indent=2)}
+        {compact_resume(resume_data)}
 
         职位描述：
-        {job_description}
+        {fit_job_description(job_description)}
 
         请提供以下分析结果，以JSON格式返回：
 
@@ -482,13 +616,11 @@ class ZhipuClient:
             "potential": "潜力评估文本"
         }}
         """
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self._call_api(messages, temperature=0.3)
-        
+
+        return user_messages(prompt)
+
+    def _parse_comprehensive_analysis_response(self, response: str, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """解析综合分析接口的返回内容"""
         try:
             # 尝试多种方式提取JSON
             json_str = None
@@ -563,6 +695,7 @@ class ZhipuClient:
             if isinstance(exp_analysis.get("industry_experience"), str):
                 result["experience_analysis"]["industry_experience"] = [exp_analysis["industry_experience"]]
             
+            llm_parse_results.inc(operation="comprehensive_analysis", source="llm")
             return result
             
         except Exception as e:
@@ -570,8 +703,15 @@ class ZhipuClient:
             print(f"原始响应: {response[:500]}...")  # 打印前500个字符用于调试
             
             # 返回一个完整的默认结构，确保所有字段都有值
+            llm_parse_results.inc(operation="comprehensive_analysis", source="fallback")
             return self._create_default_analysis_result(resume_data, job_description)
-    
+
+    def comprehensive_analysis(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """综合分析：一次API调用完成所有分析任务"""
+        messages = self._build_comprehensive_analysis_messages(resume_data, job_description)
+        response = self._call_api(messages, temperature=0.3)
+        return self._parse_comprehensive_analysis_response(response, resume_data, job_description)
+
     def _create_default_analysis_result(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
         """创建默认的分析结果结构"""
         # 尝试从响应中提取一些基本信息
@@ -673,149 +813,215 @@ class ZhipuClient:
     
     def _extract_skills_from_jd(self, job_description: str) -> List[str]:
         """从职位描述中提取技能关键词 - 覆盖多个岗位和行业"""
-        # 扩展的技能关键词库，按类别组织
-        skill_keywords = {
-            # 编程语言
-            "programming_languages": [
-                "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Swift", "Kotlin",
-                "PHP", "Ruby", "Scala", "R", "MATLAB", "Perl", "Lua", "Haskell", "Clojure", "Erlang",
-                "Shell", "Bash", "PowerShell", "Assembly", "COBOL", "Fortran", "Ada", "Pascal"
-            ],
-            
-            # Web开发框架
-            "web_frameworks": [
-                "React", "Vue", "Angular", "Svelte", "Next.js", "Nuxt.js", "SvelteKit",
-                "Django", "Flask", "FastAPI", "Spring Boot", "Spring MVC", "Spring Security",
-                "Express.js", "Koa.js", "Nest.js", "Laravel", "Symfony", "CodeIgniter",
-                "Ruby on Rails", "Sinatra", "ASP.NET", "ASP.NET Core", "Blazor", "WebAPI",
-                "Gin", "Fiber", "Echo", "Gorilla", "Buffalo"
-            ],
-            
-            # 数据库技术
-            "databases": [
-                "MySQL", "PostgreSQL", "Oracle", "SQL Server", "SQLite", "MariaDB",
-                "MongoDB", "Redis", "Cassandra", "CouchDB", "Neo4j", "Elasticsearch",
-                "InfluxDB", "TimescaleDB", "ClickHouse", "BigQuery", "Snowflake",
-                "DynamoDB", "Firebase", "Supabase", "PlanetScale", "CockroachDB"
-            ],
-            
-            # 云服务和DevOps
-            "cloud_devops": [
-                "AWS", "Azure", "GCP", "阿里云", "腾讯云", "华为云", "百度云",
-                "Docker", "Kubernetes", "Jenkins", "GitLab CI", "GitHub Actions",
-                "Terraform", "Ansible", "Chef", "Puppet", "SaltStack",
-                "Prometheus", "Grafana", "ELK Stack", "Splunk", "Datadog",
-                "Istio", "Linkerd", "Helm", "ArgoCD", "Tekton"
-            ],
-            
-            # 移动开发
-            "mobile_development": [
-                "React Native", "Flutter", "Xamarin", "Ionic", "Cordova", "PhoneGap",
-                "Android Studio", "Xcode", "Unity", "Unreal Engine", "Godot",
-                "iOS开发", "Android开发", "跨平台开发", "原生开发", "混合开发"
-            ],
-            
-            # AI和机器学习
-            "ai_ml": [
-                "机器学习", "深度学习", "人工智能", "神经网络", "计算机视觉", "自然语言处理",
-                "TensorFlow", "PyTorch", "Keras", "Scikit-learn", "OpenCV", "NLTK",
-                "Pandas", "NumPy", "Matplotlib", "Seaborn", "Plotly", "Jupyter",
-                "Hugging Face", "Transformers", "BERT", "GPT", "LLM", "大语言模型",
-                "数据分析", "数据挖掘", "数据可视化", "统计学习", "强化学习"
-            ],
-            
-            # 大数据技术
-            "big_data": [
-                "Hadoop", "Spark", "Kafka", "Storm", "Flink", "Hive", "Pig", "HBase",
-                "大数据", "数据仓库", "ETL", "数据湖", "实时计算", "批处理",
-                "Apache Airflow", "Apache Beam", "Apache NiFi", "DataX", "MaxCompute"
-            ],
-            
-            # 测试和质量保证
-            "testing_qa": [
-                "单元测试", "集成测试", "端到端测试", "性能测试", "安全测试", "自动化测试",
-                "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright", "TestCafe",
-                "JUnit", "TestNG", "Mockito", "PowerMock", "Jest", "Enzyme", "Testing Library"
-            ],
-            
-            # 安全技术
-            "security": [
-                "网络安全", "信息安全", "数据安全", "应用安全", "云安全", "安全审计",
-                "渗透测试", "漏洞扫描", "安全编码", "加密算法", "身份认证", "权限管理",
-                "OWASP", "NIST", "ISO27001", "SOC2", "PCI DSS", "GDPR", "数据保护"
-            ],
-            
-            # 产品和管理
-            "product_management": [
-                "产品经理", "项目管理", "敏捷开发", "Scrum", "Kanban", "看板管理",
-                "用户研究", "用户体验", "产品设计", "需求分析", "原型设计",
-                "Jira", "Confluence", "Trello", "Asana", "Notion", "Figma", "Sketch"
-            ],
-            
-            # 软技能
-            "soft_skills": [
-                "沟通能力", "团队协作", "领导力", "学习能力", "解决问题", "创新思维",
-                "项目管理", "时间管理", "压力管理", "客户服务", "演讲能力", "写作能力",
-                "英语", "日语", "韩语", "法语", "德语", "西班牙语", "多语言"
-            ],
-            
-            # 行业特定技能
-            "industry_specific": [
-                # 金融科技
-                "金融科技", "区块链", "数字货币", "支付系统", "风控", "反欺诈",
-                "量化交易", "算法交易", "高频交易", "金融建模", "风险管理",
-                
-                # 电商
-                "电商", "零售", "供应链", "库存管理", "订单处理", "支付网关",
-                "推荐系统", "搜索引擎", "商品管理", "营销自动化",
-                
-                # 游戏开发
-                "游戏开发", "游戏引擎", "游戏设计", "3D建模", "动画制作", "音效设计",
-                "游戏策划", "关卡设计", "用户界面设计", "游戏测试",
-                
-                # 医疗健康
-                "医疗信息化", "健康管理", "医疗数据", "远程医疗", "医疗设备", "药物研发",
-                "临床试验", "医疗影像", "电子病历", "健康监测",
-                
-                # 教育科技
-                "在线教育", "教育技术", "学习管理系统", "课程设计", "学习分析", "智能辅导",
-                "虚拟现实", "增强现实", "混合现实", "沉浸式学习",
-                
-                # 汽车科技
-                "自动驾驶", "车联网", "智能汽车", "新能源汽车", "汽车电子", "车载系统",
-                "ADAS", "V2X", "汽车软件", "车载娱乐系统",
-                
-                # 物联网
-                "物联网", "IoT", "传感器", "嵌入式开发", "边缘计算", "智能硬件",
-                "工业4.0", "智能制造", "智慧城市", "智能家居"
-            ],
-            
-            # 设计技能
-            "design_skills": [
-                "UI设计", "UX设计", "平面设计", "视觉设计", "交互设计", "产品设计",
-                "Adobe Photoshop", "Adobe Illustrator", "Adobe XD", "Figma", "Sketch",
-                "InVision", "Principle", "Framer", "Protopie", "Origami Studio",
-                "用户研究", "可用性测试", "信息架构", "设计系统", "品牌设计"
-            ],
-            
-            # 营销和运营
-            "marketing_operations": [
-                "数字营销", "社交媒体营销", "内容营销", "搜索引擎优化", "搜索引擎营销",
-                "Google Analytics", "Facebook Ads", "Google Ads", "微信营销", "抖音营销",
-                "用户增长", "用户运营", "社群运营", "活动策划", "品牌推广",
-                "数据分析", "A/B测试", "转化率优化", "用户画像", "精准营销"
-            ]
-        }
-        
-        found_skills = []
-        jd_lower = job_description.lower()
-        
-        # 遍历所有技能类别
-        for category, skills in skill_keywords.items():
-            for skill in skills:
-                if skill.lower() in jd_lower:
-                    found_skills.append(skill)
-        
-        # 去重并限制数量
-        unique_skills = list(dict.fromkeys(found_skills))  # 保持顺序的去重
-        return unique_skills[:15]  # 增加到15个技能
+        return extract_skills(job_description)[:15]  # 增加到15个技能
+
+
+def _contains_json_object(response: str) -> bool:
+    """判断返回内容中是否包含可解析的JSON对象"""
+    json_start = response.find('{')
+    json_end = response.rfind('}') + 1
+    if json_start == -1 or json_end <= json_start:
+        return False
+    try:
+        json.loads(response[json_start:json_end])
+        return True
+    except ValueError:
+        return False
+
+class AsyncZhipuClient(ZhipuClient):
+    """智谱清言API异步客户端
+
+    复用ZhipuClient的提示词构建和结果解析逻辑，通过共享的httpx连接池发起请求，
+    等待大模型返回期间不会阻塞事件循环。
+    """
+
+    async def _send(self, data: Dict[str, Any], estimated_tokens: int, stream: bool = False) -> httpx.Response:
+        """发送请求：熔断检查、限流，429/5xx与网络错误按退避重试
+
+        返回状态码不需要重试的响应，stream为True时调用方负责关闭响应。
+        """
+        breaker = get_circuit_breaker()
+        breaker.before_request()
+        limiter = get_request_limiter()
+        client = get_async_http_client()
+
+        for attempt in range(ZHIPU_MAX_RETRIES + 1):
+            if limiter is not None:
+                await limiter.acquire(estimated_tokens)
+
+            retry_after = None
+            try:
+                request = client.build_request("POST", self.base_url, headers=self.headers, json=data)
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # 4xx说明服务可用，只是请求本身有问题，不计入熔断
+                    breaker.record_success()
+                    return response
+                error = f"HTTP {response.status_code}"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                await response.aclose()
+
+            # 失败的请求没有消耗token，退还预估的token配额
+            if limiter is not None:
+                limiter.settle(estimated_tokens, 0)
+
+            # Retry-After超过单次最长等待时不再重试，直接失败
+            if attempt == ZHIPU_MAX_RETRIES or (retry_after or 0) > ZHIPU_RETRY_MAX_DELAY:
+                break
+            delay = backoff_delay(attempt, retry_after)
+            print(f"⚠️ 智谱API请求失败（{error}），{delay:.1f}秒后第{attempt + 1}次重试")
+            await asyncio.sleep(delay)
+
+        breaker.record_failure()
+        raise Exception(f"{error}（已重试{attempt}次）")
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        """对冲延迟：同类调用最近耗时的p95，样本不足或未开启对冲时返回None"""
+        if not LLM_HEDGE_ENABLED or llm_latency.sample_count(kind) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(LLM_HEDGE_MIN_DELAY, llm_latency.percentile(kind, LLM_HEDGE_QUANTILE))
+
+    async def _call_api(self, messages: List[Dict[str, str]], temperature: float = 0.7, kind: str = "default") -> str:
+        """异步调用智谱清言API，kind为调用类型，用于统计耗时和推导对冲延迟"""
+        delay = self._hedge_delay(kind)
+        if delay is None:
+            return await self._call_api_once(messages, temperature, kind)
+        return await run_hedged(lambda: self._call_api_once(messages, temperature, kind), delay)
+
+    async def _call_api_once(self, messages: List[Dict[str, str]], temperature: float, kind: str) -> str:
+        """发起一次API调用并记录耗时"""
+        data = self._build_payload(messages, temperature)
+        estimated_tokens = estimate_message_tokens(messages)
+        started = time.monotonic()
+        outcome = "error"
+        llm_in_flight.inc(kind=kind)
+
+        try:
+            response = await self._send(data, estimated_tokens)
+            response.raise_for_status()
+
+            result = response.json()
+            usage = result.get("usage") or {}
+            token_usage.record(kind, estimated_tokens, usage)
+            limiter = get_request_limiter()
+            if limiter is not None:
+                limiter.settle(estimated_tokens, usage.get("total_tokens"))
+            content = result["choices"][0]["message"]["content"]
+            llm_latency.observe(kind, time.monotonic() - started)
+            outcome = "success"
+            return content
+
+        except asyncio.CancelledError:
+            # 被对冲请求或截止时间取消时，已等待的时间是实际耗时的下限，同样计入样本，
+            # 避免样本只剩较快的请求导致p95越算越小
+            llm_latency.observe(kind, time.monotonic() - started)
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            raise Exception(f"API调用失败: {str(e)}")
+        finally:
+            llm_in_flight.dec(kind=kind)
+            llm_requests.inc(kind=kind, outcome=outcome)
+            llm_request_duration.observe(time.monotonic() - started, kind=kind)
+
+    async def _call_api_cached(self, messages: List[Dict[str, str]], temperature: float = 0.7, kind: str = "default") -> str:
+        """带结果缓存的API调用，键为请求体（提示词、模型、温度）的哈希"""
+        cache = get_llm_cache()
+        if cache is None:
+            return await self._call_api(messages, temperature, kind)
+
+        # SQLite读写在线程池中执行，避免阻塞事件循环
+        key = build_cache_key(self._build_payload(messages, temperature))
+        cached = await run_in_threadpool(cache.get, key)
+        if cached is not None:
+            return cached
+
+        response = await self._call_api(messages, temperature, kind)
+        # 只缓存能解析出JSON的返回，避免把异常输出固化下来
+        if _contains_json_object(response):
+            await run_in_threadpool(cache.set, key, response)
+        return response
+
+    async def parse_resume(self, resume_content: str) -> Dict[str, Any]:
+        """解析简历内容"""
+        response = await self._call_api_cached(self._build_parse_resume_messages(resume_content), kind="parse")
+        return self._parse_resume_response(response, resume_content)
+
+    async def analyze_match(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """分析简历与职位描述的匹配度"""
+        response = await self._call_api(self._build_analyze_match_messages(resume_data, job_description), kind="match")
+        return self._parse_analyze_match_response(response, resume_data)
+
+    async def generate_interview_questions(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any]) -> List[str]:
+        """生成个性化面试问题"""
+        response = await self._call_api(self._build_interview_questions_messages(resume_data, job_description, analysis_result), kind="questions")
+        return self._parse_interview_questions_response(response)
+
+    async def generate_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> str:
+        """生成完整的分析报告"""
+        messages = self._build_analysis_report_messages(resume_data, job_description, analysis_result, interview_questions)
+        return await self._call_api(messages, temperature=0.8, kind="report")
+
+    async def _stream_api(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> AsyncIterator[str]:
+        """以流式方式调用智谱清言API，逐段返回生成的内容
+
+        只在收到响应前重试，开始输出后中断不重试，避免重复输出内容。
+        """
+        data = self._build_payload(messages, temperature)
+        data["stream"] = True
+        estimated_tokens = estimate_message_tokens(messages)
+        started = time.monotonic()
+        outcome = "error"
+        llm_in_flight.inc(kind="report_stream")
+
+        try:
+            response = await self._send(data, estimated_tokens, stream=True)
+            try:
+                response.raise_for_status()
+                usage = None
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = line[len("data:"):].strip()
+                    if chunk == "[DONE]":
+                        break
+                    payload = json.loads(chunk)
+                    usage = payload.get("usage") or usage
+                    choices = payload.get("choices") or []
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        yield content
+            finally:
+                await response.aclose()
+
+            token_usage.record("report_stream", estimated_tokens, usage)
+            limiter = get_request_limiter()
+            if limiter is not None:
+                limiter.settle(estimated_tokens, (usage or {}).get("total_tokens"))
+            outcome = "success"
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # 客户端断开或截止时间取消时生成器被关闭
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            raise Exception(f"API调用失败: {str(e)}")
+        finally:
+            llm_in_flight.dec(kind="report_stream")
+            llm_requests.inc(kind="report_stream", outcome=outcome)
+            llm_request_duration.observe(time.monotonic() - started, kind="report_stream")
+
+    async def stream_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> AsyncIterator[str]:
+        """流式生成完整的分析报告"""
+        messages = self._build_analysis_report_messages(resume_data, job_description, analysis_result, interview_questions)
+        async for chunk in self._stream_api(messages, temperature=0.8):
+            yield chunk
+
+    async def comprehensive_analysis(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """综合分析：一次API调用完成所有分析任务"""
+        messages = self._build_comprehensive_analysis_messages(resume_data, job_description)
+        response = await self._call_api_cached(messages, temperature=0.3, kind="analyze")
+        return self._parse_comprehensive_analysis_response(response, resume_data, job_description)
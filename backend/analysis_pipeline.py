@@ -0,0 +1,150 @@
+"""
+简历分析流程
+
+单次分析（/api/process）和批量筛选共用的分析步骤：读取结构化简历、综合分析、
+生成图表数据和报告，并将职位描述与分析结果写入数据库。
+
+每个阶段都有截止时间（阶段上限与整个任务剩余预算中的较小值），超时直接失败而不是返回默认结果；
+各阶段耗时记录到stage_latency，并写入调用方传入的timings。
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from models import Candidate, JobDescription, AnalysisResult, CandidateProfile
+from resume_pipeline import parse_candidate_resume
+from latency import stage_latency
+from metrics import observe_stage, track_stage
+from config import ANALYSIS_DEADLINE, ANALYSIS_STAGE_DEADLINES
+
+class StageDeadlineExceeded(Exception):
+    """分析阶段超过截止时间"""
+
+def stage_timeout(stage: str, deadline: float) -> float:
+    """阶段可用时间：阶段上限与整个任务剩余预算中的较小值"""
+    return max(0.0, min(ANALYSIS_STAGE_DEADLINES.get(stage, ANALYSIS_DEADLINE), deadline - time.monotonic()))
+
+async def run_stage(stage: str, awaitable: Awaitable[Any], deadline: float,
+                    timings: Optional[Dict[str, float]] = None) -> Any:
+    """在截止时间内执行一个阶段，超时取消进行中的API调用（包括对冲请求）并抛出StageDeadlineExceeded"""
+    timeout = stage_timeout(stage, deadline)
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(awaitable, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise StageDeadlineExceeded(f"{stage}阶段超时（超过{timeout:.3g}秒）")
+    finally:
+        elapsed = round(time.monotonic() - started, 3)
+        if timings is not None:
+            timings[stage] = elapsed
+    stage_latency.observe(stage, elapsed)
+    return result
+
+async def stream_stage(stage: str, chunks: AsyncIterator[str], deadline: float) -> AsyncIterator[str]:
+    """流式阶段：整个输出过程共用一个截止时间，超时关闭上游流并抛出StageDeadlineExceeded"""
+    timeout = stage_timeout(stage, deadline)
+    started = time.monotonic()
+    stage_deadline = started + timeout
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, stage_deadline - time.monotonic()))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise StageDeadlineExceeded(f"{stage}阶段超时（超过{timeout:.3g}秒）")
+            yield chunk
+    finally:
+        await chunks.aclose()
+    stage_latency.observe(stage, round(time.monotonic() - started, 3))
+
+async def load_resume_data(db: Session, candidate: Candidate, ai_client) -> Dict[str, Any]:
+    """读取上传阶段持久化的结构化简历；历史数据或后台解析未完成时补做一次解析并保存"""
+    if candidate.parsed_resume:
+        return candidate.parsed_resume
+    return await parse_candidate_resume(db, candidate, ai_client)
+
+async def run_analysis(
+    db: Session,
+    candidate: Candidate,
+    job_description: str,
+    ai_client,
+    generate_report: bool = True,
+    on_stage: Optional[Callable[[str], None]] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> AnalysisResult:
+    """对单个候选人执行完整分析并保存结果
+
+    on_stage在进入每个阶段（parse/analyze/chart/report）时被调用，用于上报任务进度；
+    timings不为None时写入各阶段耗时（秒）。
+    """
+    deadline = time.monotonic() + ANALYSIS_DEADLINE
+    if timings is None:
+        timings = {}
+
+    def enter_stage(stage: str):
+        if on_stage is not None:
+            on_stage(stage)
+
+    async def run_job_stage(stage: str, awaitable: Awaitable[Any]) -> Any:
+        enter_stage(stage)
+        return await run_stage(stage, awaitable, deadline, timings)
+
+    # 第一步：读取结构化简历（上传后已在后台解析）
+    resume_data = await run_job_stage("parse", load_resume_data(db, candidate, ai_client))
+
+    # 第二步：综合分析（一次API调用完成所有分析）
+    analysis_result = await run_job_stage("analyze", observe_stage(
+        "comprehensive_analysis", ai_client.comprehensive_analysis(resume_data, job_description)
+    ))
+
+    # 第三步：生成图表数据和报告（不包含面试问题）
+    # 图表数据在本地计算，报告生成走异步API调用，等待期间不阻塞事件循环
+    enter_stage("chart")
+    with track_stage("generate_chart_data"):
+        chart_data = ai_client.generate_chart_data(analysis_result)
+    analysis_report = ""
+    if generate_report:
+        analysis_report = await run_job_stage("report", observe_stage(
+            "generate_analysis_report",
+            ai_client.generate_analysis_report(resume_data, job_description, analysis_result, [])
+        ))
+
+    # 创建候选人画像
+    candidate_profile = CandidateProfile(
+        name=resume_data.get("name", "未知"),
+        contact_info=resume_data.get("contact_info", {}),
+        summary=resume_data.get("summary", ""),
+        strengths=analysis_result.get("strengths", []),
+        weaknesses=analysis_result.get("weaknesses", []),
+        potential=analysis_result.get("potential", "")
+    )
+
+    # 职位描述与分析结果在同一事务中保存，分析失败时不会留下孤立的职位描述
+    # （on_stage会提交会话，所以不能提前add）
+    job_desc = JobDescription(
+        candidate_id=candidate.id,
+        job_description=job_description
+    )
+    db.add(job_desc)
+    db.flush()
+
+    # 保存分析结果
+    db_analysis = AnalysisResult(
+        candidate_id=candidate.id,
+        job_description_id=job_desc.id,
+        match_score=analysis_result.get("match_score", 0),
+        skills_analysis=analysis_result.get("skills_analysis", {}),
+        experience_analysis=analysis_result.get("experience_analysis", {}),
+        education_analysis=analysis_result.get("education_analysis", {}),
+        interview_questions=[],  # 初始为空
+        questions_generated=False,  # 标记为未生成
+        candidate_profile=candidate_profile.dict(),
+        analysis_report=analysis_report,
+        chart_data=chart_data
+    )
+    db.add(db_analysis)
+    db.commit()
+    db.refresh(db_analysis)
+
+    return db_analysis
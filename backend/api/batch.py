@@ -0,0 +1,327 @@
+"""
+批量筛选API
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from database import get_db, SessionLocal
+from models import (
+    Candidate,
+    AnalysisResult,
+    ScreeningJob,
+    ScreeningJobItem,
+    BatchScreeningRequest
+)
+from ai_client import get_ai_client
+from analysis_pipeline import run_analysis
+from resume_pipeline import PARSE_FAILED_PREFIX
+from config import BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY
+from prescreen import prescreen_scores, select_candidates
+from starlette.concurrency import run_in_threadpool
+from typing import Dict
+import asyncio
+
+router = APIRouter(prefix="/api", tags=["batch"])
+
+# 正在运行的批量任务，持有引用避免任务被垃圾回收
+_running_jobs: Dict[int, asyncio.Task] = {}
+
+def start_screening_job(job_id: int):
+    """在事件循环中启动批量筛选任务"""
+    if job_id in _running_jobs:
+        return
+    task = asyncio.create_task(run_screening_job(job_id))
+    _running_jobs[job_id] = task
+    task.add_done_callback(lambda t: _running_jobs.pop(job_id, None))
+
+def resume_unfinished_screening_jobs():
+    """应用启动时继续执行未完成的批量任务"""
+    db = SessionLocal()
+    try:
+        job_ids = [job_id for (job_id,) in db.query(ScreeningJob.id).filter(
+            ScreeningJob.status.in_(["pending", "running"])
+        ).all()]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        print(f"🔁 恢复批量筛选任务: job_id={job_id}")
+        start_screening_job(job_id)
+
+async def run_screening_job(job_id: int):
+    """按配置的并发数执行批量筛选，每完成一个候选人立即保存结果
+
+    单个候选人的意外异常记为该明细失败，不影响其他候选人；任务本身出错时标记为failed。
+    服务关闭导致的取消不改变状态，启动时由resume_unfinished_screening_jobs继续执行。
+    """
+    status = "failed"
+    try:
+        db = SessionLocal()
+        try:
+            job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+            if not job:
+                return
+            job.status = "running"
+            db.commit()
+
+            job_description = job.job_description
+            generate_report = job.generate_report
+            concurrency = job.concurrency
+            # 服务重启时处于running状态的明细也需要重新执行
+            item_ids = [item_id for (item_id,) in db.query(ScreeningJobItem.id).filter(
+                ScreeningJobItem.job_id == job_id,
+                ScreeningJobItem.status.in_(["pending", "running"])
+            ).all()]
+        finally:
+            db.close()
+
+        print(f"🚀 批量筛选开始: job_id={job_id}, 待处理={len(item_ids)}, 并发={concurrency}")
+        ai_client = get_ai_client()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def worker(item_id: int):
+            async with semaphore:
+                await _screen_item(job_id, item_id, job_description, ai_client, generate_report)
+
+        results = await asyncio.gather(*(worker(item_id) for item_id in item_ids), return_exceptions=True)
+        for item_id, result in zip(item_ids, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                print(f"批量筛选明细异常: job_id={job_id}, item_id={item_id}, {result}")
+                _mark_item_failed(job_id, item_id, result)
+        status = "completed"
+    except asyncio.CancelledError:
+        status = None
+        raise
+    except Exception as e:
+        print(f"批量筛选任务失败: job_id={job_id}, {e}")
+    finally:
+        if status is not None:
+            _finish_screening_job(job_id, status)
+
+def _mark_item_failed(job_id: int, item_id: int, error: BaseException):
+    """记录_screen_item未能自行处理的异常（如数据库错误）"""
+    db = SessionLocal()
+    try:
+        updated = db.query(ScreeningJobItem).filter(
+            ScreeningJobItem.id == item_id,
+            ScreeningJobItem.status.in_(["pending", "running"])
+        ).update({ScreeningJobItem.status: "failed", ScreeningJobItem.error: str(error)}, synchronize_session=False)
+        if updated:
+            db.query(ScreeningJob).filter(ScreeningJob.id == job_id).update(
+                {ScreeningJob.failed_count: ScreeningJob.failed_count + 1}, synchronize_session=False
+            )
+        db.commit()
+    finally:
+        db.close()
+
+def _finish_screening_job(job_id: int, status: str):
+    """写入任务的最终状态"""
+    db = SessionLocal()
+    try:
+        job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+        if not job:
+            return
+        job.status = status
+        job.finished_at = func.now()
+        db.commit()
+        if status == "completed":
+            print(f"🎉 批量筛选完成: job_id={job_id}, 成功={job.completed_count}, 失败={job.failed_count}")
+    except Exception as e:
+        db.rollback()
+        print(f"批量筛选任务状态保存失败: job_id={job_id}, {e}")
+    finally:
+        db.close()
+
+async def _screen_item(job_id: int, item_id: int, job_description: str, ai_client, generate_report: bool):
+    """筛选单个候选人"""
+    db = SessionLocal()
+    try:
+        item = db.query(ScreeningJobItem).filter(ScreeningJobItem.id == item_id).first()
+        item.status = "running"
+        db.commit()
+
+        try:
+            candidate = db.query(Candidate).filter(Candidate.id == item.candidate_id).first()
+            if not candidate or not candidate.resume_content:
+                raise ValueError("候选人不存在或简历内容为空")
+
+            analysis = await run_analysis(
+                db, candidate, job_description, ai_client, generate_report=generate_report
+            )
+
+            item.status = "completed"
+            item.analysis_id = analysis.id
+            item.match_score = analysis.match_score
+            counter = ScreeningJob.completed_count
+        except Exception as e:
+            db.rollback()
+            item.status = "failed"
+            item.error = str(e)
+            counter = ScreeningJob.failed_count
+
+        db.query(ScreeningJob).filter(ScreeningJob.id == job_id).update(
+            {counter: counter + 1}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def _job_progress(job: ScreeningJob) -> dict:
+    """构建任务进度信息"""
+    finished = (job.completed_count or 0) + (job.failed_count or 0) + (job.skipped_count or 0)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "concurrency": job.concurrency,
+        "total_count": job.total_count,
+        "completed_count": job.completed_count,
+        "failed_count": job.failed_count,
+        "skipped_count": job.skipped_count or 0,
+        "pending_count": job.total_count - finished,
+        "progress": round(finished / job.total_count * 100, 1) if job.total_count else 100.0,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
+    }
+
+@router.post("/batch/screening")
+async def create_screening_job(request: BatchScreeningRequest, db: Session = Depends(get_db)):
+    """创建批量筛选任务：将一个职位描述与多个候选人进行匹配并排序"""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="职位描述不能为空")
+
+    if request.candidate_ids:
+        candidate_ids = [candidate_id for (candidate_id,) in db.query(Candidate.id).filter(
+            Candidate.id.in_(set(request.candidate_ids))
+        ).all()]
+    elif request.all_unscreened:
+        # 尚未有任何分析结果的候选人，跳过重复简历（与原始简历结果相同）和文本提取/解析失败的简历
+        candidate_ids = [candidate_id for (candidate_id,) in db.query(Candidate.id).filter(
+            ~exists().where(AnalysisResult.candidate_id == Candidate.id),
+            Candidate.duplicate_of.is_(None),
+            or_(Candidate.parse_status.is_(None), Candidate.parse_status != "failed"),
+            Candidate.resume_content.isnot(None),
+            Candidate.resume_content != "",
+            ~Candidate.resume_content.startswith(PARSE_FAILED_PREFIX)
+        ).all()]
+    else:
+        raise HTTPException(status_code=400, detail="请提供candidate_ids或设置all_unscreened")
+
+    if not candidate_ids:
+        raise HTTPException(status_code=400, detail="没有需要筛选的候选人")
+
+    if request.prescreen_top_k is not None and request.prescreen_top_k < 1:
+        raise HTTPException(status_code=400, detail="prescreen_top_k必须大于0")
+    if request.prescreen_min_score is not None and not 0 <= request.prescreen_min_score <= 100:
+        raise HTTPException(status_code=400, detail="prescreen_min_score必须在0-100之间")
+
+    concurrency = request.concurrency or BATCH_DEFAULT_CONCURRENCY
+    concurrency = min(max(1, concurrency), BATCH_MAX_CONCURRENCY)
+
+    candidate_ids = sorted(candidate_ids)
+    prescreen = {}
+    if request.prescreen_top_k is not None or request.prescreen_min_score is not None:
+        # 本地预筛选：一次性为所有候选人打分，只有入选者进入大模型分析
+        texts = dict(db.query(Candidate.id, Candidate.resume_content).filter(
+            Candidate.id.in_(candidate_ids)
+        ).all())
+        scores = await run_in_threadpool(
+            prescreen_scores, request.job_description, [texts.get(candidate_id) for candidate_id in candidate_ids]
+        )
+        keep = select_candidates(scores, request.prescreen_top_k, request.prescreen_min_score)
+        prescreen = {
+            candidate_id: (round(float(score), 1), bool(selected))
+            for candidate_id, score, selected in zip(candidate_ids, scores, keep)
+        }
+
+    skipped_count = sum(1 for _, selected in prescreen.values() if not selected)
+    job = ScreeningJob(
+        job_description=request.job_description,
+        status="pending",
+        concurrency=concurrency,
+        generate_report=request.generate_report,
+        total_count=len(candidate_ids),
+        completed_count=0,
+        failed_count=0,
+        skipped_count=skipped_count,
+        prescreen_top_k=request.prescreen_top_k,
+        prescreen_min_score=request.prescreen_min_score
+    )
+    db.add(job)
+    db.flush()
+    items = []
+    for candidate_id in candidate_ids:
+        score, selected = prescreen.get(candidate_id, (None, True))
+        items.append(ScreeningJobItem(
+            job_id=job.id,
+            candidate_id=candidate_id,
+            status="pending" if selected else "skipped",
+            prescreen_score=score
+        ))
+    db.add_all(items)
+    db.commit()
+    db.refresh(job)
+
+    start_screening_job(job.id)
+
+    return _job_progress(job)
+
+@router.get("/batch/screening/{job_id}")
+async def get_screening_job(job_id: int, db: Session = Depends(get_db)):
+    """获取批量筛选任务进度"""
+    job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="批量任务不存在")
+
+    return _job_progress(job)
+
+@router.get("/batch/screening/{job_id}/results")
+async def get_screening_results(job_id: int, limit: int = 50, db: Session = Depends(get_db)):
+    """获取批量筛选结果，按匹配度从高到低排序"""
+    job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="批量任务不存在")
+
+    rows = db.query(ScreeningJobItem, Candidate.file_name, AnalysisResult.candidate_profile).join(
+        Candidate, Candidate.id == ScreeningJobItem.candidate_id
+    ).outerjoin(
+        AnalysisResult, AnalysisResult.id == ScreeningJobItem.analysis_id
+    ).filter(
+        ScreeningJobItem.job_id == job_id,
+        ScreeningJobItem.status == "completed"
+    ).order_by(ScreeningJobItem.match_score.desc()).limit(limit).all()
+
+    ranking = []
+    for rank, (item, file_name, candidate_profile) in enumerate(rows, start=1):
+        ranking.append({
+            "rank": rank,
+            "candidate_id": item.candidate_id,
+            "candidate_name": (candidate_profile or {}).get("name", "未知"),
+            "file_name": file_name,
+            "analysis_id": item.analysis_id,
+            "match_score": item.match_score,
+            "prescreen_score": item.prescreen_score
+        })
+
+    failed = db.query(ScreeningJobItem.candidate_id, ScreeningJobItem.error).filter(
+        ScreeningJobItem.job_id == job_id,
+        ScreeningJobItem.status == "failed"
+    ).all()
+
+    # 预筛选未通过的候选人按预筛选分数排序
+    skipped = db.query(ScreeningJobItem.candidate_id, ScreeningJobItem.prescreen_score).filter(
+        ScreeningJobItem.job_id == job_id,
+        ScreeningJobItem.status == "skipped"
+    ).order_by(ScreeningJobItem.prescreen_score.desc()).limit(limit).all()
+
+    return {
+        **_job_progress(job),
+        "results": ranking,
+        "failed": [{"candidate_id": candidate_id, "error": error} for candidate_id, error in failed],
+        "skipped": [
+            {"candidate_id": candidate_id, "prescreen_score": prescreen_score}
+            for candidate_id, prescreen_score in skipped
+        ]
+    }
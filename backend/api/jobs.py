@@ -0,0 +1,61 @@
+"""
+分析任务状态API
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from database import get_db, SessionLocal
+from models import AnalysisJob
+from job_queue import job_status
+import asyncio
+import json
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+FINISHED_STATUSES = ("completed", "failed")
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: int, db: Session = Depends(get_db)):
+    """查询分析任务状态（轮询）"""
+    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="分析任务不存在")
+
+    return job_status(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: int, db: Session = Depends(get_db)):
+    """以Server-Sent Events推送分析任务的阶段变化，任务结束后关闭连接"""
+    if not db.query(AnalysisJob.id).filter(AnalysisJob.id == job_id).first():
+        raise HTTPException(status_code=404, detail="分析任务不存在")
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            session = SessionLocal()
+            try:
+                job = session.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+                status = job_status(job) if job else None
+            finally:
+                session.close()
+
+            # 推送过程中任务被删除（例如候选人被删除）时发送终止事件
+            if status is None:
+                payload = json.dumps({"job_id": job_id, "message": "分析任务不存在"}, ensure_ascii=False)
+                yield f"event: error\ndata: {payload}\n\n"
+                return
+
+            payload = json.dumps(status, ensure_ascii=False, default=str)
+            if payload != last_payload:
+                yield f"event: status\ndata: {payload}\n\n"
+                last_payload = payload
+
+            if status["status"] in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
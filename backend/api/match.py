@@ -0,0 +1,56 @@
+"""
+职位-候选人语义匹配API
+"""
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database import get_db
+from models import Candidate
+from vector_index import get_vector_index
+
+router = APIRouter(prefix="/api", tags=["match"])
+
+@router.get("/match")
+async def match_candidates(
+    jd: str = Query(..., min_length=1, max_length=5000, description="职位描述"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """在整个候选人库中按本地向量检索与职位描述最匹配的简历（不调用大模型），相似度为TF-IDF余弦"""
+    job_description = jd.strip()
+    if not job_description:
+        raise HTTPException(status_code=400, detail="职位描述不能为空")
+
+    def load_texts(candidate_ids):
+        rows = db.query(Candidate.id, Candidate.resume_content).filter(Candidate.id.in_(candidate_ids))
+        return {row.id: row.resume_content for row in rows if row.resume_content}
+
+    index = get_vector_index()
+    started = time.perf_counter()
+    hits = await run_in_threadpool(index.search, job_description, limit, load_texts)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    candidates = {
+        candidate.id: candidate
+        for candidate in db.query(Candidate).filter(Candidate.id.in_([candidate_id for candidate_id, _ in hits]))
+    }
+    results = []
+    for candidate_id, similarity in hits:
+        candidate = candidates.get(candidate_id)
+        if candidate is None:
+            continue
+        parsed = candidate.parsed_resume if isinstance(candidate.parsed_resume, dict) else {}
+        results.append({
+            "candidate_id": candidate.id,
+            "file_name": candidate.file_name,
+            "name": parsed.get("name"),
+            "similarity": round(similarity, 4),
+            "parse_status": candidate.parse_status,
+            "created_at": candidate.created_at
+        })
+    return {
+        "results": results,
+        "indexed": len(index),
+        "elapsed_ms": round(elapsed_ms, 1)
+    }
@@ -1,11 +1,14 @@
 """
 报告生成API
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, case, func, literal, String
 from sqlalchemy.orm import Session
 from database import get_db
 from models import AnalysisResult, Candidate, JobDescription
-from typing import Dict, Any
+from utils import encode_cursor, decode_cursor
+from typing import Dict, Any, Optional
+from datetime import datetime
 import json
 
 router = APIRouter(prefix="/api", tags=["report"])
@@ -101,26 +104,106 @@ async def get_interview_questions(file_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/reports")
-async def list_all_reports(db: Session = Depends(get_db)):
-    """获取所有报告列表"""
-    analyses = db.query(AnalysisResult).order_by(AnalysisResult.created_at.desc()).all()
+async def list_all_reports(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: str = Query("created_at", pattern="^(created_at|match_score)$"),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    job_description_id: Optional[int] = None,
+    jd_keyword: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """获取报告列表（基于游标分页，支持按匹配度/时间/职位描述筛选和排序）"""
+    # 只查询列表需要的列，不加载完整报告和分析JSON
+    sort_column = AnalysisResult.created_at if sort == "created_at" else func.coalesce(AnalysisResult.match_score, 0)
+    query = db.query(
+        AnalysisResult.id,
+        AnalysisResult.candidate_id,
+        AnalysisResult.candidate_profile["name"].as_string().label("candidate_name"),
+        AnalysisResult.match_score,
+        AnalysisResult.created_at,
+        sort_column.label("sort_value"),
+        Candidate.file_name,
+        func.substr(JobDescription.job_description, 1, 101).label("job_description")
+    ).outerjoin(
+        Candidate, Candidate.id == AnalysisResult.candidate_id
+    ).outerjoin(
+        JobDescription, JobDescription.id == AnalysisResult.job_description_id
+    )
+    
+    if min_score is not None:
+        query = query.filter(AnalysisResult.match_score >= min_score)
+    if max_score is not None:
+        query = query.filter(AnalysisResult.match_score <= max_score)
+    if date_from is not None:
+        query = query.filter(AnalysisResult.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(AnalysisResult.created_at <= date_to)
+    if job_description_id is not None:
+        query = query.filter(AnalysisResult.job_description_id == job_description_id)
+    if jd_keyword:
+        query = query.filter(JobDescription.job_description.contains(jd_keyword))
+    
+    if cursor:
+        try:
+            cursor_value, cursor_id = decode_cursor(cursor)
+            if sort == "created_at":
+                datetime.fromisoformat(cursor_value)
+            else:
+                cursor_value = float(cursor_value)
+            cursor_id = int(cursor_id)
+        except (ValueError, TypeError, KeyError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if sort == "created_at":
+            # 以数据库中存储的原始时间文本比较，避免SQLite绑定datetime参数时补齐微秒导致比较错位
+            cursor_value = literal(cursor_value, String)
+        query = query.filter(or_(
+            sort_column < cursor_value,
+            and_(sort_column == cursor_value, AnalysisResult.id < cursor_id)
+        ))
+    
+    rows = query.order_by(sort_column.desc(), AnalysisResult.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
     reports = []
-    for analysis in analyses:
-        candidate = db.query(Candidate).filter(Candidate.id == analysis.candidate_id).first()
-        job_desc = db.query(JobDescription).filter(JobDescription.id == analysis.job_description_id).first()
-        
+    for row in rows:
+        job_description = row.job_description or ""
         reports.append({
-            "analysis_id": analysis.id,
-            "candidate_id": analysis.candidate_id,
-            "candidate_name": analysis.candidate_profile.get("name", "未知"),
-            "file_name": candidate.file_name if candidate else "未知文件",
-            "match_score": analysis.match_score,
-            "job_description": job_desc.job_description[:100] + "..." if job_desc and len(job_desc.job_description) > 100 else job_desc.job_description if job_desc else "",
-            "created_at": analysis.created_at
+            "analysis_id": row.id,
+            "candidate_id": row.candidate_id,
+            "candidate_name": row.candidate_name or "未知",
+            "file_name": row.file_name or "未知文件",
+            "match_score": row.match_score,
+            "job_description": job_description[:100] + "..." if len(job_description) > 100 else job_description,
+            "created_at": row.created_at
         })
     
-    return {"reports": reports}
+    next_cursor = encode_cursor([rows[-1].sort_value, rows[-1].id]) if has_more else None
+    return {"reports": reports, "next_cursor": next_cursor}
+
+@router.get("/reports/stats")
+async def get_reports_stats(db: Session = Depends(get_db)):
+    """报告统计概览（在数据库中聚合，不加载报告内容）"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    # 条件计数用SUM(CASE ...)，MySQL不支持聚合函数的FILTER子句
+    total, average_score, high_score_count, today_count = db.query(
+        func.count(AnalysisResult.id),
+        func.avg(AnalysisResult.match_score),
+        func.sum(case((AnalysisResult.match_score >= 80, 1), else_=0)),
+        func.sum(case((AnalysisResult.created_at >= today, 1), else_=0))
+    ).one()
+    
+    # 没有任何记录时SUM返回NULL
+    return {
+        "total": total,
+        "average_score": round(average_score or 0, 1),
+        "high_score_count": int(high_score_count or 0),
+        "today_count": int(today_count or 0)
+    }
 
 @router.post("/report/{file_id}/export")
 async def export_report(file_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,88 @@
+"""
+简历全文检索API
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from database import get_db
+from models import Candidate
+from search_index import search_available, search_candidates, highlight
+from utils import encode_cursor, decode_cursor
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+def _search_result(candidate: Candidate, query: str, score=None) -> dict:
+    parsed = candidate.parsed_resume if isinstance(candidate.parsed_resume, dict) else {}
+    return {
+        "candidate_id": candidate.id,
+        "file_name": candidate.file_name,
+        "name": parsed.get("name"),
+        "score": score,
+        "highlight": highlight(candidate.resume_content, query),
+        "parse_status": candidate.parse_status,
+        "created_at": candidate.created_at
+    }
+
+def _like_search(db: Session, query: str, limit: int, cursor: str = None) -> dict:
+    """不支持FTS5时的退化查询：所有词都出现在简历文本中，按上传时间倒序"""
+    conditions = [Candidate.resume_content.ilike(f"%{term}%") for term in query.split()]
+    base = db.query(Candidate).filter(and_(*conditions))
+    total = base.count()
+    if cursor:
+        try:
+            _, cursor_id = decode_cursor(cursor)
+            cursor_id = int(cursor_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        base = base.filter(Candidate.id < cursor_id)
+    rows = base.order_by(Candidate.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": [_search_result(candidate, query) for candidate in rows],
+        "total": total,
+        "next_cursor": encode_cursor([None, rows[-1].id]) if has_more else None
+    }
+
+@router.get("/search")
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200, description="检索词，多个词用空格分隔"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    db: Session = Depends(get_db)
+):
+    """全文检索简历（姓名、技能、工作经历与简历正文），按BM25相关度排序，命中词以<mark>标记"""
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="检索词不能为空")
+
+    connection = db.connection()
+    if not search_available(connection):
+        return _like_search(db, query, limit, cursor)
+
+    after = None
+    if cursor:
+        try:
+            rank, cursor_id = decode_cursor(cursor)
+            after = (float(rank), int(cursor_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    hits, total = search_candidates(connection, query, limit + 1, after)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    candidates = {
+        candidate.id: candidate
+        for candidate in db.query(Candidate).filter(Candidate.id.in_([candidate_id for candidate_id, _ in hits]))
+    }
+    results = [
+        # bm25()越小越相关，对外返回取反后的分数（越大越相关）
+        _search_result(candidates[candidate_id], query, round(-rank, 4))
+        for candidate_id, rank in hits if candidate_id in candidates
+    ]
+    return {
+        "results": results,
+        "total": total,
+        "next_cursor": encode_cursor([hits[-1][1], hits[-1][0]]) if has_more else None
+    }
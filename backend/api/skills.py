@@ -0,0 +1,80 @@
+"""
+技能库与技能布尔查询API
+"""
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database import get_db
+from models import Candidate
+from skill_index import (
+    SkillQueryError,
+    bitset_ids,
+    format_skill_query,
+    load_skill_index,
+    parse_skill_query,
+    skill_index,
+    skill_taxonomy
+)
+
+router = APIRouter(prefix="/api/skills", tags=["skills"])
+
+async def _ready_index():
+    if not skill_index.ready:
+        await run_in_threadpool(load_skill_index)
+    return skill_index
+
+@router.get("")
+async def list_skills():
+    """技能库：每个技能的ID、标准名称、类别、别名和具备该技能的候选人数"""
+    index = await _ready_index()
+    counts = index.skill_counts()
+    return {
+        "skills": [{**skill, "candidates": counts[skill["id"]]} for skill in skill_taxonomy()],
+        "candidates": len(index)
+    }
+
+@router.get("/query")
+async def query_skills(
+    q: str = Query(..., min_length=1, max_length=500, description="技能布尔表达式，如 Kafka AND Flink AND NOT Java"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: int = Query(None, description="上一页最后一个候选人ID"),
+    db: Session = Depends(get_db)
+):
+    """按技能布尔表达式（AND/OR/NOT、&/|/!、括号）在整个候选人库中筛选，按上传时间倒序返回"""
+    try:
+        tree = parse_skill_query(q)
+    except SkillQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    index = await _ready_index()
+    started = time.perf_counter()
+    bitset = index.evaluate(tree)
+    elapsed_us = (time.perf_counter() - started) * 1e6
+    total = bitset.bit_count()
+    ids = bitset_ids(bitset, limit + 1, before=cursor)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+
+    candidates = {candidate.id: candidate for candidate in db.query(Candidate).filter(Candidate.id.in_(ids))}
+    results = []
+    for candidate_id in ids:
+        candidate = candidates.get(candidate_id)
+        if candidate is None:
+            continue
+        parsed = candidate.parsed_resume if isinstance(candidate.parsed_resume, dict) else {}
+        results.append({
+            "candidate_id": candidate.id,
+            "file_name": candidate.file_name,
+            "name": parsed.get("name"),
+            "skills": candidate.skills or [],
+            "parse_status": candidate.parse_status,
+            "created_at": candidate.created_at
+        })
+    return {
+        "query": format_skill_query(tree),
+        "total": total,
+        "results": results,
+        "next_cursor": ids[-1] if has_more else None,
+        "elapsed_us": round(elapsed_us, 1)
+    }
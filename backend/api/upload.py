@@ -1,9 +1,11 @@
 """
 文件上传API
 """
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks, Query
 from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from sqlalchemy import and_, or_, literal, String
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
 from models import Candidate, FileUploadResponse
 import mimetypes
@@ -11,16 +13,22 @@ from utils import (
     validate_file, 
     generate_unique_filename, 
     save_uploaded_file, 
-    extract_text_from_file,
-    clean_text
+    FileTooLargeError,
+    save_zip_resumes,
+    encode_cursor,
+    decode_cursor
 )
-from ai_client import ZhipuClient
+from datetime import datetime
+from resume_pipeline import process_uploaded_resume, process_uploaded_batch, find_duplicate_upload, link_duplicate
+from config import BATCH_UPLOAD_MAX_FILES
+from typing import List
 import os
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
@@ -34,39 +42,169 @@ async def upload_file(
         # 生成唯一文件名
         filename = generate_unique_filename(file.filename)
         
-        # 保存文件
-        file_path = save_uploaded_file(file, filename)
-        
-        # 提取文件内容
+        # 分块流式保存文件并计算内容哈希
         try:
-            raw_content = extract_text_from_file(file_path)
-            cleaned_content = clean_text(raw_content)
-        except Exception as e:
-            # 如果文件解析失败，仍然保存文件记录，但标记内容为空
-            cleaned_content = f"文件解析失败: {str(e)}"
+            file_path, file_size, content_hash = await save_uploaded_file(file, filename)
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        
+        # 相同内容的文件只保存一份
+        original = find_duplicate_upload(db, content_hash)
+        if original and original.file_path != file_path and os.path.exists(original.file_path):
+            os.remove(file_path)
+            file_path = original.file_path
         
-        # 保存到数据库
+        # 保存到数据库，文本提取与结构化解析由后台任务完成
         candidate = Candidate(
             file_name=file.filename,
             file_path=file_path,
-            resume_content=cleaned_content
+            content_hash=content_hash,
+            parse_status="parsing"
         )
+        if original:
+            link_duplicate(candidate, original)
         db.add(candidate)
         db.commit()
         db.refresh(candidate)
         
-        return FileUploadResponse(
+        # 重复简历已复用原始解析结果时无需再次解析
+        if candidate.parse_status == "parsing":
+            background_tasks.add_task(process_uploaded_resume, candidate.id)
+        
+        if not original:
+            message = "文件上传成功"
+        elif candidate.parse_status == "parsed":
+            message = "文件上传成功（与已上传简历重复，已复用解析结果）"
+        else:
+            # 原始简历尚未解析完成或解析失败，这份简历会单独解析
+            message = "文件上传成功（与已上传简历重复，正在解析）"
+        
+        response = FileUploadResponse(
             file_id=candidate.id,
             file_name=file.filename,
             status="success",
-            message="文件上传成功"
+            message=message,
+            parse_status=candidate.parse_status,
+            duplicate_of=candidate.duplicate_of
         )
+        # 请求的数据库会话要等后台任务结束才关闭，提前关闭以归还连接，避免并发上传时耗尽连接池
+        db.close()
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
 
+@router.post("/upload/batch")
+async def upload_batch(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """批量上传简历：支持多个文件或ZIP压缩包，批量入库后在后台并行提取文本"""
+    saved, rejected = [], []
+    
+    for file in files:
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        remaining = BATCH_UPLOAD_MAX_FILES - len(saved)
+        
+        if extension == ".zip":
+            # 解压是阻塞操作，放到线程池中逐个成员流式写入
+            try:
+                zip_saved, zip_rejected = await run_in_threadpool(save_zip_resumes, file.file, remaining)
+            except ValueError as e:
+                rejected.append({"file_name": file.filename, "reason": str(e)})
+                continue
+            saved.extend(zip_saved)
+            rejected.extend(zip_rejected)
+            continue
+        
+        if remaining <= 0:
+            rejected.append({"file_name": file.filename, "reason": f"超过单次上传数量限制({BATCH_UPLOAD_MAX_FILES})"})
+            continue
+        
+        is_valid, message = validate_file(file)
+        if not is_valid:
+            rejected.append({"file_name": file.filename, "reason": message})
+            continue
+        
+        try:
+            file_path, _, content_hash = await save_uploaded_file(file, generate_unique_filename(file.filename))
+        except FileTooLargeError as e:
+            rejected.append({"file_name": file.filename, "reason": str(e)})
+            continue
+        saved.append({"file_name": file.filename, "file_path": file_path, "content_hash": content_hash})
+    
+    # 一次查询找出库中已有的相同内容简历
+    hashes = {item["content_hash"] for item in saved}
+    existing = {}
+    if hashes:
+        for candidate in db.query(Candidate).filter(Candidate.content_hash.in_(hashes)).order_by(Candidate.id):
+            existing.setdefault(candidate.content_hash, candidate)
+    
+    candidates = []
+    batch_originals = {}  # 本批次内首次出现的内容哈希 -> 候选人
+    batch_duplicates = []  # (重复候选人, 本批次内的原始候选人)
+    for item in saved:
+        content_hash = item["content_hash"]
+        original = existing.get(content_hash)
+        batch_original = batch_originals.get(content_hash)
+        
+        # 相同内容的文件只保存一份
+        file_path = item["file_path"]
+        shared_path = original.file_path if original else (batch_original.file_path if batch_original else None)
+        if shared_path and os.path.exists(shared_path):
+            os.remove(file_path)
+            file_path = shared_path
+        
+        candidate = Candidate(
+            file_name=item["file_name"],
+            file_path=file_path,
+            content_hash=content_hash,
+            parse_status="parsing"
+        )
+        if original:
+            link_duplicate(candidate, original)
+        elif batch_original:
+            batch_duplicates.append((candidate, batch_original))
+        else:
+            batch_originals[content_hash] = candidate
+        candidates.append(candidate)
+    
+    # 所有候选人在同一个事务中批量写入
+    db.add_all(candidates)
+    db.flush()
+    for candidate, batch_original in batch_duplicates:
+        candidate.duplicate_of = batch_original.id
+    
+    accepted = [
+        {
+            "file_id": candidate.id,
+            "file_name": candidate.file_name,
+            "parse_status": candidate.parse_status,
+            "duplicate_of": candidate.duplicate_of
+        }
+        for candidate in candidates
+    ]
+    duplicates = {candidate.id: batch_original.id for candidate, batch_original in batch_duplicates}
+    to_process = [
+        candidate.id for candidate in candidates
+        if candidate.parse_status == "parsing" and candidate.id not in duplicates
+    ]
+    db.commit()
+    
+    if to_process or duplicates:
+        background_tasks.add_task(process_uploaded_batch, to_process, duplicates)
+    
+    return {
+        "total": len(saved) + len(rejected),
+        "accepted_count": len(accepted),
+        "rejected_count": len(rejected),
+        "accepted": accepted,
+        "rejected": rejected
+    }
+
 @router.get("/file/{file_id}")
 async def get_file_info(file_id: int, db: Session = Depends(get_db)):
     """获取文件信息"""
@@ -79,7 +217,10 @@ async def get_file_info(file_id: int, db: Session = Depends(get_db)):
         "file_name": candidate.file_name,
         "file_path": candidate.file_path,
         "created_at": candidate.created_at,
-        "file_size": os.path.getsize(candidate.file_path) if os.path.exists(candidate.file_path) else 0
+        "file_size": os.path.getsize(candidate.file_path) if os.path.exists(candidate.file_path) else 0,
+        "content_hash": candidate.content_hash,
+        "parse_status": candidate.parse_status,
+        "duplicate_of": candidate.duplicate_of
     }
 
 @router.delete("/file/{file_id}")
@@ -90,10 +231,18 @@ async def delete_file(file_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="文件不存在")
     
     try:
-        # 删除物理文件
-        if os.path.exists(candidate.file_path):
+        # 删除物理文件（重复简历共用同一文件，仍被引用时保留）
+        shared = db.query(Candidate.id).filter(
+            Candidate.file_path == candidate.file_path,
+            Candidate.id != candidate.id
+        ).first()
+        if not shared and os.path.exists(candidate.file_path):
             os.remove(candidate.file_path)
         
+        # 原始简历被删除后，其重复简历不再指向它（逐条更新以触发向量索引同步）
+        for duplicate in db.query(Candidate).filter(Candidate.duplicate_of == candidate.id):
+            duplicate.duplicate_of = None
+        
         # 删除数据库记录
         db.delete(candidate)
         db.commit()
@@ -104,22 +253,55 @@ async def delete_file(file_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"文件删除失败: {str(e)}")
 
 @router.get("/files")
-async def list_files(db: Session = Depends(get_db)):
-    """获取文件列表"""
-    candidates = db.query(Candidate).order_by(Candidate.created_at.desc()).all()
+async def list_files(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str = None,
+    db: Session = Depends(get_db)
+):
+    """获取文件列表（按上传时间倒序，基于游标分页）"""
+    query = db.query(
+        Candidate.id,
+        Candidate.file_name,
+        Candidate.file_path,
+        Candidate.parse_status,
+        Candidate.duplicate_of,
+        Candidate.created_at
+    )
+    
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            datetime.fromisoformat(cursor_created_at)
+            cursor_id = int(cursor_id)
+        except (ValueError, TypeError, KeyError):
+            # 能解码但内容结构不对的游标同样视为无效
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        # 以数据库中存储的原始时间文本比较，避免SQLite绑定datetime参数时补齐微秒导致比较错位
+        cursor_created_at = literal(cursor_created_at, String)
+        query = query.filter(or_(
+            Candidate.created_at < cursor_created_at,
+            and_(Candidate.created_at == cursor_created_at, Candidate.id < cursor_id)
+        ))
+    
+    rows = query.order_by(Candidate.created_at.desc(), Candidate.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
     files = []
-    for candidate in candidates:
-        file_exists = os.path.exists(candidate.file_path)
+    for row in rows:
+        file_exists = os.path.exists(row.file_path)
         files.append({
-            "id": candidate.id,
-            "file_name": candidate.file_name,
-            "created_at": candidate.created_at,
-            "file_size": os.path.getsize(candidate.file_path) if file_exists else 0,
-            "status": "存在" if file_exists else "文件丢失"
+            "id": row.id,
+            "file_name": row.file_name,
+            "created_at": row.created_at,
+            "file_size": os.path.getsize(row.file_path) if file_exists else 0,
+            "status": "存在" if file_exists else "文件丢失",
+            "parse_status": row.parse_status,
+            "duplicate_of": row.duplicate_of
         })
     
-    return {"files": files}
+    next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id]) if has_more else None
+    return {"files": files, "next_cursor": next_cursor}
 
 @router.get("/file/{file_id}/download")
 async def download_file(file_id: int, db: Session = Depends(get_db)):
@@ -209,5 +391,7 @@ async def get_file_content(file_id: int, db: Session = Depends(get_db)):
         "file_id": candidate.id,
         "file_name": candidate.file_name,
         "content": candidate.resume_content,
+        "parsed_resume": candidate.parsed_resume,
+        "parse_status": candidate.parse_status,
         "created_at": candidate.created_at
     }
@@ -0,0 +1,135 @@
+"""
+基准测试：按候选人查询最新分析结果
+
+在临时SQLite数据库中写入不同规模的分析结果，分别在无索引和执行迁移建立
+(candidate_id, created_at)复合索引后，测量"候选人最新分析"查询的平均耗时，
+并输出查询计划。有索引时耗时应基本不随行数增长（O(log n)），无索引时线性增长。
+
+用法（在backend目录下）:
+    python benchmarks/bench_latest_analysis.py [--rows 10000,100000] [--candidates 10000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from models import Base, AnalysisResult
+from migrations import run_migrations
+
+LATEST_SQL = (
+    "SELECT id FROM analysis_results WHERE candidate_id = :candidate_id "
+    "ORDER BY created_at DESC LIMIT 1"
+)
+
+def populate(engine, rows: int, candidates: int):
+    """批量写入候选人、职位描述与分析结果（不建索引）"""
+    Base.metadata.create_all(engine)
+    # 删除模型声明的二级索引，模拟迁移前的数据库
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    start = datetime(2024, 1, 1)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO candidates (id, file_name, file_path) VALUES (:id, :name, :path)"),
+            [{"id": i, "name": f"resume_{i}.pdf", "path": f"uploads/{i}.pdf"} for i in range(1, candidates + 1)]
+        )
+        conn.execute(
+            text("INSERT INTO job_descriptions (id, candidate_id, job_description) VALUES (1, 1, 'benchmark')")
+        )
+        batch = []
+        for i in range(1, rows + 1):
+            batch.append({
+                "candidate_id": rng.randint(1, candidates),
+                "match_score": rng.uniform(0, 100),
+                "created_at": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            if len(batch) == 10000:
+                _insert_results(conn, batch)
+                batch = []
+        if batch:
+            _insert_results(conn, batch)
+
+def _insert_results(conn, batch):
+    conn.execute(
+        text("INSERT INTO analysis_results (candidate_id, job_description_id, match_score, created_at) "
+             "VALUES (:candidate_id, 1, :match_score, :created_at)"),
+        batch
+    )
+
+def measure(engine, candidates: int, queries: int) -> float:
+    """返回单次最新分析查询的平均耗时（毫秒）"""
+    rng = random.Random(7)
+    ids = [rng.randint(1, candidates) for _ in range(queries)]
+    with engine.connect() as conn:
+        statement = text(LATEST_SQL)
+        started = time.perf_counter()
+        for candidate_id in ids:
+            conn.execute(statement, {"candidate_id": candidate_id}).fetchone()
+        elapsed = time.perf_counter() - started
+    return elapsed / queries * 1000
+
+def query_plan(engine) -> str:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {LATEST_SQL}"), {"candidate_id": 1}).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+def orm_check(engine, candidates: int):
+    """确认ORM查询（与API中的写法一致）命中同一索引"""
+    session = sessionmaker(bind=engine)()
+    try:
+        session.query(AnalysisResult).filter(
+            AnalysisResult.candidate_id == candidates // 2
+        ).order_by(AnalysisResult.created_at.desc()).first()
+    finally:
+        session.close()
+
+def run(rows: int, candidates: int, queries: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        populate(engine, rows, candidates)
+
+        before = measure(engine, candidates, max(queries // 20, 20))
+        plan_before = query_plan(engine)
+
+        run_migrations(engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        orm_check(engine, candidates)
+        after = measure(engine, candidates, queries)
+        plan_after = query_plan(engine)
+        engine.dispose()
+
+    print(f"\n📊 行数={rows:,} 候选人={candidates:,}")
+    print(f"  无索引: {before:8.3f} ms/次  计划: {plan_before}")
+    print(f"  有索引: {after:8.3f} ms/次  计划: {plan_after}")
+    return after
+
+def main():
+    parser = argparse.ArgumentParser(description="最新分析结果查询基准测试")
+    parser.add_argument("--rows", default="10000,100000", help="逗号分隔的分析结果行数")
+    parser.add_argument("--candidates", type=int, default=10000, help="候选人数量")
+    parser.add_argument("--queries", type=int, default=2000, help="有索引时的查询次数")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in [int(value) for value in args.rows.split(",")]:
+        results[rows] = run(rows, args.candidates, args.queries)
+
+    sizes = sorted(results)
+    if len(sizes) > 1:
+        growth = results[sizes[-1]] / results[sizes[0]]
+        print(f"\n行数增长 {sizes[-1] / sizes[0]:.0f} 倍，带索引查询耗时变化 {growth:.2f} 倍")
+
+if __name__ == "__main__":
+    main()
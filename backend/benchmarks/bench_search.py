@@ -0,0 +1,93 @@
+"""
+基准测试：简历全文检索
+
+在临时SQLite数据库中生成大量中英文混合的合成简历，建立FTS5索引后测量
+常见检索词（英文技能、中文词、单字、多词组合、精确号码）的首页查询耗时（含命中总数和高亮），
+并与LIKE退化查询（同样统计总数）对比。BM25需要为全部命中打分，命中越多耗时越长。
+
+用法（在backend目录下）:
+    python benchmarks/bench_search.py [--docs 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from models import Base, Candidate
+from search_index import create_search_table, rebuild_search_index, search_candidates, highlight
+
+SKILLS = ["Python", "Java", "Go", "C++", "React", "Vue", "Kubernetes", "Docker", "MySQL", "Redis",
+          "Kafka", "Spark", "TensorFlow", "PyTorch", "Node.js", "Django", "Spring Boot", "Flink"]
+COMPANIES = ["腾讯", "阿里巴巴", "字节跳动", "百度", "美团", "京东", "网易", "华为", "小米", "快手"]
+PHRASES = ["负责核心系统的设计与开发", "参与高并发服务的性能优化", "主导微服务架构改造", "搭建数据平台与实时计算链路",
+           "推动自动化测试与持续集成", "带领团队完成产品迭代", "优化推荐算法提升转化率", "维护分布式存储集群"]
+QUERIES = ["Python", "Kubernetes", "腾讯", "机器学习", "张", "Python 腾讯", "C++ 性能优化", "Flink 实时计算",
+           "13800012345", "张4512345"]
+
+def build_resume(rng: random.Random, index: int) -> str:
+    parts = [f"张{index % 100}{index} 电话138{index:08d} 专业技能"]
+    parts.append(" ".join(rng.sample(SKILLS, 6)))
+    parts.append("工作经历")
+    for _ in range(4):
+        parts.append(f"{rng.randint(2012, 2024)} {rng.choice(COMPANIES)} 高级工程师 {rng.choice(PHRASES)}，{rng.choice(PHRASES)}。")
+    if rng.random() < 0.2:
+        parts.append("熟悉机器学习与深度学习")
+    parts.append("教育背景 计算机科学与技术 本科")
+    return " ".join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description="简历全文检索基准测试")
+    parser.add_argument("--docs", type=int, default=100000, help="合成简历数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数（取中位数）")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(Candidate.__table__.insert(), [
+                {"file_name": f"resume_{index}.pdf", "file_path": "", "resume_content": build_resume(rng, index),
+                 "parse_status": "parsed"}
+                for index in range(args.docs)
+            ])
+        print(f"📄 写入 {args.docs:,} 份简历: {time.perf_counter() - started:.1f} 秒")
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            create_search_table(conn)
+            rebuild_search_index(conn)
+        print(f"🔎 建立FTS5索引: {time.perf_counter() - started:.1f} 秒，数据库大小 "
+              f"{os.path.getsize(os.path.join(tmp, 'bench.db')) / 1024 / 1024:.0f} MB\n")
+
+        print(f"  {'检索词':<16}{'命中数':>8}{'FTS5首页(ms)':>14}{'LIKE退化(ms)':>14}")
+        with engine.connect() as conn:
+            for query in QUERIES:
+                fts_times = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    hits, total = search_candidates(conn, query, 20)
+                    ids = ",".join(str(candidate_id) for candidate_id, _ in hits) or "0"
+                    rows = conn.execute(text(f"SELECT resume_content FROM candidates WHERE id IN ({ids})")).fetchall()
+                    [highlight(row[0], query) for row in rows]
+                    fts_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                conditions = " AND ".join(f"resume_content LIKE :t{i}" for i, _ in enumerate(query.split()))
+                params = {f"t{i}": f"%{term}%" for i, term in enumerate(query.split())}
+                conn.execute(text(f"SELECT count(*) FROM candidates WHERE {conditions}"), params).scalar()
+                conn.execute(text(f"SELECT id FROM candidates WHERE {conditions} ORDER BY id DESC LIMIT 20"), params).fetchall()
+                like_time = time.perf_counter() - started
+
+                fts_times.sort()
+                print(f"  {query:<16}{total:>8,}{fts_times[len(fts_times) // 2] * 1000:>14.1f}{like_time * 1000:>14.1f}")
+
+if __name__ == "__main__":
+    main()
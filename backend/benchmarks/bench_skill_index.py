@@ -0,0 +1,84 @@
+"""
+基准测试：技能位图索引
+
+为合成候选人随机分配技能后，对比两种方式回答技能布尔查询的耗时：
+- 逐行扫描：解码每个候选人的技能JSON并逐个判断（改造前的做法）
+- 位图索引：解析表达式后对技能位图做位运算
+
+用法（在backend目录下）:
+    python benchmarks/bench_skill_index.py [--candidates 100000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import skill_matcher
+from skill_index import SkillBitsetIndex, bitset_ids, parse_skill_query
+
+QUERIES = [
+    ("Kafka AND Flink AND NOT Java", lambda s: "Kafka" in s and "Flink" in s and "Java" not in s),
+    ("(Go OR Rust) AND Kubernetes", lambda s: ("Go" in s or "Rust" in s) and "Kubernetes" in s),
+    ("Python AND (Django OR Flask) AND NOT PHP", lambda s: "Python" in s and ("Django" in s or "Flask" in s) and "PHP" not in s),
+    ("机器学习 AND NOT 深度学习", lambda s: "机器学习" in s and "深度学习" not in s),
+]
+POPULAR = ["Python", "Java", "Go", "Rust", "PHP", "Kafka", "Flink", "Kubernetes", "Django", "Flask", "机器学习", "深度学习"]
+
+def median_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="技能位图索引基准测试")
+    parser.add_argument("--candidates", type=int, default=100000, help="候选人数")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询重复次数（取中位数）")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    vocabulary = skill_matcher.skills
+    rows = []
+    for candidate_id in range(1, args.candidates + 1):
+        skills = set(rng.sample(vocabulary, rng.randint(3, 12)))
+        skills.update(skill for skill in POPULAR if rng.random() < 0.2)
+        rows.append((candidate_id, sorted(skills)))
+    encoded = [(candidate_id, json.dumps({"candidate_skills": skills}, ensure_ascii=False)) for candidate_id, skills in rows]
+
+    index = SkillBitsetIndex(len(vocabulary))
+    started = time.perf_counter()
+    index.load(rows)
+    print(f"🏷️ 加载 {args.candidates:,} 名候选人: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    extra = {args.candidates + offset: sorted(rng.sample(vocabulary, 8)) for offset in range(1, 1001)}
+    started = time.perf_counter()
+    index.apply(extra)
+    print(f"➕ 增量写入 1,000 名: {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    encoded += [(candidate_id, json.dumps({"candidate_skills": skills}, ensure_ascii=False))
+                for candidate_id, skills in extra.items()]
+    print(f"  {'查询':<42}{'命中':>8}{'逐行扫描(ms)':>14}{'位图(ms)':>10}{'首页50(ms)':>12}")
+    for expression, predicate in QUERIES:
+        def scan():
+            return [candidate_id for candidate_id, raw in encoded
+                    if predicate(set(json.loads(raw)["candidate_skills"]))]
+
+        tree = parse_skill_query(expression)
+        expected = scan()
+        bitset = index.evaluate(tree)
+        assert bitset.bit_count() == len(expected) and set(bitset_ids(bitset, len(expected))) == set(expected)
+
+        scan_ms = median_ms(scan, max(1, args.repeat // 10))
+        bitset_ms = median_ms(lambda: index.evaluate(parse_skill_query(expression)).bit_count(), args.repeat)
+        page_ms = median_ms(lambda: bitset_ids(index.evaluate(tree), 50), args.repeat)
+        print(f"  {expression:<42}{len(expected):>8,}{scan_ms:>14.1f}{bitset_ms:>10.3f}{page_ms:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+基准测试：简历文本提取
+
+生成合成的多页PDF与多表格DOCX，对比逐次`text +=`拼接的旧实现与
+生成器+一次性拼接（并去重合并单元格）的新实现的耗时与输出长度。
+
+用法（在backend目录下）:
+    python benchmarks/bench_text_extraction.py [--pages 100] [--tables 50] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx
+import PyPDF2
+from utils import extract_text_from_pdf, extract_text_from_docx
+
+LINE = "Senior Python Engineer Django FastAPI Kafka Redis MySQL Kubernetes 5 years experience"
+
+def legacy_extract_pdf(file_path: str) -> str:
+    """旧实现：逐页 text += """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page_num in range(len(pdf_reader.pages)):
+            page = pdf_reader.pages[page_num]
+            text += page.extract_text()
+        return text.strip()
+
+def legacy_extract_docx(file_path: str) -> str:
+    """旧实现：逐段落、逐单元格 text += """
+    doc = docx.Document(file_path)
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                text += cell.text + " "
+            text += "\n"
+    return text.strip()
+
+def build_pdf(path: str, pages: int, lines_per_page: int = 45):
+    """手工生成只含文本的多页PDF（Helvetica字体）"""
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    for page in range(pages):
+        stream_lines = ["BT", "/F1 10 Tf", "14 TL", "50 780 Td"]
+        for line in range(lines_per_page):
+            stream_lines.append(f"({LINE} page {page + 1} line {line + 1}) Tj T*")
+        stream_lines.append("ET")
+        stream = "\n".join(stream_lines).encode("latin-1")
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects.append((content_id, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+        objects.append((page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()))
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects = [
+        (1, b"<< /Type /Catalog /Pages 2 0 R >>"),
+        (2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()),
+        (font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"),
+    ] + objects
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id, body in objects:
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for object_id in range(1, len(objects) + 1):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    with open(path, "wb") as f:
+        f.write(output)
+
+def build_docx(path: str, tables: int, rows: int = 30, cols: int = 6):
+    """生成含大量表格（带横向与纵向合并单元格）的DOCX"""
+    document = docx.Document()
+    for index in range(tables):
+        document.add_paragraph(f"项目经历 {index + 1}: {LINE}")
+        table = document.add_table(rows=rows, cols=cols)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"{LINE[:30]} r{r} c{c}"
+        # 每张表做若干横向、纵向合并，模拟简历中的跨列标题与跨行分组
+        table.cell(0, 0).merge(table.cell(0, cols - 1))
+        for r in range(1, rows - 4, 5):
+            table.cell(r, 0).merge(table.cell(r + 4, 0))
+    document.save(path)
+
+def timed(func, path: str, repeat: int):
+    best = float("inf")
+    result = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(path)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def report(label: str, legacy, current):
+    (legacy_time, legacy_text), (current_time, current_text) = legacy, current
+    print(f"\n📊 {label}")
+    print(f"  旧实现: {legacy_time * 1000:9.1f} ms  输出 {len(legacy_text):,} 字符")
+    print(f"  新实现: {current_time * 1000:9.1f} ms  输出 {len(current_text):,} 字符")
+    print(f"  加速比: {legacy_time / current_time:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="简历文本提取基准测试")
+    parser.add_argument("--pages", type=int, default=100, help="合成PDF页数")
+    parser.add_argument("--tables", type=int, default=50, help="合成DOCX表格数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "resume.pdf")
+        docx_path = os.path.join(tmp, "resume.docx")
+        build_pdf(pdf_path, args.pages)
+        build_docx(docx_path, args.tables)
+
+        report(
+            f"PDF {args.pages} 页",
+            timed(legacy_extract_pdf, pdf_path, args.repeat),
+            timed(extract_text_from_pdf, pdf_path, args.repeat)
+        )
+        report(
+            f"DOCX {args.tables} 个表格",
+            timed(legacy_extract_docx, docx_path, args.repeat),
+            timed(extract_text_from_docx, docx_path, args.repeat)
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+基准测试：简历向量索引
+
+生成合成简历后测量全量构建、增量写入和top-K检索耗时，并用职位描述要求的两项技能
+检查检索质量（top-K中同时具备两项技能的比例，含别名写法），对比只用哈希向量与精确重排两种方式。
+
+用法（在backend目录下）:
+    python benchmarks/bench_vector_index.py [--docs 50000] [--queries 50] [--dim 1024]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import VectorIndex
+from config import VECTOR_DIM
+
+SKILLS = [
+    ("Go", "Golang"), ("Python", "python3"), ("Java", "Java"), ("Kubernetes", "K8s"), ("Docker", "Docker"),
+    ("React", "React.js"), ("Vue", "Vue.js"), ("MySQL", "MySQL"), ("Redis", "Redis"), ("Kafka", "Kafka"),
+    ("机器学习", "Machine Learning"), ("TensorFlow", "TensorFlow"), ("Spark", "Spark"), ("Flink", "Flink"),
+]
+FILLER = ["负责核心系统的设计与开发", "参与高并发服务的性能优化", "主导微服务架构改造", "搭建数据平台与实时计算链路",
+          "推动自动化测试与持续集成", "带领团队完成产品迭代", "优化推荐算法提升转化率", "维护分布式存储集群"]
+COMPANIES = ["腾讯", "阿里巴巴", "字节跳动", "百度", "美团", "京东", "网易", "华为"]
+
+def build_resume(rng: random.Random, index: int):
+    chosen = rng.sample(range(len(SKILLS)), 5)
+    skills = [SKILLS[i][rng.random() < 0.5] for i in chosen]
+    lines = [f"候选人{index} 专业技能 " + " ".join(skills), "工作经历"]
+    for _ in range(rng.randint(2, 5)):
+        lines.append(f"{rng.choice(COMPANIES)} 工程师 {rng.choice(FILLER)}，使用{rng.choice(skills)}。{rng.choice(FILLER)}。")
+    return " ".join(lines), set(chosen)
+
+def main():
+    parser = argparse.ArgumentParser(description="简历向量索引基准测试")
+    parser.add_argument("--docs", type=int, default=50000, help="合成简历数")
+    parser.add_argument("--queries", type=int, default=50, help="检索次数")
+    parser.add_argument("--limit", type=int, default=20, help="每次检索返回数")
+    parser.add_argument("--dim", type=int, default=VECTOR_DIM, help="向量维度")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    resumes = [build_resume(rng, index) for index in range(args.docs)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp, args.dim)
+        started = time.perf_counter()
+        index.rebuild(lambda: ((candidate_id + 1, text) for candidate_id, (text, _) in enumerate(resumes)))
+        elapsed = time.perf_counter() - started
+        size_mb = os.path.getsize(os.path.join(tmp, "vectors.f32")) / 1024 / 1024
+        print(f"🧭 全量构建 {args.docs:,} 份: {elapsed:.1f} 秒（{args.docs / elapsed:,.0f} 份/秒），向量文件 {size_mb:.0f} MB")
+
+        extra = {args.docs + 1 + offset: build_resume(rng, args.docs + offset)[0] for offset in range(1000)}
+        started = time.perf_counter()
+        index.apply(extra)
+        print(f"➕ 增量写入 1,000 份: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        def load_texts(candidate_ids):
+            return {
+                candidate_id: resumes[candidate_id - 1][0] if candidate_id <= args.docs else extra[candidate_id]
+                for candidate_id in candidate_ids
+            }
+
+        queries = []
+        for _ in range(args.queries):
+            first, second = rng.sample(range(len(SKILLS)), 2)
+            queries.append(({first, second}, f"招聘后端工程师，要求熟悉{SKILLS[first][0]}和{SKILLS[second][0]}，有大型互联网公司经验"))
+
+        base_rate = 5 * 4 / (len(SKILLS) * (len(SKILLS) - 1))
+        print(f"  {'方式':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'同时具备两项技能':>18}（随机抽取约为 {base_rate:.0%}）")
+        for label, loader in (("仅向量", None), ("精确重排", load_texts)):
+            latencies, precisions = [], []
+            for required, jd in queries:
+                started = time.perf_counter()
+                hits = index.search(jd, args.limit, load_texts=loader)
+                latencies.append(time.perf_counter() - started)
+                relevant = [
+                    candidate_id <= args.docs and required <= resumes[candidate_id - 1][1]
+                    for candidate_id, _ in hits
+                ]
+                precisions.append(sum(relevant) / len(relevant))
+            latencies.sort()
+            print(f"  {label:<10}{latencies[len(latencies) // 2] * 1000:>10.1f}"
+                  f"{latencies[int(len(latencies) * 0.95)] * 1000:>10.1f}{sum(precisions) / len(precisions):>18.0%}")
+
+if __name__ == "__main__":
+    main()
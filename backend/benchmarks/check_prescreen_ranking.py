@@ -0,0 +1,59 @@
+"""
+检查：本地预筛选中，缺少职位要求技能的简历不会排在命中全部技能的简历前面
+
+随机生成职位描述（若干技能 + 常见的职位描述套话），每组构造两份简历：
+- 照抄职位描述但删掉其中一项技能（TF-IDF相似度接近满分）
+- 只列出全部要求技能的简短简历（TF-IDF相似度很低）
+后者的预筛选分数必须更高，否则以非零状态退出。
+
+用法（在backend目录下）:
+    python benchmarks/check_prescreen_ranking.py [--rounds 200] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prescreen import prescreen_scores
+from skills import skill_matcher
+
+SKILLS = ["Java", "Spring", "Python", "Go", "Kafka", "Redis", "MySQL", "Kubernetes", "Docker", "React", "Vue", "Flink"]
+BOILERPLATE = [
+    "负责后端系统的设计与开发", "具备良好的沟通能力和团队协作能力", "有互联网大厂后端开发经验优先",
+    "参与核心业务架构设计与性能优化", "本科及以上学历，计算机相关专业", "有高并发分布式系统开发经验"
+]
+
+def build_case(rng: random.Random):
+    required = rng.sample(SKILLS, rng.randint(2, 5))
+    missing = rng.choice(required)
+    sentences = rng.sample(BOILERPLATE, rng.randint(2, len(BOILERPLATE)))
+    job_description = "招聘后端工程师，要求熟悉" + "、".join(required) + "。" + "，".join(sentences)
+    copied = job_description.replace(missing, "")
+    complete = " ".join(skill_matcher.extract(job_description))
+    return job_description, missing, copied, complete
+
+def main():
+    parser = argparse.ArgumentParser(description="检查预筛选分数中技能覆盖优先于文本相似度")
+    parser.add_argument("--rounds", type=int, default=200, help="随机职位描述数")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = []
+    for _ in range(args.rounds):
+        job_description, missing, copied, complete = build_case(rng)
+        copied_score, complete_score = prescreen_scores(job_description, [copied, complete])
+        if copied_score >= complete_score:
+            failures.append((job_description, missing, copied_score, complete_score))
+
+    if failures:
+        for job_description, missing, copied_score, complete_score in failures[:5]:
+            print(f"  缺少{missing}: {copied_score} >= 全部命中: {complete_score}  职位描述: {job_description}")
+        print(f"❌ {len(failures)}/{args.rounds} 组中缺少要求技能的简历分数不低于命中全部技能的简历")
+        sys.exit(1)
+    print(f"✅ {args.rounds} 组中命中全部技能的简历分数均高于缺少要求技能的简历")
+
+if __name__ == "__main__":
+    main()
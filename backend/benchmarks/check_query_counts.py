@@ -0,0 +1,116 @@
+"""
+检查：报告列表与分析历史接口的SQL语句数不随数据量增长（防止N+1查询回归）
+
+在临时SQLite数据库中写入N条分析结果，通过真实路由请求/api/reports和
+/api/process/{file_id}/history，用before_cursor_execute统计每次请求执行的语句数。
+N增大时语句数必须保持不变，否则以非零状态退出。
+
+用法（在backend目录下）:
+    python benchmarks/check_query_counts.py [--sizes 5,50,500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from database import get_db
+from models import Base
+from api import process, report
+
+def seed(engine, size: int):
+    """写入size名候选人（各一条分析结果），以及一名有size条分析历史的候选人"""
+    start = datetime(2024, 1, 1)
+    history_id = size + 1
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO candidates (id, file_name, file_path) VALUES (:id, :name, :path)"),
+            [{"id": i, "name": f"resume_{i}.pdf", "path": f"uploads/{i}.pdf"} for i in range(1, history_id + 1)]
+        )
+        owners = list(range(1, size + 1)) + [history_id] * size
+        conn.execute(
+            text("INSERT INTO job_descriptions (id, candidate_id, job_description) VALUES (:id, :candidate_id, :jd)"),
+            [{"id": i, "candidate_id": owner, "jd": f"职位描述{i} Python"} for i, owner in enumerate(owners, 1)]
+        )
+        conn.execute(
+            text(
+                "INSERT INTO analysis_results (candidate_id, job_description_id, match_score, candidate_profile, created_at) "
+                "VALUES (:candidate_id, :jd_id, :score, :profile, :created_at)"
+            ),
+            [{
+                "candidate_id": owner,
+                "jd_id": i,
+                "score": float(i % 100),
+                "profile": '{"name": "候选人%d"}' % owner,
+                "created_at": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+            } for i, owner in enumerate(owners, 1)]
+        )
+    return history_id
+
+def count_statements(size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'check.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        history_id = seed(engine, size)
+
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(report.router)
+        app.include_router(process.router)
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        counts = {}
+        for name, url, expected_rows in (
+            ("reports", "/api/reports?limit=200", min(size + size, 200)),
+            ("history", f"/api/process/{history_id}/history", size),
+        ):
+            statements.clear()
+            response = client.get(url)
+            assert response.status_code == 200, f"{url}: HTTP {response.status_code} {response.text[:200]}"
+            body = response.json()
+            rows = body["reports"] if name == "reports" else body["history"]
+            assert len(rows) == expected_rows, f"{url}: 期望{expected_rows}条，实际{len(rows)}条"
+            counts[name] = len(statements)
+        engine.dispose()
+        return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="检查报告列表与分析历史的SQL语句数")
+    parser.add_argument("--sizes", default="5,50,500", help="逗号分隔的分析结果数")
+    args = parser.parse_args()
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+
+    results = {size: count_statements(size) for size in sizes}
+    print(f"  {'N':>6}{'/api/reports':>16}{'/history':>12}")
+    for size, counts in results.items():
+        print(f"  {size:>6}{counts['reports']:>16}{counts['history']:>12}")
+
+    failed = [
+        name for name in ("reports", "history")
+        if len({counts[name] for counts in results.values()}) != 1
+    ]
+    if failed:
+        print(f"❌ 语句数随数据量增长（可能出现N+1查询）: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ 语句数不随数据量增长")
+
+if __name__ == "__main__":
+    main()
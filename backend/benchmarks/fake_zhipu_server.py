@@ -0,0 +1,250 @@
+"""
+压测用的本地智谱API模拟服务
+
+兼容智谱/OpenAI的chat/completions接口（含stream流式输出），按提示词识别调用类型
+（简历解析、综合分析、面试问题、分析报告）并返回后端可以解析的内容，用于在不消耗真实配额的情况下
+观察后端在并发下的表现（限流、重试、熔断、对冲、任务队列）：
+- 延迟：首token延迟 + 输出token数 / 生成速度，整体乘以对数正态分布的随机因子，模拟长尾
+- 流式：按生成速度逐段输出，最后一段携带usage
+- 故障注入：按比例返回429（带Retry-After）和5xx；超过--max-concurrency时返回429，模拟服务端并发上限
+- token统计：按调用类型累计prompt/completion token，GET /stats查看，POST /stats/reset清零
+
+用法（在backend目录下）:
+    python benchmarks/fake_zhipu_server.py [--port 8100] [--ttft 0.5] [--tokens-per-second 80] \\
+        [--rate-429 0.02] [--rate-5xx 0.01] [--max-concurrency 50]
+
+后端启动时指向该服务：
+    USE_MOCK_AI=false ZHIPU_API_URL=http://127.0.0.1:8100/api/paas/v4/chat/completions uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from prompt_builder import estimate_tokens
+
+# 按提示词开头识别调用类型，与ai_client中各_build_*_messages的提示词对应
+KIND_MARKERS = [
+    ("parse", "请解析以下简历内容"),
+    ("analyze", "作为AI招聘专家"),
+    ("questions", "个性化的面试问题"),
+    ("report", "分析报告"),
+    ("match", "匹配度"),
+]
+
+SKILLS = ["Python", "Java", "Go", "Kafka", "Redis", "MySQL", "Kubernetes", "Docker", "React", "Vue", "Flink", "机器学习"]
+COMPANIES = ["腾讯", "阿里巴巴", "字节跳动", "美团", "京东", "网易"]
+
+def detect_kind(messages: List[Dict[str, Any]]) -> str:
+    text = " ".join(str(message.get("content", "")) for message in messages)
+    for kind, marker in KIND_MARKERS:
+        if marker in text:
+            return kind
+    return "default"
+
+def build_content(kind: str, rng: random.Random) -> str:
+    """生成与调用类型对应的返回内容，JSON结构与ai_client的解析逻辑一致"""
+    skills = rng.sample(SKILLS, 5)
+    if kind == "parse":
+        return json.dumps({
+            "name": f"候选人{rng.randint(1, 9999)}",
+            "contact_info": {"phone": "13800000000", "email": "candidate@example.com", "location": "北京"},
+            "summary": f"{rng.randint(2, 10)}年后端开发经验，熟悉{'、'.join(skills[:3])}",
+            "skills": skills,
+            "experience": [
+                {"company": company, "position": "高级工程师", "duration": "2020-2023",
+                 "description": f"负责核心服务开发，使用{rng.choice(skills)}完成性能优化"}
+                for company in rng.sample(COMPANIES, rng.randint(1, 3))
+            ],
+            "education": [{"degree": "本科", "major": "计算机科学", "school": "某大学", "year": "2018"}],
+            "projects": ["推荐系统重构", "实时数据平台"],
+            "certifications": []
+        }, ensure_ascii=False)
+    if kind in ("analyze", "match"):
+        matched = skills[:3]
+        return json.dumps({
+            "match_score": rng.randint(40, 95),
+            "skills_analysis": {
+                "required_skills": skills[:4], "candidate_skills": skills, "matched_skills": matched,
+                "missing_skills": skills[3:4], "skill_scores": {skill: float(rng.randint(50, 95)) for skill in skills}
+            },
+            "experience_analysis": {
+                "total_experience": float(rng.randint(1, 12)), "relevant_experience": float(rng.randint(1, 8)),
+                "company_count": rng.randint(1, 4), "position_progression": ["工程师", "高级工程师"],
+                "industry_experience": ["互联网"]
+            },
+            "education_analysis": {
+                "degree_level": "本科", "major": "计算机科学", "school": "某大学",
+                "graduation_year": 2018, "education_score": 80.0
+            },
+            "strengths": [f"熟练掌握{skill}" for skill in matched],
+            "weaknesses": [f"缺少{skills[3]}经验"],
+            "potential": "具备较好的成长潜力"
+        }, ensure_ascii=False)
+    if kind == "questions":
+        return json.dumps([f"请介绍一个您使用{rng.choice(skills)}解决性能问题的项目？" for _ in range(10)], ensure_ascii=False)
+    paragraphs = [f"## 候选人分析报告\n\n候选人熟悉{'、'.join(skills)}。"]
+    for index in range(rng.randint(6, 12)):
+        paragraphs.append(f"### 第{index + 1}部分\n\n候选人在{rng.choice(COMPANIES)}负责{rng.choice(skills)}相关工作，"
+                          "具备独立设计与交付能力，建议在面试中进一步考察系统设计与团队协作。")
+    return "\n\n".join(paragraphs)
+
+class FakeZhipuState:
+    """模拟服务的配置与统计"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.peak_in_flight = self.in_flight
+        self.requests: Dict[str, int] = {}
+        self.responses: Dict[str, int] = {}
+        self.tokens: Dict[str, Dict[str, int]] = {}
+
+    def count_response(self, status: int):
+        key = str(status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def count_tokens(self, kind: str, prompt_tokens: int, completion_tokens: int):
+        stats = self.tokens.setdefault(kind, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+
+    def generation_time(self, completion_tokens: int) -> float:
+        """首token延迟 + 生成耗时，乘以中位数为1的对数正态随机因子"""
+        base = self.args.ttft + completion_tokens / self.args.tokens_per_second
+        return base * self.rng.lognormvariate(0, self.args.sigma) * self.args.time_scale
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at
+        total = sum(self.responses.values())
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "requests": self.requests,
+            "responses": self.responses,
+            "requests_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "tokens": self.tokens
+        }
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI(title="Fake Zhipu API")
+    state = FakeZhipuState(args)
+
+    def error_response(status: int, message: str, retry_after: float = None) -> JSONResponse:
+        state.count_response(status)
+        headers = {"Retry-After": f"{retry_after:g}"} if retry_after is not None else None
+        return JSONResponse({"error": {"code": str(status), "message": message}}, status_code=status, headers=headers)
+
+    @app.post("/api/paas/v4/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        kind = detect_kind(messages)
+        state.requests[kind] = state.requests.get(kind, 0) + 1
+
+        # 故障注入：返回前先等待一小段时间，模拟网关处理
+        roll = state.rng.random()
+        if state.in_flight >= args.max_concurrency > 0:
+            await asyncio.sleep(0.01 * args.time_scale)
+            return error_response(429, "并发数超过限制", args.retry_after)
+        if roll < args.rate_429:
+            await asyncio.sleep(0.05 * args.time_scale)
+            return error_response(429, "请求频率超过限制", args.retry_after)
+        if roll < args.rate_429 + args.rate_5xx:
+            await asyncio.sleep(state.generation_time(0))
+            return error_response(state.rng.choice((500, 502, 503)), "服务内部错误")
+
+        content = build_content(kind, state.rng)
+        prompt_tokens = sum(estimate_tokens(str(message.get("content", ""))) + 4 for message in messages)
+        completion_tokens = estimate_tokens(content)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        duration = state.generation_time(completion_tokens)
+
+        state.in_flight += 1
+        state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+
+        if not body.get("stream"):
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                state.in_flight -= 1
+            state.count_tokens(kind, prompt_tokens, completion_tokens)
+            state.count_response(200)
+            return {
+                "id": f"fake-{time.monotonic_ns()}",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                "usage": usage
+            }
+
+        async def event_stream():
+            try:
+                # 首token延迟后按固定大小分段输出，段间隔均分剩余的生成时间
+                ttft = min(duration, args.ttft * args.time_scale)
+                await asyncio.sleep(ttft)
+                pieces = [content[i:i + args.chunk_chars] for i in range(0, len(content), args.chunk_chars)]
+                interval = (duration - ttft) / max(1, len(pieces))
+                for piece in pieces:
+                    chunk = {"choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}}]}
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    await asyncio.sleep(interval)
+                final = {"choices": [{"index": 0, "finish_reason": "stop", "delta": {}}], "usage": usage}
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+                state.count_tokens(kind, prompt_tokens, completion_tokens)
+            finally:
+                state.in_flight -= 1
+
+        state.count_response(200)
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        """请求数、响应状态码分布、并发峰值与各调用类型的token用量"""
+        return state.stats()
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        state.reset()
+        return {"message": "统计已清零"}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="压测用的本地智谱API模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft", type=float, default=0.5, help="首token延迟（秒）")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="输出token生成速度")
+    parser.add_argument("--sigma", type=float, default=0.35, help="延迟随机因子的对数正态sigma，越大长尾越重")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="所有延迟的缩放倍数，小于1时加速压测")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="随机返回429的比例")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="随机返回5xx的比例")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429响应的Retry-After（秒）")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="服务端并发上限，超过时返回429，0表示不限制")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="流式输出每段的字符数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    print(f"🧪 模拟智谱API: http://{args.host}:{args.port}/api/paas/v4/chat/completions")
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+端到端压测：按真实使用流程并发请求后端
+
+每个流程依次执行：上传简历 → 等待后台解析完成 → 提交分析任务并等待完成 → 生成面试问题 → 流式获取分析报告，
+在不同并发数下统计流程吞吐量、各步骤的p50/p95/p99耗时和错误率。
+每份简历内容不同，避免命中上传去重和结果缓存；大模型调用可以指向benchmarks/fake_zhipu_server.py。
+
+用法（在backend目录下，分别启动三个进程）:
+    python benchmarks/fake_zhipu_server.py --rate-429 0.02 --rate-5xx 0.01
+    USE_MOCK_AI=false ZHIPU_API_URL=http://127.0.0.1:8100/api/paas/v4/chat/completions uvicorn main:app
+    python benchmarks/load_test.py [--base-url http://127.0.0.1:8000] [--concurrency 1,4,16] [--flows 20] \\
+        [--fake-url http://127.0.0.1:8100]
+
+后端默认按ZHIPU_RPM_LIMIT/ZHIPU_TPM_LIMIT限流，只想观察并发能力时可设为0。
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx
+import httpx
+
+STEPS = ["upload", "parse", "analysis", "questions", "report_ttfb", "report", "flow"]
+SKILLS = ["Python", "Java", "Go", "Kafka", "Redis", "MySQL", "Kubernetes", "Docker", "React", "Vue", "Flink", "机器学习"]
+COMPANIES = ["腾讯", "阿里巴巴", "字节跳动", "美团", "京东", "网易"]
+JOB_DESCRIPTIONS = [
+    "招聘高级后端工程师，要求熟悉Go和Kubernetes，有高并发服务经验",
+    "招聘数据开发工程师，要求熟悉Kafka、Flink和Python，有实时计算平台经验",
+    "招聘全栈工程师，要求熟悉React、Vue和Java，有大型互联网公司经验",
+]
+
+class StepFailed(Exception):
+    """流程中的某个步骤失败"""
+
+    def __init__(self, step: str, message: str):
+        super().__init__(f"{step}: {message}")
+        self.step = step
+
+def build_resume(rng: random.Random, index: int) -> bytes:
+    """生成内容互不相同的DOCX简历"""
+    document = docx.Document()
+    skills = rng.sample(SKILLS, 5)
+    document.add_paragraph(f"候选人{index}-{rng.getrandbits(32):08x}")
+    document.add_paragraph(f"专业技能：{'、'.join(skills)}")
+    document.add_paragraph("工作经历")
+    for company in rng.sample(COMPANIES, rng.randint(2, 4)):
+        document.add_paragraph(f"{company} 高级工程师 负责核心系统设计与开发，使用{rng.choice(skills)}完成性能优化。")
+    document.add_paragraph("教育背景：某大学 计算机科学 本科")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """第q百分位（最近邻法），与latency.LatencyTracker一致"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+def check(response: httpx.Response, step: str) -> Dict[str, Any]:
+    if response.status_code >= 400:
+        raise StepFailed(step, f"HTTP {response.status_code} {response.text[:200]}")
+    return response.json()
+
+async def wait_until(step: str, poll, interval: float, timeout: float) -> Dict[str, Any]:
+    """轮询poll()直到返回非None，超时视为失败"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = await poll()
+        if result is not None:
+            return result
+        await asyncio.sleep(interval)
+    raise StepFailed(step, f"超过{timeout:g}秒未完成")
+
+async def run_flow(client: httpx.AsyncClient, resume: bytes, index: int, args: argparse.Namespace,
+                   timings: Dict[str, List[float]]):
+    """执行一次完整流程，各步骤耗时写入timings，失败时抛出StepFailed"""
+    flow_started = time.monotonic()
+
+    async def timed(step: str, awaitable):
+        started = time.monotonic()
+        result = await awaitable
+        timings[step].append(time.monotonic() - started)
+        return result
+
+    async def upload():
+        response = await client.post("/api/upload", files={
+            "file": (f"resume_{index}.docx", resume,
+                     "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        })
+        return check(response, "upload")
+
+    file_id = (await timed("upload", upload()))["file_id"]
+
+    async def parsed():
+        info = check(await client.get(f"/api/file/{file_id}"), "parse")
+        if info["parse_status"] == "failed":
+            raise StepFailed("parse", "简历解析失败")
+        return info if info["parse_status"] == "parsed" else None
+
+    await timed("parse", wait_until("parse", parsed, args.poll_interval, args.step_timeout))
+
+    async def analysis():
+        job = check(await client.post("/api/process", json={
+            "file_id": file_id, "job_description": JOB_DESCRIPTIONS[index % len(JOB_DESCRIPTIONS)], "stream_report": True
+        }), "analysis")
+
+        async def finished():
+            status = check(await client.get(f"/api/jobs/{job['job_id']}"), "analysis")
+            if status["status"] == "failed":
+                raise StepFailed("analysis", status.get("error") or "分析任务失败")
+            return status if status["status"] == "completed" else None
+
+        return await wait_until("analysis", finished, args.poll_interval, args.step_timeout)
+
+    await timed("analysis", analysis())
+
+    async def questions():
+        return check(await client.post(f"/api/process/{file_id}/generate-questions"), "questions")
+
+    await timed("questions", questions())
+
+    started = time.monotonic()
+    first_chunk = None
+    async with client.stream("GET", f"/api/process/{file_id}/report-stream") as response:
+        if response.status_code >= 400:
+            raise StepFailed("report", f"HTTP {response.status_code}")
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                if event == "error":
+                    raise StepFailed("report", json.loads(line[len("data:"):]).get("message", "报告生成失败"))
+                if event == "chunk" and first_chunk is None:
+                    first_chunk = time.monotonic() - started
+    if first_chunk is not None:
+        timings["report_ttfb"].append(first_chunk)
+    timings["report"].append(time.monotonic() - started)
+    timings["flow"].append(time.monotonic() - flow_started)
+
+async def run_level(args: argparse.Namespace, concurrency: int, rng: random.Random) -> Dict[str, Any]:
+    """以concurrency个并发流程执行args.flows次流程"""
+    timings: Dict[str, List[float]] = {step: [] for step in STEPS}
+    errors: Dict[str, int] = {}
+    resumes = [build_resume(rng, index) for index in range(args.flows)]
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(args.flows):
+        queue.put_nowait(index)
+
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.step_timeout, limits=limits) as client:
+        async def worker():
+            while not queue.empty():
+                index = queue.get_nowait()
+                try:
+                    await run_flow(client, resumes[index], index, args, timings)
+                except StepFailed as e:
+                    errors[e.step] = errors.get(e.step, 0) + 1
+                    if args.verbose:
+                        print(f"  ⚠️ 流程{index}失败: {e}")
+                except httpx.HTTPError as e:
+                    errors["http"] = errors.get("http", 0) + 1
+                    if args.verbose:
+                        print(f"  ⚠️ 流程{index}请求异常: {type(e).__name__}: {e}")
+
+        started = time.monotonic()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.monotonic() - started
+
+    return {"timings": timings, "errors": errors, "elapsed": elapsed}
+
+async def fetch_json(url: str, method: str = "GET") -> Optional[Dict[str, Any]]:
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.request(method, url)
+            return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+def print_level(concurrency: int, flows: int, result: Dict[str, Any], fake_stats: Optional[Dict[str, Any]]):
+    timings, errors, elapsed = result["timings"], result["errors"], result["elapsed"]
+    succeeded = len(timings["flow"])
+    failed = sum(errors.values())
+    print(f"\n并发 {concurrency}: {flows} 个流程，耗时 {elapsed:.1f} 秒，"
+          f"吞吐量 {succeeded / elapsed:.2f} 流程/秒，错误率 {failed / flows:.1%}")
+    print(f"  {'步骤':<12}{'成功数':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for step in STEPS:
+        samples = timings[step]
+        if not samples:
+            continue
+        print(f"  {step:<12}{len(samples):>8}" + "".join(
+            f"{percentile(samples, q) * 1000:>10.0f}" for q in (50, 95, 99)
+        ))
+    if errors:
+        print("  失败步骤: " + ", ".join(f"{step}={count}" for step, count in sorted(errors.items())))
+    if fake_stats:
+        tokens = sum(stats["prompt_tokens"] + stats["completion_tokens"] for stats in fake_stats["tokens"].values())
+        print(f"  模拟API: 请求 {sum(fake_stats['requests'].values())} 次 {fake_stats['requests']}，"
+              f"响应 {fake_stats['responses']}，并发峰值 {fake_stats['peak_in_flight']}，token {tokens:,}")
+
+async def main_async(args: argparse.Namespace):
+    health = await fetch_json(f"{args.base_url}/health")
+    if health is None:
+        print(f"❌ 后端未启动: {args.base_url}")
+        sys.exit(1)
+    print(f"🎯 后端: {args.base_url}（{health.get('app_name')} v{health.get('version')}）")
+
+    rng = random.Random(args.seed)
+    for concurrency in args.concurrency:
+        if args.fake_url:
+            await fetch_json(f"{args.fake_url}/stats/reset", method="POST")
+        result = await run_level(args, concurrency, rng)
+        fake_stats = await fetch_json(f"{args.fake_url}/stats") if args.fake_url else None
+        print_level(concurrency, args.flows, result, fake_stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端压测：上传 → 解析 → 分析 → 面试问题 → 流式报告")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="后端地址")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        type=lambda value: [int(item) for item in value.split(",") if item.strip()],
+                        help="逗号分隔的并发数，逐个执行")
+    parser.add_argument("--flows", type=int, default=20, help="每个并发数下执行的流程数")
+    parser.add_argument("--fake-url", default=None, help="模拟智谱API地址，提供时每轮清零并输出其统计")
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="轮询解析状态与任务状态的间隔（秒）")
+    parser.add_argument("--step-timeout", type=float, default=300, help="单个步骤的超时（秒）")
+    parser.add_argument("--seed", type=int, default=11, help="随机种子")
+    parser.add_argument("--verbose", action="store_true", help="输出每个失败流程的原因")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
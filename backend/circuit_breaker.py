@@ -0,0 +1,57 @@
+"""
+熔断器
+
+连续失败达到阈值后进入熔断状态，期间的请求直接失败，不再等待超时和重试；
+经过冷却时间后放行一个探测请求，成功则恢复，失败则继续熔断。
+"""
+import time
+from typing import Optional
+
+class CircuitOpenError(Exception):
+    """熔断期间拒绝请求"""
+
+class CircuitBreaker:
+    """连续失败计数的熔断器（在事件循环中使用，不需要加锁）"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """closed: 正常; open: 熔断中; half_open: 冷却结束，等待探测请求"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_request(self):
+        """请求前调用，熔断中抛出CircuitOpenError"""
+        if self.failure_threshold <= 0 or self.opened_at is None:
+            return
+        now = time.monotonic()
+        remaining = self.reset_timeout - (now - self.opened_at)
+        if remaining > 0:
+            raise CircuitOpenError(f"{self.name}暂时不可用（熔断中），请{remaining:.0f}秒后重试")
+        # 放行一个探测请求，并重新计时：探测结果出来前其余请求继续快速失败
+        self.opened_at = now
+
+    def record_success(self):
+        if self.opened_at is not None:
+            print(f"✅ {self.name}恢复，熔断关闭")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failure_threshold <= 0:
+            return
+        # 探测请求失败或连续失败达到阈值时（重新）进入熔断
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                print(f"⛔ {self.name}连续失败{self.failures}次，熔断{self.reset_timeout:g}秒")
+            self.opened_at = time.monotonic()
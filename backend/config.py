@@ -8,19 +8,94 @@ load_dotenv()
 
 # 智谱清言API配置
 ZHIPU_API_KEY = os.getenv("ZHIPU_API_KEY", "your_zhipu_api_key_here")
-ZHIPU_API_URL = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+ZHIPU_API_URL = os.getenv("ZHIPU_API_URL", "https://open.bigmodel.cn/api/paas/v4/chat/completions")  # 压测时可指向benchmarks/fake_zhipu_server.py
+ZHIPU_MODEL = os.getenv("ZHIPU_MODEL", "glm-4.5")
+ZHIPU_RPM_LIMIT = int(os.getenv("ZHIPU_RPM_LIMIT", "60"))  # 每分钟最大请求数，0表示不限制
+ZHIPU_TPM_LIMIT = int(os.getenv("ZHIPU_TPM_LIMIT", "200000"))  # 每分钟最大token数，0表示不限制
+ZHIPU_MAX_RETRIES = int(os.getenv("ZHIPU_MAX_RETRIES", "3"))  # 429/5xx/网络错误的最大重试次数
+ZHIPU_RETRY_BASE_DELAY = float(os.getenv("ZHIPU_RETRY_BASE_DELAY", "1"))  # 退避基准时间（秒）
+ZHIPU_RETRY_MAX_DELAY = float(os.getenv("ZHIPU_RETRY_MAX_DELAY", "30"))  # 单次重试最长等待（秒）
+ZHIPU_BREAKER_FAILURES = int(os.getenv("ZHIPU_BREAKER_FAILURES", "5"))  # 连续失败多少次后熔断
+ZHIPU_BREAKER_RESET_TIMEOUT = float(os.getenv("ZHIPU_BREAKER_RESET_TIMEOUT", "30"))  # 熔断后多久放行探测请求（秒）
 
 # 数据库配置
 import os
 db_dir = os.getenv("DB_DIR", "db")
 os.makedirs(db_dir, exist_ok=True)
-DATABASE_URL = f"sqlite:///{os.path.join(db_dir, 'recruitment_assistant.db')}"
+DB_TYPE = os.getenv("DB_TYPE", "sqlite").lower()  # sqlite 或 mysql
+if os.getenv("DATABASE_URL"):
+    DATABASE_URL = os.getenv("DATABASE_URL")
+elif DB_TYPE == "mysql":
+    from config_mysql import DATABASE_URL
+else:
+    DATABASE_URL = f"sqlite:///{os.path.join(db_dir, 'recruitment_assistant.db')}"
+
+# 数据库连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # 秒
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # 秒，需小于MySQL的wait_timeout
+
+# SQLite调优配置
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # 64MB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256MB
+
+# 大模型结果缓存配置
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.path.join(db_dir, "llm_cache.db")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # 默认30天
+
+# 简历向量索引（语义检索）配置
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(db_dir, "resume_vectors"))
+VECTOR_DIM = int(os.getenv("VECTOR_DIM", "512"))  # 向量维度，修改后启动时自动重建索引
+VECTOR_RERANK_CANDIDATES = int(os.getenv("VECTOR_RERANK_CANDIDATES", "300"))  # 按向量取出多少候选再精确重排
+
+# 技能位图索引：记录生成候选人技能时所用技能库的指纹，技能库变化后启动时重新提取
+SKILL_TAXONOMY_STATE_PATH = os.path.join(db_dir, "skill_taxonomy.json")
 
 # 文件上传配置
 UPLOAD_DIR = "uploads"
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 256 * 1024  # 上传文件分块写入大小（256KB）
+BATCH_UPLOAD_MAX_FILES = int(os.getenv("BATCH_UPLOAD_MAX_FILES", "500"))  # 批量上传单次最多文件数
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc"}
 
+# 简历文本提取进程池配置
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "60"))  # 单个文件提取超时（秒）
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50"))  # 工作进程处理多少个文件后重启，0表示不重启
+
+# 分析任务队列配置
+ANALYSIS_WORKER_COUNT = int(os.getenv("ANALYSIS_WORKER_COUNT", "4"))
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))  # 服务重启时中断的任务最多执行次数，超过后标记为失败
+
+# 分析任务截止时间（秒）：整个任务的总预算，以及各阶段的上限（实际取两者中较小的剩余时间）
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE", "180"))
+ANALYSIS_STAGE_DEADLINES = {
+    "parse": float(os.getenv("ANALYSIS_PARSE_DEADLINE", "60")),
+    "analyze": float(os.getenv("ANALYSIS_ANALYZE_DEADLINE", "90")),
+    "report": float(os.getenv("ANALYSIS_REPORT_DEADLINE", "90")),
+    "questions": float(os.getenv("ANALYSIS_QUESTIONS_DEADLINE", "60")),
+}
+
+# 提示词token预算（本地估算）：原始简历文本、结构化简历、职位描述，以及超出预算时完整保留的最近工作经历数
+PROMPT_RESUME_TEXT_BUDGET = int(os.getenv("PROMPT_RESUME_TEXT_BUDGET", "6000"))
+PROMPT_RESUME_DATA_BUDGET = int(os.getenv("PROMPT_RESUME_DATA_BUDGET", "2500"))
+PROMPT_JD_BUDGET = int(os.getenv("PROMPT_JD_BUDGET", "1500"))
+PROMPT_RECENT_JOBS = int(os.getenv("PROMPT_RECENT_JOBS", "2"))
+
+# 大模型对冲请求：单次调用超过同类调用的p95耗时仍未返回时，发出一个相同的备用请求
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # 样本不足时不对冲
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))  # 对冲延迟下限（秒）
+
+# 批量筛选配置
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+
 # 应用配置
 APP_NAME = "AI招聘筛选助手"
 APP_VERSION = "1.0.0"
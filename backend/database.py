@@ -1,24 +1,107 @@
 """
 数据库配置和连接
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.orm import sessionmaker
 from models import Base
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE
+)
+from migrations import run_migrations
+from metrics import stage_duration, stage_results
 import os
+import time
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新建的SQLite连接都设置一次PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL模式下读写互不阻塞，写入只在提交时短暂持锁
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # WAL模式下NORMAL已能保证数据库一致性，只在断电时可能丢失最近提交
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # 负数表示以KB为单位
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+def create_db_engine(database_url: str = DATABASE_URL) -> Engine:
+    """根据数据库类型创建带连接池的数据库引擎"""
+    url = make_url(database_url)
+
+    if url.get_backend_name() == "sqlite":
+        pool_options = {}
+        if url.database and url.database != ":memory:":
+            # 文件数据库使用QueuePool；内存数据库沿用SQLAlchemy默认的单连接池
+            pool_options = {
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout": DB_POOL_TIMEOUT
+            }
+        engine = create_engine(
+            database_url,
+            connect_args={
+                "check_same_thread": False,  # 连接会在线程池与事件循环之间传递
+                "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000
+            },
+            **pool_options
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    return create_engine(
+        database_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,  # 避免使用已被MySQL服务端断开的空闲连接
+        pool_pre_ping=True
+    )
 
 # 创建数据库引擎
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite需要这个参数
-)
+engine = create_db_engine()
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 记录每次提交（含提交前的flush）的耗时
+@event.listens_for(SessionLocal, "before_commit")
+def _commit_started(session):
+    session.info["commit_started"] = time.monotonic()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _commit_finished(session):
+    _observe_commit(session, "success")
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _commit_rolled_back(session):
+    _observe_commit(session, "error")
+
+def _observe_commit(session, outcome: str):
+    started = session.info.pop("commit_started", None)
+    if started is None:
+        # 显式rollback或未经过提交的会话
+        return
+    stage_duration.observe(time.monotonic() - started, stage="db_commit")
+    stage_results.inc(stage="db_commit", outcome=outcome)
+
 def create_tables():
-    """创建数据库表"""
+    """创建数据库表，并对已有数据库执行结构迁移"""
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 def get_db():
     """获取数据库会话"""
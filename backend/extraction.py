@@ -0,0 +1,86 @@
+"""
+简历文本提取进程池
+
+PyPDF2/python-docx的解析是纯CPU操作，放在事件循环里会阻塞所有请求。
+这里把提取任务交给有界的进程池执行，并为每个文件设置超时：
+超时或工作进程崩溃时终止整个进程池并重建，避免异常文件拖垮主进程。
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from config import EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, EXTRACTION_MAX_TASKS_PER_CHILD
+from utils import extract_text_from_file, clean_text
+from metrics import track_stage
+
+class ExtractionTimeout(Exception):
+    """文本提取超时"""
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop = None
+
+def _extract_and_clean(file_path: str) -> str:
+    """在工作进程中执行：提取并清理文本"""
+    return clean_text(extract_text_from_file(file_path))
+
+def get_extraction_executor() -> ProcessPoolExecutor:
+    """获取文本提取进程池（首次调用时创建）"""
+    global _executor
+    if _executor is None:
+        # 使用spawn启动，避免fork带有线程和数据库连接的主进程
+        _executor = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=EXTRACTION_MAX_TASKS_PER_CHILD or None
+        )
+    return _executor
+
+def _get_slots() -> asyncio.Semaphore:
+    """限制同时提交到进程池的文件数，使超时只计算实际执行时间而不包括排队时间"""
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(EXTRACTION_WORKERS)
+        _slots_loop = loop
+    return _slots
+
+def _reset_executor(executor: ProcessPoolExecutor):
+    """终止进程池中的所有工作进程并丢弃该进程池，下次调用时重建"""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    # ProcessPoolExecutor无法取消正在运行的任务，只能直接终止工作进程
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+async def extract_text_async(file_path: str, timeout: float = EXTRACTION_TIMEOUT) -> str:
+    """在进程池中提取并清理简历文本，超时抛出ExtractionTimeout"""
+    loop = asyncio.get_running_loop()
+
+    async with _get_slots():
+        # 耗时从拿到并发名额开始计算，不含排队等待
+        with track_stage("text_extraction"):
+            # 进程池可能因其他文件超时被重建，对本文件重试一次
+            for attempt in range(2):
+                executor = get_extraction_executor()
+                try:
+                    future = loop.run_in_executor(executor, _extract_and_clean, file_path)
+                    return await asyncio.wait_for(future, timeout=timeout)
+                except asyncio.TimeoutError:
+                    _reset_executor(executor)
+                    raise ExtractionTimeout(f"文本提取超时（超过{timeout:g}秒）")
+                except BrokenProcessPool:
+                    _reset_executor(executor)
+                    if attempt == 1:
+                        raise Exception("文本提取进程异常退出")
+
+def shutdown_extraction_executor():
+    """应用关闭时释放进程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,198 @@
+"""
+分析任务队列
+
+/api/process提交的分析任务先写入analysis_jobs表，由常驻的worker协程依次领取执行。
+任务状态持久化在数据库中，服务重启后未完成的任务会重新入队。
+"""
+import asyncio
+from typing import List, Optional
+from sqlalchemy.sql import func
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal
+from models import AnalysisJob, Candidate
+from ai_client import get_ai_client
+from analysis_pipeline import run_analysis
+from metrics import analysis_jobs
+from config import ANALYSIS_WORKER_COUNT, ANALYSIS_MAX_ATTEMPTS
+
+# 各阶段对应的进度百分比
+STAGE_PROGRESS = {
+    "queued": 0,
+    "parse": 10,
+    "analyze": 30,
+    "chart": 70,
+    "report": 80,
+    "done": 100
+}
+
+def job_status(job: AnalysisJob) -> dict:
+    """构建任务状态信息"""
+    return {
+        "job_id": job.id,
+        "candidate_id": job.candidate_id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": STAGE_PROGRESS.get(job.stage, 0),
+        "analysis_id": job.analysis_id,
+        "error": job.error,
+        "stage_timings": job.stage_timings or {},
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+class AnalysisJobQueue:
+    """基于数据库表的持久化任务队列，worker协程在同一事件循环中并发执行任务"""
+
+    def __init__(self, worker_count: int):
+        self.worker_count = worker_count
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """恢复中断的任务并启动worker"""
+        self._wakeup = asyncio.Event()
+        await run_in_threadpool(self._recover_interrupted_jobs)
+        for index in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._worker(index)))
+        print(f"🧵 分析任务队列已启动，worker数量: {self.worker_count}")
+
+    async def stop(self):
+        """停止所有worker，正在执行的任务会在下次启动时重新入队"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def enqueue(self, candidate_id: int, job_description: str, generate_report: bool = True) -> AnalysisJob:
+        """提交分析任务"""
+        db = SessionLocal()
+        try:
+            job = AnalysisJob(
+                candidate_id=candidate_id,
+                job_description=job_description,
+                generate_report=generate_report,
+                status="queued",
+                stage="queued",
+                attempts=0
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+        finally:
+            db.close()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def _recover_interrupted_jobs(self):
+        """服务重启前处于running状态的任务重新入队，已达到最大执行次数的标记为失败（避免导致崩溃的任务无限重试）"""
+        db = SessionLocal()
+        try:
+            interrupted = db.query(AnalysisJob).filter(AnalysisJob.status == "running")
+            failed = interrupted.filter(AnalysisJob.attempts >= ANALYSIS_MAX_ATTEMPTS).update({
+                AnalysisJob.status: "failed",
+                AnalysisJob.error: f"任务执行{ANALYSIS_MAX_ATTEMPTS}次均被中断，不再重试",
+                AnalysisJob.finished_at: func.now()
+            }, synchronize_session=False)
+            count = interrupted.update(
+                {AnalysisJob.status: "queued", AnalysisJob.stage: "queued"}, synchronize_session=False
+            )
+            db.commit()
+            if count:
+                print(f"🔁 恢复中断的分析任务: {count}个")
+            if failed:
+                print(f"⚠️ 中断次数过多，标记为失败的分析任务: {failed}个")
+                analysis_jobs.inc(failed, status="failed")
+        finally:
+            db.close()
+
+    def _claim_next(self) -> Optional[int]:
+        """领取最早的排队任务，通过条件更新保证同一任务只被领取一次"""
+        db = SessionLocal()
+        try:
+            while True:
+                job_id = db.query(AnalysisJob.id).filter(
+                    AnalysisJob.status == "queued"
+                ).order_by(AnalysisJob.id).limit(1).scalar()
+                if job_id is None:
+                    return None
+
+                claimed = db.query(AnalysisJob).filter(
+                    AnalysisJob.id == job_id,
+                    AnalysisJob.status == "queued"
+                ).update({
+                    AnalysisJob.status: "running",
+                    AnalysisJob.started_at: func.now(),
+                    AnalysisJob.attempts: AnalysisJob.attempts + 1
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return job_id
+        finally:
+            db.close()
+
+    async def _worker(self, index: int):
+        """worker主循环：有任务时执行，没有任务时等待唤醒（兼顾定时轮询）"""
+        while True:
+            try:
+                # 领取任务是同步的数据库读写，在线程池中执行以免阻塞事件循环
+                job_id = await run_in_threadpool(self._claim_next)
+            except Exception as e:
+                print(f"领取分析任务失败: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job_id)
+
+    async def _run_job(self, job_id: int):
+        """执行单个分析任务"""
+        db = SessionLocal()
+        try:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+
+            def on_stage(stage: str):
+                job.stage = stage
+                db.commit()
+
+            timings = {}
+
+            try:
+                candidate = db.query(Candidate).filter(Candidate.id == job.candidate_id).first()
+                if not candidate or not candidate.resume_content:
+                    raise ValueError("候选人不存在或简历内容为空")
+
+                print(f"🚀 开始执行分析任务: job_id={job_id}")
+                analysis = await run_analysis(
+                    db, candidate, job.job_description, get_ai_client(),
+                    generate_report=job.generate_report is not False,
+                    on_stage=on_stage,
+                    timings=timings
+                )
+
+                job.status = "completed"
+                job.stage = "done"
+                job.analysis_id = analysis.id
+                print(f"🎉 分析任务完成: job_id={job_id}")
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+                print(f"分析任务失败: job_id={job_id}, {e}")
+
+            job.stage_timings = timings
+            job.finished_at = func.now()
+            db.commit()
+            analysis_jobs.inc(status=job.status)
+        finally:
+            db.close()
+
+analysis_job_queue = AnalysisJobQueue(ANALYSIS_WORKER_COUNT)
@@ -0,0 +1,86 @@
+"""
+延迟统计与对冲请求
+
+- LatencyTracker：按名称保留最近的耗时样本并计算分位数。大模型调用按调用类型记录，
+  用于推导对冲延迟；分析任务按阶段记录，用于观察各阶段耗时分布
+- run_hedged：主请求超过对冲延迟仍未返回时，再发出一个相同的备用请求，取先成功返回的结果
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+class LatencyTracker:
+    """按名称保存最近window个耗时样本（秒）"""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, name: str, seconds: float):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def sample_count(self, name: str) -> int:
+        return len(self._samples.get(name, ()))
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """第q百分位耗时（最近邻法），没有样本时返回None"""
+        samples = self._samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各名称的样本数与p50/p95/p99（毫秒）"""
+        return {
+            name: {
+                "count": len(samples),
+                "p50_ms": round(self.percentile(name, 50) * 1000, 1),
+                "p95_ms": round(self.percentile(name, 95) * 1000, 1),
+                "p99_ms": round(self.percentile(name, 99) * 1000, 1),
+            }
+            for name, samples in self._samples.items() if samples
+        }
+
+# 大模型单次调用耗时（按调用类型）与分析任务各阶段耗时
+llm_latency = LatencyTracker()
+stage_latency = LatencyTracker()
+
+# 对冲请求统计：发出的备用请求数、备用请求先返回的次数
+hedge_stats = {"sent": 0, "won": 0}
+
+async def run_hedged(factory: Callable[[], Awaitable[Any]], delay: float) -> Any:
+    """执行factory()，超过delay秒未返回时再执行一次，返回先成功的结果并取消另一个
+
+    主请求在delay之前失败时直接抛出异常（重试由调用方负责），两个请求都失败时抛出最后一个异常。
+    """
+    primary = asyncio.ensure_future(factory())
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return primary.result()
+
+        backup = asyncio.ensure_future(factory())
+        tasks.append(backup)
+        hedge_stats["sent"] += 1
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        hedge_stats["won"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
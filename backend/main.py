@@ -4,10 +4,22 @@ FastAPI主应用
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from database import init_database
 from config import APP_NAME, APP_VERSION, CORS_ORIGINS
-from api import upload, process, report
+from api import upload, process, report, batch, jobs, search, match, skills
+from ai_client import close_async_http_client
+from llm_cache import get_llm_cache
+from latency import llm_latency, stage_latency, hedge_stats
+from prompt_builder import token_usage
+from metrics import CONTENT_TYPE_LATEST, RequestMetricsMiddleware, render_metrics
+from job_queue import analysis_job_queue
+from extraction import shutdown_extraction_executor
+from resume_pipeline import resume_unfinished_uploads
+from vector_index import sync_vector_index
+from skill_index import load_skill_index
+from utils import run_in_background
+from starlette.concurrency import run_in_threadpool
 import os
 
 # 创建FastAPI应用
@@ -28,10 +40,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 按路由模板记录请求耗时（最外层，包含CORS处理）
+app.add_middleware(RequestMetricsMiddleware)
+
 # 包含API路由
 app.include_router(upload.router)
 app.include_router(process.router)
 app.include_router(report.router)
+app.include_router(batch.router)
+app.include_router(jobs.router)
+app.include_router(search.router)
+app.include_router(match.router)
+app.include_router(skills.router)
 
 # 创建uploads目录
 os.makedirs("uploads", exist_ok=True)
@@ -46,8 +66,21 @@ async def startup_event():
     init_database()
     print("✅ 数据库初始化完成")
     print("📁 文件上传目录已创建")
+    await analysis_job_queue.start()
+    batch.resume_unfinished_screening_jobs()
+    resume_unfinished_uploads()
+    # 向量索引对账（首次启动时全量构建）与技能索引加载在线程池中执行，不阻塞启动
+    run_in_background(run_in_threadpool(sync_vector_index), "sync_vector_index")
+    run_in_background(run_in_threadpool(load_skill_index), "load_skill_index")
     print("🌐 API文档地址: http://localhost:8000/docs")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭事件"""
+    await analysis_job_queue.stop()
+    await close_async_http_client()
+    shutdown_extraction_executor()
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """根路径，返回简单的欢迎页面"""
@@ -95,6 +128,29 @@ async def health_check():
         "message": "服务运行正常"
     }
 
+@app.get("/api/cache/stats")
+async def llm_cache_stats():
+    """大模型结果缓存命中统计"""
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/api/llm/stats")
+async def llm_usage_stats():
+    """大模型调用统计：各调用类型的token用量、耗时分位数、对冲请求与分析阶段耗时"""
+    return {
+        "tokens": token_usage.stats(),
+        "latency": llm_latency.summary(),
+        "hedge": dict(hedge_stats),
+        "stages": stage_latency.summary()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus抓取接口：阶段耗时、HTTP请求耗时、大模型调用、缓存命中与token用量等指标"""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """404错误处理"""
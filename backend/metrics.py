@@ -0,0 +1,331 @@
+"""
+Prometheus指标
+
+不依赖prometheus_client，由/metrics接口按Prometheus文本格式（0.0.4）输出：
+- Counter/Gauge/Histogram：带标签的计数器、仪表和直方图，由各模块在调用点更新
+- 回调指标：抓取时从已有的统计对象（结果缓存、token用量、对冲请求、熔断器）读取，不重复计数
+- track_stage/observe_stage：记录处理阶段（简历解析、综合分析、文本提取、数据库提交等）的耗时与结果
+- RequestMetricsMiddleware：按路由模板记录HTTP请求耗时，流式响应计到最后一段内容发送完毕
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# HTTP请求与大模型调用耗时分桶（秒）；处理阶段包含批量任务中的长耗时调用，上限更大
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+class MetricsRegistry:
+    """保存已注册的指标，按注册顺序输出"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标重复注册: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # 单个回调指标出错不影响其余指标的抓取
+                print(f"⚠️ 指标{metric.name}采集失败: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labelnames, labelvalues, value in samples:
+                lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or any(name not in labels for name in self.labelnames):
+            raise ValueError(f"{self.name}的标签应为{list(self.labelnames)}，实际为{sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels) -> Any:
+        """当前值（直方图为样本数），用于调试和基准测试"""
+        with self._lock:
+            value = self._values.get(self._key(labels), 0)
+        return value[-1] if isinstance(value, list) else value
+
+class Counter(_Metric):
+    """只增不减的计数器，输出时名称带_total后缀"""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total", self.labelnames, key, value
+
+class Gauge(_Metric):
+    """可增可减的当前值，如进行中的请求数"""
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+class Histogram(_Metric):
+    """累计分桶直方图，每组标签保存各桶计数、总和与样本数"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[MetricsRegistry] = REGISTRY):
+        if "le" in labelnames:
+            raise ValueError("直方图不能使用le标签")
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各桶计数..., 总和, 样本数]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        bucket_labels = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", bucket_labels, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_bucket", bucket_labels, key + ("+Inf",), state[-1]
+            yield f"{self.name}_sum", self.labelnames, key, state[-2]
+            yield f"{self.name}_count", self.labelnames, key, state[-1]
+
+class CallbackMetric:
+    """抓取时调用callback取值的指标，callback返回[(标签值元组, 值), ...]"""
+
+    def __init__(self, name: str, documentation: str, type: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[Sequence[str], float]]],
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        if registry is not None:
+            registry.register(self)
+
+    def samples(self):
+        # 计数器按约定输出带_total后缀的样本名
+        sample_name = f"{self.name}_total" if self.type == "counter" else self.name
+        for labelvalues, value in self.callback():
+            yield sample_name, self.labelnames, tuple(str(v) for v in labelvalues), value
+
+def render_metrics() -> str:
+    """以Prometheus文本格式输出全部指标"""
+    return REGISTRY.render()
+
+# ---- HTTP请求 ----
+
+http_request_duration = Histogram(
+    "recruitai_http_request_duration_seconds", "HTTP请求耗时（按路由模板）", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge("recruitai_http_requests_in_flight", "正在处理的HTTP请求数")
+
+class RequestMetricsMiddleware:
+    """ASGI中间件：记录每个HTTP请求的耗时、状态码与路由模板
+
+    路由模板（如/api/process/{file_id}）在路由匹配后写入scope["route"]，
+    用模板而不是实际路径作标签，避免每个ID产生一组新的时间序列；未匹配的请求统一记为<unmatched>。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.monotonic()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            http_request_duration.observe(
+                time.monotonic() - started, method=scope["method"], route=route, status=status
+            )
+
+# ---- 处理阶段 ----
+
+stage_duration = Histogram(
+    "recruitai_stage_duration_seconds",
+    "处理阶段耗时：parse_resume、comprehensive_analysis、generate_chart_data、"
+    "generate_analysis_report、text_extraction、db_commit",
+    ("stage",),
+    buckets=STAGE_BUCKETS
+)
+stage_results = Counter("recruitai_stage_results", "处理阶段结果（success/error）", ("stage", "outcome"))
+
+@contextmanager
+def track_stage(stage: str):
+    """记录with块的耗时和结果，异常（包括超时取消）计为error后继续抛出"""
+    started = time.monotonic()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        stage_duration.observe(time.monotonic() - started, stage=stage)
+        stage_results.inc(stage=stage, outcome=outcome)
+
+async def observe_stage(stage: str, awaitable: Awaitable[Any]) -> Any:
+    """等待awaitable并按阶段记录耗时，用于包装传给run_stage等函数的协程"""
+    with track_stage(stage):
+        return await awaitable
+
+# ---- 大模型调用 ----
+
+llm_request_duration = Histogram("recruitai_llm_request_duration_seconds", "单次大模型API调用耗时（按调用类型）", ("kind",))
+llm_requests = Counter("recruitai_llm_requests", "大模型API调用次数（success/error/cancelled）", ("kind", "outcome"))
+llm_in_flight = Gauge("recruitai_llm_requests_in_flight", "进行中的大模型API调用数（含对冲请求）", ("kind",))
+
+# 大模型返回无法解析时使用默认结果（_create_default_analysis_result等），source=fallback
+llm_parse_results = Counter(
+    "recruitai_llm_parse_results", "大模型返回的解析结果来源（llm/fallback）", ("operation", "source")
+)
+
+# ---- 分析任务 ----
+
+analysis_jobs = Counter("recruitai_analysis_jobs", "分析任务结束状态（completed/failed）", ("status",))
+
+# ---- 回调指标：复用已有统计 ----
+
+def _cache_samples(field: str):
+    from llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    if cache is None:
+        return []
+    if field == "ratio":
+        stats = cache.stats()
+        return [((), stats["hit_ratio"])]
+    return [((), getattr(cache, field))]
+
+def _token_samples():
+    from prompt_builder import token_usage
+    for kind, stats in token_usage.stats().items():
+        yield (kind, "prompt"), stats["prompt_tokens"]
+        yield (kind, "completion"), stats["completion_tokens"]
+        yield (kind, "estimated_prompt"), stats["estimated_prompt_tokens"]
+
+def _hedge_samples():
+    from latency import hedge_stats
+    return [(("sent",), hedge_stats["sent"]), (("won",), hedge_stats["won"])]
+
+def _breaker_samples():
+    from ai_client import get_circuit_breaker
+    current = get_circuit_breaker().state
+    return [((state,), 1 if state == current else 0) for state in ("closed", "open", "half_open")]
+
+CallbackMetric("recruitai_llm_cache_hits", "大模型结果缓存命中次数", "counter", (), lambda: _cache_samples("hits"))
+CallbackMetric("recruitai_llm_cache_misses", "大模型结果缓存未命中次数", "counter", (), lambda: _cache_samples("misses"))
+CallbackMetric("recruitai_llm_cache_hit_ratio", "大模型结果缓存命中率", "gauge", (), lambda: _cache_samples("ratio"))
+CallbackMetric("recruitai_llm_tokens", "大模型token用量（按调用类型，prompt/completion/estimated_prompt）",
+               "counter", ("kind", "type"), _token_samples)
+CallbackMetric("recruitai_llm_hedged_requests", "对冲请求数（sent: 发出的备用请求, won: 备用请求先返回）",
+               "counter", ("result",), _hedge_samples)
+CallbackMetric("recruitai_llm_circuit_state", "智谱API熔断器状态（当前状态为1）", "gauge", ("state",), _breaker_samples)
@@ -0,0 +1,220 @@
+"""
+数据库迁移
+
+create_all只会创建缺失的表，不会修改已有表结构。已有数据库的结构变更在这里以
+带版本号的迁移步骤登记，启动时按顺序执行尚未执行的步骤，并记录到schema_migrations表。
+每个步骤都先检查当前结构再变更，因此对由create_all新建的数据库重复执行也是安全的。
+"""
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from models import Base
+from search_index import create_search_table, rebuild_search_index
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+def _table(name: str):
+    return Base.metadata.tables[name]
+
+def _add_missing_columns(conn: Connection, table_name: str, column_names):
+    """为已有表补充列（按模型中的列定义）"""
+    inspector = inspect(conn)
+    if not inspector.has_table(table_name):
+        return
+    existing = {col["name"] for col in inspector.get_columns(table_name)}
+    for name in column_names:
+        if name in existing:
+            continue
+        column = _table(table_name).columns[name]
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+        print(f"数据库表 {table_name} 新增列: {name}")
+
+def _create_missing_indexes(conn: Connection, table_name: str, index_names):
+    """按模型中声明的索引创建缺失的索引"""
+    inspector = inspect(conn)
+    existing = {index["name"] for index in inspector.get_indexes(table_name)}
+    indexes = {index.name: index for index in _table(table_name).indexes}
+    for name in index_names:
+        if name in existing:
+            continue
+        indexes[name].create(conn)
+        print(f"数据库表 {table_name} 新增索引: {name}")
+
+def _rebuild_sqlite_table(conn: Connection, table_name: str):
+    """SQLite不支持ALTER TABLE ADD CONSTRAINT，按模型定义重建表并复制数据"""
+    table = _table(table_name)
+    inspector = inspect(conn)
+    old_name = f"_{table_name}_old"
+    old_columns = {col["name"] for col in inspector.get_columns(table_name)}
+    columns = ", ".join(col.name for col in table.columns if col.name in old_columns)
+
+    # 旧表上的索引名与新表相同，需要先删除
+    for index in inspector.get_indexes(table_name):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+    conn.execute(text(f"ALTER TABLE {table_name} RENAME TO {old_name}"))
+    table.create(conn)
+    conn.execute(text(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {old_name}"))
+    conn.execute(text(f"DROP TABLE {old_name}"))
+    print(f"数据库表 {table_name} 已按新结构重建")
+
+def _delete_orphans(conn: Connection, table_name: str):
+    """删除外键指向不存在记录的行（旧版本删除候选人时不会删除关联数据），否则补充的外键会被违反"""
+    for fk in _table(table_name).foreign_key_constraints:
+        for element in fk.elements:
+            column = element.parent.name
+            parent = element.column
+            result = conn.execute(text(
+                f"DELETE FROM {table_name} WHERE {column} IS NOT NULL AND {column} NOT IN "
+                f"(SELECT {parent.name} FROM {parent.table.name})"
+            ))
+            if result.rowcount:
+                print(f"数据库表 {table_name} 删除孤立记录: {result.rowcount}条（{column}不存在）")
+
+def _check_sqlite_foreign_keys(conn: Connection, table_name: str):
+    """迁移期间外键检查是关闭的，完成后检查数据是否满足外键约束"""
+    violations = conn.execute(text(f"PRAGMA foreign_key_check({table_name})")).fetchall()
+    if violations:
+        raise RuntimeError(f"数据库表 {table_name} 有{len(violations)}条记录违反外键约束，迁移已回滚")
+
+def _add_foreign_keys(conn: Connection, table_name: str):
+    """为已有表补充模型中声明的外键"""
+    inspector = inspect(conn)
+    existing = {
+        (tuple(fk["constrained_columns"]), fk["referred_table"])
+        for fk in inspector.get_foreign_keys(table_name)
+    }
+    missing = [
+        fk for fk in _table(table_name).foreign_key_constraints
+        if (tuple(fk.column_keys), fk.referred_table.name) not in existing
+    ]
+    if not missing:
+        return
+
+    _delete_orphans(conn, table_name)
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, table_name)
+        _check_sqlite_foreign_keys(conn, table_name)
+        return
+
+    for fk in missing:
+        local_columns = ", ".join(fk.column_keys)
+        remote_columns = ", ".join(element.column.name for element in fk.elements)
+        conn.execute(text(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT fk_{table_name}_{fk.column_keys[0]} "
+            f"FOREIGN KEY ({local_columns}) REFERENCES {fk.referred_table.name} ({remote_columns}) "
+            f"ON DELETE {fk.ondelete or 'NO ACTION'}"
+        ))
+        print(f"数据库表 {table_name} 新增外键: {local_columns} -> {fk.referred_table.name}")
+
+def _migration_001_add_columns(conn: Connection):
+    """补充结构化简历与分析任务新增的列"""
+    _add_missing_columns(conn, "candidates", ["parsed_resume", "parse_status"])
+    _add_missing_columns(conn, "analysis_jobs", ["generate_report"])
+
+def _migration_002_foreign_keys(conn: Connection):
+    """为职位描述与分析结果声明外键（删除候选人时级联删除）"""
+    # 先处理被引用的job_descriptions，再处理引用它的analysis_results
+    _add_foreign_keys(conn, "job_descriptions")
+    _add_foreign_keys(conn, "analysis_results")
+
+def _migration_003_lookup_indexes(conn: Connection):
+    """为按候选人、职位描述、时间和评分的查询建立索引"""
+    _create_missing_indexes(conn, "candidates", ["ix_candidates_created_at"])
+    _create_missing_indexes(conn, "job_descriptions", ["ix_job_descriptions_candidate_id"])
+    _create_missing_indexes(conn, "analysis_results", [
+        "ix_analysis_results_candidate_created",
+        "ix_analysis_results_job_description_id",
+        "ix_analysis_results_created_at",
+        "ix_analysis_results_match_score",
+    ])
+
+def _migration_004_content_hash(conn: Connection):
+    """候选人新增文件内容哈希列及索引"""
+    _add_missing_columns(conn, "candidates", ["content_hash"])
+    _create_missing_indexes(conn, "candidates", ["ix_candidates_content_hash"])
+
+def _migration_005_duplicates(conn: Connection):
+    """候选人新增归一化文本哈希与重复来源列"""
+    _add_missing_columns(conn, "candidates", ["text_hash", "duplicate_of"])
+    _create_missing_indexes(conn, "candidates", ["ix_candidates_text_hash", "ix_candidates_duplicate_of"])
+
+def _migration_006_prescreen(conn: Connection):
+    """批量筛选新增本地预筛选相关列"""
+    _add_missing_columns(conn, "screening_jobs", ["skipped_count", "prescreen_top_k", "prescreen_min_score"])
+    _add_missing_columns(conn, "screening_job_items", ["prescreen_score"])
+
+def _migration_007_stage_timings(conn: Connection):
+    """分析任务新增各阶段耗时列"""
+    _add_missing_columns(conn, "analysis_jobs", ["stage_timings"])
+
+def _migration_008_search_index(conn: Connection):
+    """SQLite建立简历全文检索FTS5表并为已有候选人建立索引"""
+    if create_search_table(conn):
+        count = rebuild_search_index(conn)
+        print(f"简历全文检索索引已建立: {count} 份")
+
+def _migration_009_candidate_skills(conn: Connection):
+    """候选人新增技能列（由技能索引在启动时回填）"""
+    _add_missing_columns(conn, "candidates", ["skills"])
+
+# (版本号, 说明, 执行函数)，只能追加，不要修改已发布的步骤
+MIGRATIONS = [
+    (1, "candidates/analysis_jobs 新增列", _migration_001_add_columns),
+    (2, "job_descriptions/analysis_results 外键", _migration_002_foreign_keys),
+    (3, "候选人/分析结果查询索引", _migration_003_lookup_indexes),
+    (4, "candidates 文件内容哈希", _migration_004_content_hash),
+    (5, "candidates 重复简历识别", _migration_005_duplicates),
+    (6, "screening_jobs/screening_job_items 本地预筛选", _migration_006_prescreen),
+    (7, "analysis_jobs 阶段耗时", _migration_007_stage_timings),
+    (8, "candidate_search 全文检索索引", _migration_008_search_index),
+    (9, "candidates 技能列", _migration_009_candidate_skills),
+]
+
+def _ensure_migrations_table(conn: Connection):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255), "
+        "applied_at VARCHAR(32))"
+    ))
+
+def get_applied_versions(engine: Engine) -> set:
+    """返回已执行的迁移版本号"""
+    with engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        rows = conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}")).fetchall()
+    return {row[0] for row in rows}
+
+def run_migrations(engine: Engine):
+    """按版本顺序执行尚未执行的迁移，每个步骤在独立事务中完成"""
+    applied = get_applied_versions(engine)
+    is_sqlite = engine.dialect.name == "sqlite"
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.connect() as conn:
+            if is_sqlite:
+                # 重建表期间关闭外键检查，并禁止RENAME改写其他表对该表的外键引用
+                foreign_keys = conn.execute(text("PRAGMA foreign_keys")).scalar()
+                conn.execute(text("PRAGMA foreign_keys=OFF"))
+                conn.execute(text("PRAGMA legacy_alter_table=ON"))
+                conn.commit()
+            try:
+                with conn.begin():
+                    migrate(conn)
+                    conn.execute(
+                        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                             "VALUES (:version, :description, :applied_at)"),
+                        {"version": version, "description": description,
+                         "applied_at": datetime.now().isoformat(timespec="seconds")}
+                    )
+            finally:
+                if is_sqlite:
+                    conn.execute(text("PRAGMA legacy_alter_table=OFF"))
+                    conn.execute(text(f"PRAGMA foreign_keys={'ON' if foreign_keys else 'OFF'}"))
+                    conn.commit()
+
+        print(f"✅ 数据库迁移 {version:03d} 完成: {description}")
@@ -1,8 +1,9 @@
 """
 模拟AI客户端，用于测试系统功能
 """
+import asyncio
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator
 from datetime import datetime
 
 class MockAIClient:
@@ -200,3 +201,48 @@ class MockAIClient:
             ],
             "potential": "候选人具备良好的技术基础和学习能力，通过培训可以快速适应岗位要求，有较大的发展潜力。"
         }
+
+
+class AsyncMockAIClient(MockAIClient):
+    """模拟AI客户端（异步版本），接口与AsyncZhipuClient保持一致"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        # 模拟网络延迟（秒），用于在不调用真实API的情况下观察并发行为
+        self.latency = latency
+
+    async def _simulate_latency(self):
+        await asyncio.sleep(self.latency)
+
+    async def parse_resume(self, resume_content: str) -> Dict[str, Any]:
+        """解析简历内容（模拟）"""
+        await self._simulate_latency()
+        return super().parse_resume(resume_content)
+
+    async def analyze_match(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """分析匹配度（模拟）"""
+        await self._simulate_latency()
+        return super().analyze_match(resume_data, job_description)
+
+    async def generate_interview_questions(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any]) -> List[str]:
+        """生成面试问题（模拟）"""
+        await self._simulate_latency()
+        return super().generate_interview_questions(resume_data, job_description, analysis_result)
+
+    async def generate_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> str:
+        """生成分析报告（模拟）"""
+        await self._simulate_latency()
+        return super().generate_analysis_report(resume_data, job_description, analysis_result, interview_questions)
+
+    async def stream_analysis_report(self, resume_data: Dict[str, Any], job_description: str, analysis_result: Dict[str, Any], interview_questions: List[str]) -> AsyncIterator[str]:
+        """流式生成分析报告（模拟），按行分段返回"""
+        await self._simulate_latency()
+        report = super().generate_analysis_report(resume_data, job_description, analysis_result, interview_questions)
+        for line in report.splitlines(keepends=True):
+            await asyncio.sleep(0.01)
+            yield line
+
+    async def comprehensive_analysis(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        """综合分析（模拟）"""
+        await self._simulate_latency()
+        return super().comprehensive_analysis(resume_data, job_description)
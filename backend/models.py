@@ -1,8 +1,9 @@
 """
 数据模型定义
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -15,27 +16,65 @@ class Candidate(Base):
     id = Column(Integer, primary_key=True, index=True)
     file_name = Column(String(255), nullable=False, comment="简历文件名")
     file_path = Column(String(500), nullable=False, comment="简历文件路径")
+    content_hash = Column(String(64), index=True, comment="文件内容SHA-256")
+    text_hash = Column(String(64), index=True, comment="归一化简历文本SHA-256")
+    duplicate_of = Column(Integer, index=True, comment="重复简历对应的原始候选人ID")
     resume_content = Column(Text, comment="简历解析内容")
-    created_at = Column(DateTime, default=func.now(), comment="创建时间")
+    parsed_resume = Column(JSON, comment="结构化简历数据")
+    skills = Column(JSON, comment="简历中识别出的技能（技能库标准名称）")
+    parse_status = Column(String(20), default="pending", comment="解析状态(pending/parsing/parsed/failed)")
+    created_at = Column(DateTime, default=func.now(), index=True, comment="创建时间")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="更新时间")
+    
+    # 删除候选人时由数据库外键级联删除职位描述与分析结果
+    job_descriptions = relationship(
+        "JobDescription",
+        back_populates="candidate",
+        passive_deletes="all"
+    )
+    analyses = relationship(
+        "AnalysisResult",
+        back_populates="candidate",
+        passive_deletes="all"
+    )
 
 class JobDescription(Base):
     """职位描述表"""
     __tablename__ = "job_descriptions"
     
     id = Column(Integer, primary_key=True, index=True)
-    candidate_id = Column(Integer, nullable=False, comment="关联候选人ID")
+    candidate_id = Column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"),
+        nullable=False, index=True, comment="关联候选人ID"
+    )
     job_description = Column(Text, nullable=False, comment="职位描述内容")
     created_at = Column(DateTime, default=func.now(), comment="创建时间")
+    
+    candidate = relationship("Candidate", back_populates="job_descriptions")
+    analyses = relationship(
+        "AnalysisResult",
+        back_populates="job_description",
+        passive_deletes="all"
+    )
 
 class AnalysisResult(Base):
     """分析结果表"""
     __tablename__ = "analysis_results"
+    __table_args__ = (
+        # 候选人最新分析/分析历史：candidate_id过滤 + created_at倒序
+        Index("ix_analysis_results_candidate_created", "candidate_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    candidate_id = Column(Integer, nullable=False, comment="关联候选人ID")
-    job_description_id = Column(Integer, nullable=False, comment="关联职位描述ID")
-    match_score = Column(Float, comment="匹配度评分(0-100)")
+    candidate_id = Column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"),
+        nullable=False, comment="关联候选人ID"
+    )
+    job_description_id = Column(
+        Integer, ForeignKey("job_descriptions.id", ondelete="CASCADE"),
+        nullable=False, index=True, comment="关联职位描述ID"
+    )
+    match_score = Column(Float, index=True, comment="匹配度评分(0-100)")
     skills_analysis = Column(JSON, comment="技能分析结果")
     experience_analysis = Column(JSON, comment="经验分析结果")
     education_analysis = Column(JSON, comment="教育背景分析结果")
@@ -44,6 +83,61 @@ class AnalysisResult(Base):
     candidate_profile = Column(JSON, comment="候选人画像")
     analysis_report = Column(Text, comment="完整分析报告")
     chart_data = Column(JSON, comment="图表数据")
+    created_at = Column(DateTime, default=func.now(), index=True, comment="创建时间")
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="更新时间")
+    
+    candidate = relationship("Candidate", back_populates="analyses")
+    job_description = relationship("JobDescription", back_populates="analyses")
+
+class AnalysisJob(Base):
+    """分析任务队列表"""
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(Integer, nullable=False, comment="关联候选人ID")
+    job_description = Column(Text, nullable=False, comment="职位描述内容")
+    status = Column(String(20), default="queued", index=True, comment="任务状态(queued/running/completed/failed)")
+    stage = Column(String(20), default="queued", comment="当前阶段(queued/parse/analyze/chart/report/done)")
+    generate_report = Column(Boolean, default=True, comment="是否在任务中生成分析报告（否则由前端流式生成）")
+    analysis_id = Column(Integer, comment="关联分析结果ID")
+    error = Column(Text, comment="错误信息")
+    stage_timings = Column(JSON, comment="各阶段耗时（秒）")
+    attempts = Column(Integer, default=0, comment="执行次数")
+    created_at = Column(DateTime, default=func.now(), comment="创建时间")
+    started_at = Column(DateTime, comment="开始时间")
+    finished_at = Column(DateTime, comment="完成时间")
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="更新时间")
+
+class ScreeningJob(Base):
+    """批量筛选任务表"""
+    __tablename__ = "screening_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_description = Column(Text, nullable=False, comment="职位描述内容")
+    status = Column(String(20), default="pending", comment="任务状态(pending/running/completed/failed)")
+    concurrency = Column(Integer, default=1, comment="并发数")
+    generate_report = Column(Boolean, default=False, comment="是否生成完整分析报告")
+    total_count = Column(Integer, default=0, comment="候选人总数")
+    completed_count = Column(Integer, default=0, comment="已完成数量")
+    failed_count = Column(Integer, default=0, comment="失败数量")
+    skipped_count = Column(Integer, default=0, comment="预筛选未通过数量")
+    prescreen_top_k = Column(Integer, comment="预筛选保留前K名")
+    prescreen_min_score = Column(Float, comment="预筛选最低分数")
+    created_at = Column(DateTime, default=func.now(), comment="创建时间")
+    finished_at = Column(DateTime, comment="完成时间")
+
+class ScreeningJobItem(Base):
+    """批量筛选任务明细表"""
+    __tablename__ = "screening_job_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, nullable=False, index=True, comment="关联批量任务ID")
+    candidate_id = Column(Integer, nullable=False, comment="关联候选人ID")
+    status = Column(String(20), default="pending", comment="状态(pending/running/completed/failed/skipped)")
+    analysis_id = Column(Integer, comment="关联分析结果ID")
+    match_score = Column(Float, comment="匹配度评分")
+    prescreen_score = Column(Float, comment="本地预筛选分数")
+    error = Column(Text, comment="错误信息")
     created_at = Column(DateTime, default=func.now(), comment="创建时间")
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment="更新时间")
 
@@ -58,11 +152,24 @@ class FileUploadResponse(BaseModel):
     file_name: str
     status: str
     message: str
+    parse_status: Optional[str] = None  # parsing/parsed/failed，可通过/api/file/{file_id}查询
+    duplicate_of: Optional[int] = None  # 与已上传简历内容相同时为原始候选人ID
 
 class ProcessRequest(BaseModel):
     """处理请求"""
     file_id: int
     job_description: str
+    stream_report: bool = False  # 为True时任务不生成报告，由前端通过SSE流式获取
+
+class BatchScreeningRequest(BaseModel):
+    """批量筛选请求"""
+    job_description: str
+    candidate_ids: Optional[List[int]] = None
+    all_unscreened: bool = False  # 筛选所有尚无分析结果的候选人（不含重复简历和解析失败的简历）
+    concurrency: Optional[int] = None
+    generate_report: bool = False
+    prescreen_top_k: Optional[int] = None  # 只对本地预筛选排名前K的候选人调用大模型
+    prescreen_min_score: Optional[float] = None  # 只对预筛选分数不低于该值的候选人调用大模型
 
 class SkillAnalysis(BaseModel):
     """技能分析"""
@@ -0,0 +1,102 @@
+"""
+本地预筛选
+
+在调用大模型做综合分析前，用纯本地、确定性的打分对一批候选人排序：
+- 技能覆盖率：职位描述中识别出的技能在简历中出现的比例（技能匹配器识别，含别名）
+- TF-IDF余弦相似度：以职位描述中的词为特征，IDF在本批候选人中计算
+
+技能覆盖优先：TF-IDF相似度最多相当于TFIDF_WEIGHT（小于1）个技能，只在命中技能数相同的候选人之间拉开差距，
+职位描述中常见的套话（“负责”“团队协作”等）再多，也不会让缺少某项要求技能的简历排到前面。
+
+所有候选人一次性构造成矩阵计算，批量筛选只把排名靠前（top_k）或超过阈值的候选人交给大模型。
+"""
+import re
+from collections import Counter
+from typing import List, Optional
+import numpy as np
+from skills import skill_matcher
+
+# TF-IDF相似度折算的技能数，必须小于1
+TFIDF_WEIGHT = 0.8
+
+# 英文/数字词（保留C++、C#、Node.js等写法）与连续中文片段
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*|[一-鿿]+")
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+def _is_cjk(char: str) -> bool:
+    return "一" <= char <= "鿿"
+
+def tokenize(text: str) -> List[str]:
+    """分词：英文按词切分，中文没有空格分隔，按相邻二字切分"""
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        if _is_cjk(match[0]):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match.rstrip("."))
+    return tokens
+
+def _skill_coverage(jd_skill_ids: List[int], texts: List[str]) -> np.ndarray:
+    """技能覆盖率：候选人 x 职位技能 的命中矩阵按行取平均"""
+    hits = np.zeros((len(texts), len(jd_skill_ids)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        # 与职位描述使用同一个匹配器，别名与单词边界规则一致
+        found = skill_matcher.skill_ids(text)
+        hits[row] = [skill_id in found for skill_id in jd_skill_ids]
+    return hits.mean(axis=1)
+
+def _tfidf_cosine(job_description: str, texts: List[str]) -> np.ndarray:
+    """以职位描述的词为特征计算每份简历与职位描述的TF-IDF余弦相似度"""
+    query_counts = Counter(tokenize(job_description))
+    if not query_counts:
+        return np.zeros(len(texts), dtype=np.float32)
+
+    vocabulary = {term: index for index, term in enumerate(query_counts)}
+    term_freq = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    # 只统计职位描述中出现的词：英文词一次正则切分计数，中文二字词直接用子串计数
+    for row, text in enumerate(texts):
+        words = Counter(word.rstrip(".") for word in _WORD_PATTERN.findall(text))
+        term_freq[row] = [
+            text.count(term) if _is_cjk(term[0]) else words.get(term, 0)
+            for term in vocabulary
+        ]
+
+    document_freq = (term_freq > 0).sum(axis=0)
+    idf = np.log((len(texts) + 1) / (document_freq + 1)) + 1
+    documents = np.log1p(term_freq) * idf
+    query = np.log1p(np.array(list(query_counts.values()), dtype=np.float32)) * idf
+
+    norms = np.linalg.norm(documents, axis=1) * np.linalg.norm(query)
+    return np.divide(documents @ query, norms, out=np.zeros(len(texts), dtype=np.float32), where=norms > 0)
+
+def prescreen_scores(job_description: str, resume_texts: List[str]) -> np.ndarray:
+    """计算一批简历相对职位描述的预筛选分数（0-100）"""
+    if not resume_texts:
+        return np.zeros(0, dtype=np.float32)
+
+    texts = [(text or "").lower() for text in resume_texts]
+    cosine = _tfidf_cosine(job_description, texts)
+
+    jd_skill_ids = sorted(skill_matcher.skill_ids(job_description))
+    if not jd_skill_ids:
+        return np.round(cosine * 100, 1)
+
+    # 命中技能数 + 相似度（不足一个技能），多命中一项技能的候选人总分一定更高
+    matched = _skill_coverage(jd_skill_ids, texts) * len(jd_skill_ids)
+    return np.round((matched + TFIDF_WEIGHT * cosine) / (len(jd_skill_ids) + TFIDF_WEIGHT) * 100, 1)
+
+def select_candidates(scores: np.ndarray, top_k: Optional[int] = None, min_score: Optional[float] = None) -> np.ndarray:
+    """按阈值和top_k选出进入大模型分析的候选人，返回布尔掩码"""
+    keep = np.ones(len(scores), dtype=bool)
+    if min_score is not None:
+        keep &= scores >= min_score
+    if top_k is not None and keep.sum() > top_k:
+        # 稳定排序，分数相同时保留靠前的候选人
+        order = np.argsort(-scores, kind="stable")
+        selected = order[keep[order]][:top_k]
+        keep = np.zeros(len(scores), dtype=bool)
+        keep[selected] = True
+    return keep
@@ -0,0 +1,242 @@
+"""
+提示词构建与token统计
+
+发送给大模型的简历和职位描述都先按token预算压缩：
+- 本地估算token数（不依赖分词器）
+- 结构化数据紧凑序列化（无缩进、去掉空值）
+- 原始简历文本按段落（工作经历、教育背景等）分配预算截断，优先保留核心段落
+- 结构化简历超出预算时，较早的工作经历只保留公司、职位和时间
+每次调用的预估与实际token数按调用类型累计，用于观察成本和估算误差。
+"""
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from config import PROMPT_RESUME_TEXT_BUDGET, PROMPT_RESUME_DATA_BUDGET, PROMPT_JD_BUDGET, PROMPT_RECENT_JOBS
+
+TRUNCATED_MARK = "……（已截断）"
+
+# 中文按字、英文按词（约4个字母一个token）、数字约3位一个token、换行和缩进等连续空白算一个，其他符号各算一个
+_TOKEN_PATTERN = re.compile(r"[一-鿿]|[A-Za-z]+|\d+|\s*\n\s*|\s{2,}|[^\sA-Za-z\d一-鿿]")
+
+def estimate_tokens(text: str) -> int:
+    """本地估算文本的token数"""
+    total = 0
+    for piece in _TOKEN_PATTERN.findall(text or ""):
+        if piece.isascii() and piece.isalpha():
+            total += (len(piece) + 3) // 4
+        elif piece.isdigit():
+            total += (len(piece) + 2) // 3
+        else:
+            total += 1
+    return total
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """估算一组消息的token数（每条消息另计少量格式开销）"""
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
+def fit_text(text: str, budget: int) -> str:
+    """截断文本使其不超过token预算，尽量在句子结束处截断"""
+    text = text or ""
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    if budget <= 0:
+        return ""
+
+    # 按平均每token字符数估算截断位置，再逐步收缩
+    cut = int(len(text) * budget / tokens)
+    while cut > 0 and estimate_tokens(text[:cut]) > budget:
+        cut = int(cut * 0.9)
+    head = text[:cut]
+    sentence_end = max(head.rfind(mark) for mark in "。；;！!？?")
+    if sentence_end > cut * 0.7:
+        head = head[:sentence_end + 1]
+    return head + TRUNCATED_MARK
+
+def _prune(value: Any) -> Any:
+    """去掉None、空字符串、空列表和空字典"""
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [item for item in (_prune(item) for item in value) if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+def compact_json(data: Any) -> str:
+    """紧凑序列化：不缩进、不加空格、去掉空值"""
+    return json.dumps(_prune(data), ensure_ascii=False, separators=(",", ":"))
+
+def compact_prompt(prompt: str) -> str:
+    """去掉提示词模板每行的缩进和多余空行"""
+    lines = [line.strip() for line in prompt.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+def user_messages(prompt: str) -> List[Dict[str, str]]:
+    """构建单条用户消息"""
+    return [{"role": "user", "content": compact_prompt(prompt)}]
+
+# 简历段落标题及保留优先级：0最先保留，数字越大越先被截断
+_SECTION_PRIORITY = {
+    "专业技能": 1, "技能特长": 1, "技能": 1, "skills": 1,
+    "工作经历": 1, "工作经验": 1, "实习经历": 1, "work experience": 1, "experience": 1,
+    "项目经历": 1, "项目经验": 1, "projects": 1,
+    "教育背景": 1, "教育经历": 1, "education": 1,
+    "证书": 2, "资格证书": 2, "获奖情况": 2, "荣誉奖项": 2, "certifications": 2, "awards": 2,
+    "自我评价": 2, "个人简介": 2, "个人总结": 2, "summary": 2,
+    "兴趣爱好": 3, "爱好": 3, "hobbies": 3, "其他": 3, "references": 3,
+}
+# 简历文本在提取时已合并了换行，标题只能按"前后是分隔符的独立词"识别，避免把"3年工作经验"当成标题
+_SECTION_PATTERN = re.compile(
+    r"(?:^|(?<=[\s【\[|·•、]))(" + "|".join(sorted(map(re.escape, _SECTION_PRIORITY), key=len, reverse=True)) +
+    r")(?=[\s:：】\]|]|$)",
+    re.IGNORECASE
+)
+
+def split_sections(text: str) -> List[Tuple[int, str]]:
+    """按段落标题切分简历文本，返回 [(优先级, 段落文本)]，第一个标题之前的基本信息优先级为0"""
+    sections = []
+    start, priority = 0, 0
+    for match in _SECTION_PATTERN.finditer(text):
+        if match.start() > start:
+            sections.append((priority, text[start:match.start()]))
+        start, priority = match.start(), _SECTION_PRIORITY[match.group(1).lower()]
+    sections.append((priority, text[start:]))
+    return [(priority, section) for priority, section in sections if section.strip()]
+
+def _allocate(sizes: List[int], budget: int) -> List[int]:
+    """按最大最小公平分配预算：篇幅小于平均份额的段落完整保留，剩余预算由较长的段落平分"""
+    allowed = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index])
+    for position, index in enumerate(order):
+        allowed[index] = min(sizes[index], remaining // (len(order) - position))
+        remaining -= allowed[index]
+    return allowed
+
+def fit_resume_text(text: str, budget: int = PROMPT_RESUME_TEXT_BUDGET) -> str:
+    """按段落截断原始简历文本：先压缩低优先级段落，仍超出时截断篇幅最长的段落"""
+    text = text or ""
+    if estimate_tokens(text) <= budget:
+        return text
+
+    sections = split_sections(text)
+    sizes = [estimate_tokens(section) for _, section in sections]
+    wanted = list(sizes)
+    # 兴趣爱好等段落最多保留50个token，自我评价、证书等最多保留150个
+    for index, (priority, _) in enumerate(sections):
+        if priority >= 3:
+            wanted[index] = min(sizes[index], 50)
+        elif priority == 2:
+            wanted[index] = min(sizes[index], 150)
+    allowed = _allocate(wanted, budget)
+
+    return " ".join(
+        section if allowed[index] >= sizes[index] else fit_text(section, allowed[index])
+        for index, (_, section) in enumerate(sections)
+        if allowed[index] > 0
+    )
+
+_YEAR_PATTERN = re.compile(r"(19|20)\d{2}")
+_PRESENT_WORDS = ("至今", "现在", "present", "now")
+_EXPERIENCE_KEYS = ("experience", "work_experience")
+_JOB_SUMMARY_FIELDS = ("company", "position", "duration")
+# 超出预算时依次删除的字段
+_DROPPABLE_KEYS = ("certifications", "projects", "summary")
+
+def _job_end_year(job: Any) -> int:
+    """从工作经历的时间描述中取结束年份，"至今"视为今年，无法识别时视为最早"""
+    duration = str(job.get("duration", "")) if isinstance(job, dict) else ""
+    if any(word in duration.lower() for word in _PRESENT_WORDS):
+        return datetime.now().year
+    years = [int(match.group(0)) for match in _YEAR_PATTERN.finditer(duration)]
+    return max(years) if years else 0
+
+def _summarize_old_jobs(data: Dict[str, Any], keep_recent: int) -> bool:
+    """较早的工作经历只保留公司、职位和时间，返回是否有改动"""
+    changed = False
+    for key in _EXPERIENCE_KEYS:
+        jobs = data.get(key)
+        if not isinstance(jobs, list) or len(jobs) <= keep_recent:
+            continue
+        jobs = sorted(jobs, key=_job_end_year, reverse=True)
+        data[key] = jobs[:keep_recent] + [
+            {field: job[field] for field in _JOB_SUMMARY_FIELDS if field in job} if isinstance(job, dict) else job
+            for job in jobs[keep_recent:]
+        ]
+        changed = True
+    return changed
+
+def _truncate_strings(value: Any, max_tokens: int) -> Any:
+    """把嵌套结构中的长字符串截断到max_tokens"""
+    if isinstance(value, dict):
+        return {key: _truncate_strings(item, max_tokens) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_truncate_strings(item, max_tokens) for item in value]
+    if isinstance(value, str):
+        return fit_text(value, max_tokens)
+    return value
+
+def compact_resume(resume_data: Dict[str, Any], budget: int = PROMPT_RESUME_DATA_BUDGET) -> str:
+    """序列化结构化简历，超出预算时逐步压缩：概括较早的工作经历、截断长文本、删除次要字段"""
+    data = _prune(resume_data or {})
+    serialized = compact_json(data)
+    if estimate_tokens(serialized) <= budget:
+        return serialized
+
+    if _summarize_old_jobs(data, PROMPT_RECENT_JOBS):
+        serialized = compact_json(data)
+        if estimate_tokens(serialized) <= budget:
+            return serialized
+
+    for max_tokens in (200, 100, 50):
+        serialized = compact_json(_truncate_strings(data, max_tokens))
+        if estimate_tokens(serialized) <= budget:
+            return serialized
+
+    data = _truncate_strings(data, 50)
+    for key in _DROPPABLE_KEYS:
+        if key in data:
+            del data[key]
+            serialized = compact_json(data)
+            if estimate_tokens(serialized) <= budget:
+                break
+    return serialized
+
+def fit_job_description(job_description: str, budget: int = PROMPT_JD_BUDGET) -> str:
+    """职位描述超出预算时截断"""
+    return fit_text((job_description or "").strip(), budget)
+
+class TokenUsageTracker:
+    """按调用类型累计预估与实际token数"""
+
+    def __init__(self):
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, estimated_prompt_tokens: int, usage: Optional[Dict[str, Any]]):
+        stats = self._usage.setdefault(kind, {
+            "calls": 0, "estimated_prompt_tokens": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0
+        })
+        stats["calls"] += 1
+        stats["estimated_prompt_tokens"] += estimated_prompt_tokens
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            stats[field] += int((usage or {}).get(field) or 0)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各调用类型的累计值、平均每次token数和估算偏差（实际/预估）"""
+        result = {}
+        for kind, stats in self._usage.items():
+            calls = stats["calls"] or 1
+            result[kind] = {
+                **stats,
+                "avg_total_tokens": round(stats["total_tokens"] / calls, 1),
+                "estimate_ratio": round(stats["prompt_tokens"] / stats["estimated_prompt_tokens"], 3)
+                if stats["estimated_prompt_tokens"] and stats["prompt_tokens"] else None
+            }
+        return result
+
+# 进程内共享的token统计
+token_usage = TokenUsageTracker()
@@ -0,0 +1,62 @@
+"""
+异步限流器
+
+令牌桶实现，用于限制对智谱API的请求速率（RPM）和token用量（TPM），避免批量任务并发过高触发限流。
+"""
+import asyncio
+import time
+from typing import Optional
+
+class AsyncTokenBucket:
+    """异步令牌桶：按固定速率补充令牌，acquire在令牌不足时等待"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0  # 每秒补充的令牌数
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """获取令牌，不足时等待补充"""
+        # 单次请求超过桶容量时按容量计，否则永远等不到
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """按实际用量修正：amount为正时追加扣除（可透支），为负时退还"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+class RequestRateLimiter:
+    """同时限制每分钟请求数与每分钟token数
+
+    token数在请求前只能估算，请求完成后按接口返回的实际用量调用settle修正。
+    """
+
+    def __init__(self, rpm_limit: float, tpm_limit: float):
+        self.requests: Optional[AsyncTokenBucket] = AsyncTokenBucket(rpm_limit) if rpm_limit > 0 else None
+        self.tokens: Optional[AsyncTokenBucket] = AsyncTokenBucket(tpm_limit) if tpm_limit > 0 else None
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """发送请求前调用：占用一次请求配额和预估的token配额"""
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is not None and estimated_tokens > 0:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """请求完成后按实际token用量修正预估值"""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
@@ -0,0 +1,201 @@
+"""
+简历上传后的后台处理流程
+
+上传接口保存文件后立即返回，文本提取（进程池）和结构化解析等耗时步骤在这里异步完成，
+结果持久化到Candidate，后续分析接口直接读取，不再重复调用大模型解析。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Candidate
+from ai_client import get_ai_client
+from extraction import extract_text_async
+from metrics import track_stage
+from utils import normalized_text_hash, run_in_background
+from config import BATCH_DEFAULT_CONCURRENCY
+
+PARSE_FAILED_PREFIX = "文件解析失败"
+
+async def parse_candidate_resume(db: Session, candidate: Candidate, ai_client=None) -> Dict[str, Any]:
+    """对候选人简历做结构化解析并持久化"""
+    if ai_client is None:
+        ai_client = get_ai_client()
+
+    # 提交后连接归还连接池，等待大模型期间不占用连接（提交后再访问属性会重新查询并占用连接）
+    resume_content = candidate.resume_content
+    candidate.parse_status = "parsing"
+    db.commit()
+
+    try:
+        with track_stage("parse_resume"):
+            parsed = await ai_client.parse_resume(resume_content)
+    except BaseException:
+        # 包括大模型返回无法解析（ResumeParseError）和阶段截止时间触发的CancelledError：
+        # 不保存占位数据，状态不停留在parsing，之后的分析会重新解析
+        candidate.parse_status = "failed"
+        db.commit()
+        raise
+
+    candidate.parsed_resume = parsed
+    candidate.parse_status = "parsed"
+    db.commit()
+    return parsed
+
+def find_duplicate_upload(db: Session, content_hash: str) -> Optional[Candidate]:
+    """按文件内容哈希查找最早上传的相同简历"""
+    return db.query(Candidate).filter(
+        Candidate.content_hash == content_hash
+    ).order_by(Candidate.id).first()
+
+def find_near_duplicate(db: Session, candidate: Candidate) -> Optional[Candidate]:
+    """按归一化文本哈希查找已完成结构化解析的近似重复简历"""
+    if not candidate.text_hash:
+        return None
+    return db.query(Candidate).filter(
+        Candidate.text_hash == candidate.text_hash,
+        Candidate.id != candidate.id,
+        Candidate.parse_status == "parsed"
+    ).order_by(Candidate.id).first()
+
+def link_duplicate(candidate: Candidate, original: Candidate):
+    """将候选人标记为重复简历，原始简历已解析完成时复用其文本与结构化解析结果"""
+    # 始终指向最早的原始简历，避免形成重复链
+    candidate.duplicate_of = original.duplicate_of or original.id
+    # 原始简历解析失败或仍在解析中时不复制状态，由调用方单独处理这份简历
+    if original.parse_status == "parsed":
+        candidate.resume_content = original.resume_content
+        candidate.text_hash = original.text_hash
+        candidate.parsed_resume = original.parsed_resume
+        candidate.parse_status = original.parse_status
+
+def _store_extracted_text(candidate: Candidate, result) -> bool:
+    """写入文本提取结果（文本或异常），失败时记录原因并标记为failed"""
+    if isinstance(result, BaseException):
+        # 如果文件解析失败，仍然保留文件记录，但标记内容为解析失败
+        print(f"简历文本提取失败: candidate_id={candidate.id}, {result}")
+        candidate.resume_content = f"{PARSE_FAILED_PREFIX}: {str(result)}"
+        candidate.parse_status = "failed"
+        return False
+
+    candidate.resume_content = result
+    if result:
+        candidate.text_hash = normalized_text_hash(result)
+    return True
+
+async def extract_candidate_text(db: Session, candidate: Candidate) -> bool:
+    """在进程池中提取简历文本并持久化"""
+    # 结束只读事务并归还连接，排队等待进程池期间不占用连接
+    file_path = candidate.file_path
+    db.commit()
+    try:
+        result = await extract_text_async(file_path)
+    except Exception as e:
+        result = e
+
+    success = _store_extracted_text(candidate, result)
+    db.commit()
+    return success
+
+async def process_uploaded_resume(candidate_id: int):
+    """上传后的后台任务：提取文本并结构化解析简历"""
+    db = SessionLocal()
+    try:
+        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        if not candidate:
+            return
+
+        if candidate.resume_content is None and not await extract_candidate_text(db, candidate):
+            return
+
+        # 文本与已解析的简历相同（如不同格式导出的同一份简历），直接复用结构化结果
+        original = find_near_duplicate(db, candidate)
+        if original:
+            link_duplicate(candidate, original)
+            db.commit()
+            print(f"♻️ 近似重复简历，复用解析结果: candidate_id={candidate_id}, duplicate_of={candidate.duplicate_of}")
+            return
+
+        if not candidate.resume_content or candidate.resume_content.startswith(PARSE_FAILED_PREFIX):
+            candidate.parse_status = "failed"
+            db.commit()
+            return
+
+        print(f"📄 后台解析简历: candidate_id={candidate_id}")
+        await parse_candidate_resume(db, candidate)
+        print(f"✅ 简历结构化解析完成: candidate_id={candidate_id}")
+    except Exception as e:
+        print(f"简历结构化解析失败: candidate_id={candidate_id}, {e}")
+    finally:
+        db.close()
+
+async def process_uploaded_batch(candidate_ids: List[int], duplicates: Dict[int, int] = None):
+    """批量上传后的后台任务：并行提取文本并一次性提交，再并发结构化解析
+    
+    duplicates为同一批次内重复文件的 {重复候选人ID: 原始候选人ID}，原始简历处理完成后直接复用其结果。
+    """
+    db = SessionLocal()
+    try:
+        candidates = db.query(Candidate).filter(
+            Candidate.id.in_(candidate_ids),
+            Candidate.resume_content.is_(None)
+        ).all()
+        # 进程池控制实际并行度，所有提取结果在同一个事务中提交
+        results = await asyncio.gather(
+            *[extract_text_async(candidate.file_path) for candidate in candidates],
+            return_exceptions=True
+        )
+        for candidate, result in zip(candidates, results):
+            _store_extracted_text(candidate, result)
+        db.commit()
+        print(f"📄 批量文本提取完成: {len(candidates)} 份")
+    finally:
+        db.close()
+
+    semaphore = asyncio.Semaphore(BATCH_DEFAULT_CONCURRENCY)
+
+    async def parse_one(candidate_id: int):
+        async with semaphore:
+            await process_uploaded_resume(candidate_id)
+
+    await asyncio.gather(*[parse_one(candidate_id) for candidate_id in candidate_ids])
+
+    if not duplicates:
+        return
+
+    db = SessionLocal()
+    try:
+        originals = {
+            candidate.id: candidate
+            for candidate in db.query(Candidate).filter(Candidate.id.in_(set(duplicates.values())))
+        }
+        leftovers = []
+        for candidate in db.query(Candidate).filter(Candidate.id.in_(list(duplicates))):
+            original = originals.get(duplicates[candidate.id])
+            if original:
+                link_duplicate(candidate, original)
+            # 原始简历已被删除或未能完成时单独处理
+            if candidate.resume_content is None:
+                leftovers.append(candidate.id)
+        db.commit()
+    finally:
+        db.close()
+
+    for candidate_id in leftovers:
+        await process_uploaded_resume(candidate_id)
+
+def resume_unfinished_uploads():
+    """应用启动时重新处理上次关闭前未完成文本提取或结构化解析的简历"""
+    db = SessionLocal()
+    try:
+        # 已有文本但仍处于parsing的是解析过程中进程退出的简历，process_uploaded_resume会跳过提取直接解析
+        rows = db.query(Candidate.id).filter(
+            Candidate.parse_status.in_(["pending", "parsing"])
+        ).all()
+    finally:
+        db.close()
+
+    for row in rows:
+        run_in_background(process_uploaded_resume(row.id), f"resume_upload:{row.id}")
+    if rows:
+        print(f"🔁 恢复未完成的简历解析: {len(rows)} 份")
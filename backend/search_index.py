@@ -0,0 +1,175 @@
+"""
+简历全文检索（SQLite FTS5）
+
+FTS5自带的unicode61分词器不会切分中文，这里在写入和查询前统一预分词：
+英文按词（保留C++、C#、Node.js等写法），中文按相邻二字切分，再以空格连接交给FTS5。
+查询时每个检索词转换为短语查询，保证二字片段相邻；结果按BM25排序。
+
+索引通过Candidate的ORM事件在同一事务中维护（上传、解析完成、删除），
+非SQLite数据库或SQLite未编译FTS5时退化为LIKE查询。
+"""
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from models import Candidate
+from prescreen import tokenize
+
+SEARCH_TABLE = "candidate_search"
+# 列权重依次对应 name, skills, experience, content
+BM25_WEIGHTS = (5.0, 3.0, 2.0, 1.0)
+INDEXED_ATTRIBUTES = ("file_name", "resume_content", "parsed_resume")
+SNIPPET_CHARS = 160
+
+# 每个数据库连接串是否支持FTS5检索（建表成功后置为True）
+_available: Dict[str, bool] = {}
+
+def _pretokenize(value: Optional[str]) -> str:
+    return " ".join(tokenize(value or ""))
+
+def _join_fields(items: Any, fields: Tuple[str, ...]) -> str:
+    """把结构化简历中的列表字段（字符串或字典）拼接为文本"""
+    if not isinstance(items, list):
+        return str(items or "")
+    parts = []
+    for item in items:
+        if isinstance(item, dict):
+            parts.extend(str(item.get(field) or "") for field in fields)
+        else:
+            parts.append(str(item))
+    return " ".join(parts)
+
+def build_document(candidate: Candidate) -> Dict[str, str]:
+    """构造候选人的索引文档（已预分词）"""
+    parsed = candidate.parsed_resume if isinstance(candidate.parsed_resume, dict) else {}
+    content = candidate.resume_content or ""
+    if content.startswith("文件解析失败"):
+        content = ""
+    experience = parsed.get("experience") or parsed.get("work_experience")
+    return {
+        "name": _pretokenize(f"{parsed.get('name') or ''} {candidate.file_name or ''}"),
+        "skills": _pretokenize(_join_fields(parsed.get("skills"), ("name",))),
+        "experience": _pretokenize(_join_fields(experience, ("company", "position"))),
+        "content": _pretokenize(content),
+    }
+
+def create_search_table(conn: Connection) -> bool:
+    """创建FTS5表并设置默认BM25列权重，SQLite不支持FTS5时返回False"""
+    if conn.dialect.name != "sqlite":
+        return False
+    try:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "name, skills, experience, content, tokenize = \"unicode61 tokenchars '+#.'\")"
+        ))
+    except Exception as e:
+        print(f"⚠️ SQLite不支持FTS5，全文检索退化为LIKE查询: {e}")
+        return False
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25({weights})')"))
+    _available[str(conn.engine.url)] = True
+    return True
+
+def search_available(conn: Connection) -> bool:
+    """当前数据库是否已建立FTS5索引"""
+    key = str(conn.engine.url)
+    if key not in _available:
+        _available[key] = conn.dialect.name == "sqlite" and inspect(conn).has_table(SEARCH_TABLE)
+    return _available[key]
+
+def index_candidate(conn: Connection, candidate: Candidate):
+    """写入或替换候选人的索引文档"""
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": candidate.id})
+    conn.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} (rowid, name, skills, experience, content) "
+             "VALUES (:id, :name, :skills, :experience, :content)"),
+        {"id": candidate.id, **build_document(candidate)}
+    )
+
+def rebuild_search_index(conn: Connection, batch_size: int = 500) -> int:
+    """按候选人表全量重建索引，返回索引的候选人数"""
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    columns = [Candidate.__table__.c[name] for name in ("id", "file_name", "resume_content", "parsed_resume")]
+    count = 0
+    result = conn.execute(Candidate.__table__.select().with_only_columns(*columns)).yield_per(batch_size)
+    for rows in result.partitions():
+        conn.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (rowid, name, skills, experience, content) "
+                 "VALUES (:id, :name, :skills, :experience, :content)"),
+            [{"id": row.id, **build_document(row)} for row in rows]
+        )
+        count += len(rows)
+    return count
+
+@event.listens_for(Candidate, "after_insert")
+def _index_after_insert(mapper, connection, target):
+    if search_available(connection):
+        index_candidate(connection, target)
+
+@event.listens_for(Candidate, "after_update")
+def _index_after_update(mapper, connection, target):
+    if not search_available(connection):
+        return
+    # 只有影响索引内容的字段变化时才重建文档，状态字段更新不触发
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in INDEXED_ATTRIBUTES):
+        index_candidate(connection, target)
+
+@event.listens_for(Candidate, "after_delete")
+def _index_after_delete(mapper, connection, target):
+    if search_available(connection):
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": target.id})
+
+def build_match_query(query: str) -> str:
+    """把用户输入转换为FTS5查询：空格分隔的每个词是一个短语，词之间为AND；单个汉字按前缀匹配"""
+    phrases = []
+    for term in query.split():
+        tokens = tokenize(term)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(token.replace('"', '""') for token in tokens) + '"'
+        if len(tokens) == 1 and len(tokens[0]) == 1 and not tokens[0].isascii():
+            phrase += "*"
+        phrases.append(phrase)
+    return " AND ".join(phrases)
+
+def search_candidates(conn: Connection, query: str, limit: int, after: Optional[Tuple[float, int]] = None):
+    """FTS5检索，返回 ([(candidate_id, rank)], 命中总数)，rank越小越相关"""
+    match = build_match_query(query)
+    if not match:
+        return [], 0
+    params = {"match": match, "limit": limit}
+    cursor_clause = ""
+    if after is not None:
+        cursor_clause = "AND (rank > :rank OR (rank = :rank AND rowid > :id))"
+        params.update({"rank": after[0], "id": after[1]})
+    rows = conn.execute(text(
+        f"SELECT rowid, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match {cursor_clause} "
+        "ORDER BY rank, rowid LIMIT :limit"
+    ), params).fetchall()
+    total = conn.execute(
+        text(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"), {"match": match}
+    ).scalar()
+    return [(row[0], row[1]) for row in rows], total
+
+def highlight(content: str, query: str, width: int = SNIPPET_CHARS) -> str:
+    """在原始简历文本中截取第一个命中位置附近的片段，命中词用<mark>标记（其余内容已转义）"""
+    content = content or ""
+    terms = sorted({term for term in query.split() if term}, key=len, reverse=True)
+    if not terms:
+        return html.escape(content[:width])
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(content)
+    start = max(0, first.start() - width // 3) if first else 0
+    window = content[start:start + width]
+
+    parts, position = [], 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        position = match.end()
+    parts.append(html.escape(window[position:]))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(content) else ""
+    return prefix + "".join(parts) + suffix
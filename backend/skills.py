@@ -0,0 +1,303 @@
+"""
+技能关键词库与技能提取
+
+词库与别名表在模块加载时编译为一个Aho-Corasick自动机，一次扫描即可找出文本中出现的所有技能，
+耗时只与文本长度有关，与词库大小无关。简历和职位描述共用同一个匹配器。
+"""
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set
+
+# 扩展的技能关键词库，按类别组织
+SKILL_KEYWORDS = {
+    # 编程语言
+    "programming_languages": [
+        "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Swift", "Kotlin",
+        "PHP", "Ruby", "Scala", "R", "MATLAB", "Perl", "Lua", "Haskell", "Clojure", "Erlang",
+        "Shell", "Bash", "PowerShell", "Assembly", "COBOL", "Fortran", "Ada", "Pascal"
+    ],
+
+    # Web开发框架
+    "web_frameworks": [
+        "React", "Vue", "Angular", "Svelte", "Next.js", "Nuxt.js", "SvelteKit",
+        "Django", "Flask", "FastAPI", "Spring", "Spring Boot", "Spring MVC", "Spring Security",
+        "Express.js", "Koa.js", "Nest.js", "Laravel", "Symfony", "CodeIgniter",
+        "Ruby on Rails", "Sinatra", "ASP.NET", "ASP.NET Core", "Blazor", "WebAPI",
+        "Gin", "Fiber", "Echo", "Gorilla", "Buffalo"
+    ],
+
+    # 数据库技术
+    "databases": [
+        "MySQL", "PostgreSQL", "Oracle", "SQL Server", "SQLite", "MariaDB",
+        "MongoDB", "Redis", "Cassandra", "CouchDB", "Neo4j", "Elasticsearch",
+        "InfluxDB", "TimescaleDB", "ClickHouse", "BigQuery", "Snowflake",
+        "DynamoDB", "Firebase", "Supabase", "PlanetScale", "CockroachDB"
+    ],
+
+    # 云服务和DevOps
+    "cloud_devops": [
+        "AWS", "Azure", "GCP", "阿里云", "腾讯云", "华为云", "百度云",
+        "Docker", "Kubernetes", "Jenkins", "GitLab CI", "GitHub Actions",
+        "Terraform", "Ansible", "Chef", "Puppet", "SaltStack",
+        "Prometheus", "Grafana", "ELK Stack", "Splunk", "Datadog",
+        "Istio", "Linkerd", "Helm", "ArgoCD", "Tekton"
+    ],
+
+    # 移动开发
+    "mobile_development": [
+        "React Native", "Flutter", "Xamarin", "Ionic", "Cordova", "PhoneGap",
+        "Android Studio", "Xcode", "Unity", "Unreal Engine", "Godot",
+        "iOS开发", "Android开发", "跨平台开发", "原生开发", "混合开发"
+    ],
+
+    # AI和机器学习
+    "ai_ml": [
+        "机器学习", "深度学习", "人工智能", "神经网络", "计算机视觉", "自然语言处理",
+        "TensorFlow", "PyTorch", "Keras", "Scikit-learn", "OpenCV", "NLTK",
+        "Pandas", "NumPy", "Matplotlib", "Seaborn", "Plotly", "Jupyter",
+        "Hugging Face", "Transformers", "BERT", "GPT", "LLM", "大语言模型",
+        "数据分析", "数据挖掘", "数据可视化", "统计学习", "强化学习"
+    ],
+
+    # 大数据技术
+    "big_data": [
+        "Hadoop", "Spark", "Kafka", "Storm", "Flink", "Hive", "Pig", "HBase",
+        "大数据", "数据仓库", "ETL", "数据湖", "实时计算", "批处理",
+        "Apache Airflow", "Apache Beam", "Apache NiFi", "DataX", "MaxCompute"
+    ],
+
+    # 测试和质量保证
+    "testing_qa": [
+        "单元测试", "集成测试", "端到端测试", "性能测试", "安全测试", "自动化测试",
+        "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright", "TestCafe",
+        "JUnit", "TestNG", "Mockito", "PowerMock", "Jest", "Enzyme", "Testing Library"
+    ],
+
+    # 安全技术
+    "security": [
+        "网络安全", "信息安全", "数据安全", "应用安全", "云安全", "安全审计",
+        "渗透测试", "漏洞扫描", "安全编码", "加密算法", "身份认证", "权限管理",
+        "OWASP", "NIST", "ISO27001", "SOC2", "PCI DSS", "GDPR", "数据保护"
+    ],
+
+    # 产品和管理
+    "product_management": [
+        "产品经理", "项目管理", "敏捷开发", "Scrum", "Kanban", "看板管理",
+        "用户研究", "用户体验", "产品设计", "需求分析", "原型设计",
+        "Jira", "Confluence", "Trello", "Asana", "Notion", "Figma", "Sketch"
+    ],
+
+    # 软技能
+    "soft_skills": [
+        "沟通能力", "团队协作", "领导力", "学习能力", "解决问题", "创新思维",
+        "项目管理", "时间管理", "压力管理", "客户服务", "演讲能力", "写作能力",
+        "英语", "日语", "韩语", "法语", "德语", "西班牙语", "多语言"
+    ],
+
+    # 行业特定技能
+    "industry_specific": [
+        # 金融科技
+        "金融科技", "区块链", "数字货币", "支付系统", "风控", "反欺诈",
+        "量化交易", "算法交易", "高频交易", "金融建模", "风险管理",
+
+        # 电商
+        "电商", "零售", "供应链", "库存管理", "订单处理", "支付网关",
+        "推荐系统", "搜索引擎", "商品管理", "营销自动化",
+
+        # 游戏开发
+        "游戏开发", "游戏引擎", "游戏设计", "3D建模", "动画制作", "音效设计",
+        "游戏策划", "关卡设计", "用户界面设计", "游戏测试",
+
+        # 医疗健康
+        "医疗信息化", "健康管理", "医疗数据", "远程医疗", "医疗设备", "药物研发",
+        "临床试验", "医疗影像", "电子病历", "健康监测",
+
+        # 教育科技
+        "在线教育", "教育技术", "学习管理系统", "课程设计", "学习分析", "智能辅导",
+        "虚拟现实", "增强现实", "混合现实", "沉浸式学习",
+
+        # 汽车科技
+        "自动驾驶", "车联网", "智能汽车", "新能源汽车", "汽车电子", "车载系统",
+        "ADAS", "V2X", "汽车软件", "车载娱乐系统",
+
+        # 物联网
+        "物联网", "IoT", "传感器", "嵌入式开发", "边缘计算", "智能硬件",
+        "工业4.0", "智能制造", "智慧城市", "智能家居"
+    ],
+
+    # 设计技能
+    "design_skills": [
+        "UI设计", "UX设计", "平面设计", "视觉设计", "交互设计", "产品设计",
+        "Adobe Photoshop", "Adobe Illustrator", "Adobe XD", "Figma", "Sketch",
+        "InVision", "Principle", "Framer", "Protopie", "Origami Studio",
+        "用户研究", "可用性测试", "信息架构", "设计系统", "品牌设计"
+    ],
+
+    # 营销和运营
+    "marketing_operations": [
+        "数字营销", "社交媒体营销", "内容营销", "搜索引擎优化", "搜索引擎营销",
+        "Google Analytics", "Facebook Ads", "Google Ads", "微信营销", "抖音营销",
+        "用户增长", "用户运营", "社群运营", "活动策划", "品牌推广",
+        "数据分析", "A/B测试", "转化率优化", "用户画像", "精准营销"
+    ]
+}
+
+# 技能别名/同义词：{词库中的标准名称: [别名, ...]}，匹配到别名时返回标准名称
+SKILL_ALIASES = {
+    "JavaScript": ["JS"],
+    "TypeScript": ["TS"],
+    "C++": ["CPP"],
+    "C#": ["CSharp"],
+    "Go": ["Golang", "Go语言"],
+    "R": ["R语言"],
+    "React": ["ReactJS", "React.js"],
+    "Vue": ["VueJS", "Vue.js"],
+    "Angular": ["AngularJS"],
+    "Next.js": ["NextJS"],
+    "Nuxt.js": ["NuxtJS"],
+    "Nest.js": ["NestJS"],
+    "Koa.js": ["Koa"],
+    "Spring Boot": ["SpringBoot"],
+    "ASP.NET Core": [".NET Core"],
+    "PostgreSQL": ["Postgres", "PgSQL"],
+    "MongoDB": ["Mongo"],
+    "Elasticsearch": ["Elastic Search"],
+    "AWS": ["Amazon Web Services", "亚马逊云"],
+    "Azure": ["微软云"],
+    "GCP": ["Google Cloud", "谷歌云"],
+    "阿里云": ["Aliyun", "Alibaba Cloud"],
+    "腾讯云": ["Tencent Cloud"],
+    "华为云": ["Huawei Cloud"],
+    "Kubernetes": ["K8s"],
+    "ELK Stack": ["ELK"],
+    "Apache Airflow": ["Airflow"],
+    "Apache NiFi": ["NiFi"],
+    "Scikit-learn": ["sklearn"],
+    "Hugging Face": ["HuggingFace"],
+    "机器学习": ["Machine Learning", "ML"],
+    "深度学习": ["Deep Learning"],
+    "人工智能": ["Artificial Intelligence", "AI"],
+    "神经网络": ["Neural Network"],
+    "计算机视觉": ["Computer Vision"],
+    "自然语言处理": ["Natural Language Processing", "NLP"],
+    "强化学习": ["Reinforcement Learning"],
+    "大语言模型": ["大模型", "Large Language Model"],
+    "数据分析": ["Data Analysis"],
+    "数据挖掘": ["Data Mining"],
+    "数据仓库": ["数仓", "Data Warehouse"],
+    "大数据": ["Big Data"],
+    "单元测试": ["Unit Test", "Unit Testing"],
+    "性能测试": ["压力测试", "压测"],
+    "自动化测试": ["Test Automation"],
+    "敏捷开发": ["Agile"],
+    "项目管理": ["PMP"],
+    "产品经理": ["Product Manager"],
+    "用户体验": ["UX"],
+    "虚拟现实": ["VR"],
+    "增强现实": ["AR"],
+    "物联网": ["IoT"],
+    "搜索引擎优化": ["SEO"],
+    "搜索引擎营销": ["SEM"],
+    "A/B测试": ["AB测试", "A/B Testing"],
+    "英语": ["English", "CET-4", "CET-6", "IELTS", "TOEFL", "雅思", "托福"],
+    "日语": ["Japanese", "JLPT"],
+    "团队协作": ["团队合作", "Teamwork"],
+    "沟通能力": ["Communication"],
+}
+
+# 切分为英文字母串、数字串和单个其他字符（中文、符号），空白丢弃；
+# 自动机在这些片段上匹配，英文技能名天然按单词边界命中，字母后紧跟的版本号（Python3、Vue3）单独成段
+_TOKEN_PATTERN = re.compile(r"[a-z]+|[0-9]+|[^\sa-z0-9]")
+
+def tokenize_for_matching(text: str) -> List[str]:
+    """匹配前的归一化与切分：全角转半角、转小写后切分"""
+    return _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower())
+
+class SkillMatcher:
+    """
+    基于Aho-Corasick自动机的技能匹配器
+    
+    - 英文技能名按单词边界匹配：R、Go不会再命中"Docker"、"MongoDB"，Java不会命中JavaScript，
+      但技能名后紧跟版本号（Python3、Vue3）仍然算命中
+    - 中文没有单词边界，每个汉字单独成段，中文技能名相当于按子串匹配
+    - 技能名中的空白不参与匹配（"Spring  Boot"与"Spring Boot"相同）
+    - 别名匹配后归并为标准名称
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Dict[str, Iterable[str]] = None):
+        self.skills: List[str] = list(dict.fromkeys(skills))
+        self._skill_index = {skill: index for index, skill in enumerate(self.skills)}
+        # 自动机节点：转移表、失败指针、在该节点结束的技能序号
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[list] = [[]]
+
+        for skill in self.skills:
+            self._add_pattern(skill, self._skill_index[skill])
+        for canonical, names in (aliases or {}).items():
+            if canonical not in self._skill_index:
+                raise ValueError(f"技能别名的标准名称不在词库中: {canonical}")
+            for name in names:
+                self._add_pattern(name, self._skill_index[canonical])
+        self._build_failure_links()
+
+    def _add_pattern(self, term: str, skill_id: int):
+        state = 0
+        for token in tokenize_for_matching(term):
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if skill_id not in self._output[state]:
+            self._output[state].append(skill_id)
+
+    def _build_failure_links(self):
+        """按广度优先计算失败指针，并把失败指针链上的输出合并到每个节点"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(token, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+                queue.append(next_state)
+        # 没有输出的节点记为None，扫描时少一次列表判断
+        self._output = [tuple(dict.fromkeys(entries)) or None for entries in self._output]
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """扫描文本，每命中一次返回一个技能序号（同一技能出现多次则返回多次）"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokenize_for_matching(text):
+            next_state = goto[state].get(token)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(token)
+            state = next_state or 0
+            if output[state] is not None:
+                yield from output[state]
+
+    def skill_ids(self, text: str) -> Set[int]:
+        """文本中出现的技能序号集合"""
+        return set(self.iter_matches(text or ""))
+
+    def extract(self, text: str) -> List[str]:
+        """文本中出现的技能标准名称（按词库顺序去重）"""
+        return [self.skills[skill_id] for skill_id in sorted(self.skill_ids(text))]
+
+# 模块加载时编译一次，供简历与职位描述共用
+skill_matcher = SkillMatcher(
+    (skill for skills in SKILL_KEYWORDS.values() for skill in skills),
+    SKILL_ALIASES
+)
+
+def extract_skills(text: str) -> List[str]:
+    """从文本中提取技能关键词（按词库顺序去重）"""
+    return skill_matcher.extract(text)
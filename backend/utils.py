@@ -3,11 +3,17 @@
 """
 import os
 import uuid
+import asyncio
+import json
+import base64
+import hashlib
+import zipfile
+import aiofiles
 import PyPDF2
 import docx
-from typing import Optional
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Set, Tuple
 from fastapi import UploadFile
-from config import UPLOAD_DIR, MAX_FILE_SIZE, ALLOWED_EXTENSIONS
+from config import UPLOAD_DIR, MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE, ALLOWED_EXTENSIONS
 
 def generate_unique_filename(original_filename: str) -> str:
     """生成唯一文件名"""
@@ -28,48 +34,133 @@ def validate_file(file: UploadFile) -> tuple[bool, str]:
     
     return True, "文件验证通过"
 
-def save_uploaded_file(file: UploadFile, filename: str) -> str:
-    """保存上传的文件"""
+class FileTooLargeError(Exception):
+    """上传文件超过大小限制"""
+
+async def save_uploaded_file(file: UploadFile, filename: str) -> Tuple[str, int, str]:
+    """分块流式保存上传文件，边写边计算SHA-256，超过大小限制时立即中止并删除已写入部分
+    
+    返回 (文件路径, 文件大小, SHA-256十六进制摘要)
+    """
     file_path = os.path.join(UPLOAD_DIR, filename)
+    hasher = hashlib.sha256()
+    size = 0
+    
+    try:
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                # file.size可能缺失（如分块传输），以实际写入字节数为准
+                if size > MAX_FILE_SIZE:
+                    raise FileTooLargeError(f"文件大小超过限制({MAX_FILE_SIZE / 1024 / 1024:.1f}MB)")
+                hasher.update(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
     
-    with open(file_path, "wb") as buffer:
-        content = file.file.read()
-        buffer.write(content)
+    return file_path, size, hasher.hexdigest()
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    """还原ZIP成员文件名：未标记UTF-8时Python按cp437解码，Windows下打包的中文文件名多为GBK"""
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+def save_zip_resumes(fileobj, max_files: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """逐个成员流式解压ZIP中的简历文件，边写边计算SHA-256并限制单个文件大小
     
-    return file_path
+    返回 (已保存文件列表, 被拒绝文件列表)，已保存文件包含file_name/file_path/content_hash
+    """
+    saved, rejected = [], []
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise ValueError("ZIP文件已损坏或格式不正确")
+    
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(_zip_member_name(info))
+            # 跳过目录、macOS元数据和隐藏文件
+            if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            if os.path.splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+                rejected.append({"file_name": name, "reason": "不支持的文件格式"})
+                continue
+            if len(saved) >= max_files:
+                rejected.append({"file_name": name, "reason": f"超过单次上传数量限制({max_files})"})
+                continue
+            
+            file_path = os.path.join(UPLOAD_DIR, generate_unique_filename(name))
+            hasher = hashlib.sha256()
+            size = 0
+            try:
+                with archive.open(info) as source, open(file_path, "wb") as target:
+                    while True:
+                        chunk = source.read(UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        # 以实际解压字节数为准，防止声明大小与内容不符的压缩包
+                        if size > MAX_FILE_SIZE:
+                            raise FileTooLargeError(f"文件大小超过限制({MAX_FILE_SIZE / 1024 / 1024:.1f}MB)")
+                        hasher.update(chunk)
+                        target.write(chunk)
+            except Exception as e:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                rejected.append({"file_name": name, "reason": str(e)})
+                continue
+            
+            saved.append({"file_name": name, "file_path": file_path, "content_hash": hasher.hexdigest()})
+    
+    return saved, rejected
+
+def iter_pdf_text(pdf_reader) -> Iterator[str]:
+    """逐页生成PDF文本"""
+    for page in pdf_reader.pages:
+        yield page.extract_text() or ""
 
 def extract_text_from_pdf(file_path: str) -> str:
     """从PDF文件提取文本"""
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
-            
-            return text.strip()
+            # 各页文本只在最后拼接一次，页之间换行避免单词粘连
+            return "\n".join(iter_pdf_text(pdf_reader)).strip()
     except Exception as e:
         raise Exception(f"PDF文件解析失败: {str(e)}")
 
+def iter_docx_text(doc) -> Iterator[str]:
+    """逐段落、逐表格行生成DOCX文本"""
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+    
+    # 提取表格内容
+    for table in doc.tables:
+        # 合并单元格在row.cells中会按所占网格重复出现（纵向合并跨行重复），每个单元格只输出一次
+        seen_cells = set()
+        for row in table.rows:
+            cell_texts = []
+            for cell in row.cells:
+                if cell._tc in seen_cells:
+                    continue
+                seen_cells.add(cell._tc)
+                cell_texts.append(cell.text)
+            yield " ".join(cell_texts)
+
 def extract_text_from_docx(file_path: str) -> str:
     """从DOCX文件提取文本"""
     try:
         doc = docx.Document(file_path)
-        text = ""
-        
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        
-        # 提取表格内容
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text + " "
-                text += "\n"
-        
-        return text.strip()
+        return "\n".join(iter_docx_text(doc)).strip()
     except Exception as e:
         raise Exception(f"DOCX文件解析失败: {str(e)}")
 
@@ -98,6 +189,12 @@ def clean_text(text: str) -> str:
     
     return text.strip()
 
+def normalized_text_hash(text: str) -> str:
+    """归一化文本（小写、去除空白与标点）后的SHA-256，用于识别内容相同但文件不同的近似重复简历"""
+    import re
+    normalized = re.sub(r'[\W_]+', '', text.lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
 def calculate_match_score(skills_analysis: dict, experience_analysis: dict, education_analysis: dict) -> float:
     """计算综合匹配度评分"""
     # 技能匹配权重：40%
@@ -151,3 +248,38 @@ def get_file_size_mb(file_path: str) -> float:
     
     size_bytes = os.path.getsize(file_path)
     return round(size_bytes / 1024 / 1024, 2)
+
+def encode_cursor(values: list) -> str:
+    """将分页游标（排序值+ID）编码为URL安全的字符串"""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """解码分页游标，格式错误时抛出ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("无效的分页游标")
+    return values
+
+# 后台任务的强引用：事件循环只持有任务的弱引用，不保存的话任务可能在完成前被垃圾回收
+_background_tasks: Set[asyncio.Task] = set()
+
+def _on_background_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        print(f"后台任务失败: {task.get_name()}, {type(exc).__name__}: {exc}")
+
+def run_in_background(awaitable: Awaitable[Any], name: str) -> asyncio.Task:
+    """在事件循环中启动后台任务，持有引用直到完成，失败时输出日志"""
+    task = asyncio.ensure_future(awaitable)
+    task.set_name(name)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
@@ -0,0 +1,395 @@
+"""
+简历向量索引（语义检索）
+
+每份简历在文本就绪后计算一次本地向量，不依赖外部服务：
+- 分词与预筛选、全文检索一致（英文按词，中文按相邻二字），另外加入技能匹配器识别出的标准技能，
+  使"Golang"与"Go"、"K8s"与"Kubernetes"等别名落在同一特征上
+- 对数词频乘以IDF后，用带符号的特征哈希投影到固定维度（近似保持余弦相似度），再做L2归一化
+- 文档频率按词的哈希桶累计，新简历使用写入时的IDF；文档数比上次全量构建翻倍后，启动时全量重建
+
+向量以float32矩阵存放在内存映射文件中，候选人ID存放在对应的int64文件中，删除的行置零后复用。
+检索时对整个矩阵做一次矩阵-向量乘法得到余弦相似度，用argpartition取出候选后，
+再读取这些简历的文本按精确TF-IDF余弦重新排序（消除哈希冲突带来的噪声）。
+索引内容随Candidate的ORM变更在事务提交后更新，应用启动时与数据库对账。
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from database import SessionLocal
+from models import Candidate
+from prescreen import tokenize
+from skills import skill_matcher
+from config import VECTOR_INDEX_DIR, VECTOR_DIM, VECTOR_RERANK_CANDIDATES
+
+HASH_BUCKETS = 1 << 20  # 文档频率哈希桶数
+INDEX_VERSION = 1
+MIN_CAPACITY = 1024
+# 文档数超过上次全量构建时的倍数后重建，使早期写入的向量使用更新后的IDF
+REBUILD_GROWTH = 2.0
+REBUILD_MIN_DOCUMENTS = 200
+INDEXED_ATTRIBUTES = ("resume_content", "duplicate_of")
+
+@lru_cache(maxsize=1 << 18)
+def _hash_feature(feature: str) -> Tuple[int, int, float]:
+    """特征的 (文档频率桶, 维度哈希, 符号)，使用稳定哈希保证跨进程一致"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value & (HASH_BUCKETS - 1), (value >> 32) & 0x7FFFFFFF, 1.0 if value >> 63 else -1.0
+
+def extract_features(text: str) -> Counter:
+    """简历或职位描述的特征词频：分词结果加上识别出的标准技能"""
+    text = text or ""
+    features = Counter(tokenize(text))
+    for skill_id in skill_matcher.skill_ids(text):
+        features[f"skill:{skill_id}"] += 1
+    return features
+
+def _feature_arrays(features: Counter, dim: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    hashed = [_hash_feature(feature) for feature in features]
+    buckets = np.fromiter((item[0] for item in hashed), dtype=np.int64, count=len(hashed))
+    dims = np.fromiter((item[1] for item in hashed), dtype=np.int64, count=len(hashed)) % dim
+    signs = np.fromiter((item[2] for item in hashed), dtype=np.float32, count=len(hashed))
+    counts = np.fromiter(features.values(), dtype=np.float32, count=len(hashed))
+    return buckets, dims, signs, counts
+
+def indexable_text(candidate) -> Optional[str]:
+    """需要建立向量的简历文本：重复简历和解析失败的简历不进入索引"""
+    content = candidate.resume_content
+    if candidate.duplicate_of is not None or not content or content.startswith("文件解析失败"):
+        return None
+    return content
+
+class VectorIndex:
+    """基于内存映射文件的简历向量索引（线程安全）"""
+
+    def __init__(self, path: str, dim: int = VECTOR_DIM):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._pending: Dict[int, Optional[str]] = {}
+        os.makedirs(path, exist_ok=True)
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self):
+        """打开索引文件，版本或维度不一致时清空重建"""
+        meta = {}
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION or meta.get("dim") != self.dim:
+            for name in ("vectors.f32", "ids.i64", "df.i32"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            meta = {"version": INDEX_VERSION, "dim": self.dim, "documents": 0, "built_documents": 0}
+        self._meta = meta
+
+        if not os.path.exists(self._file("df.i32")):
+            np.zeros(HASH_BUCKETS, dtype=np.int32).tofile(self._file("df.i32"))
+        self._df = np.memmap(self._file("df.i32"), dtype=np.int32, mode="r+", shape=(HASH_BUCKETS,))
+
+        if not os.path.exists(self._file("ids.i64")):
+            self._resize_files(MIN_CAPACITY)
+        self._map_rows()
+        self._save_meta()
+
+    def _resize_files(self, capacity: int):
+        """扩展（或创建）向量与ID文件，新增部分为零即空行"""
+        for name, row_bytes in (("vectors.f32", self.dim * 4), ("ids.i64", 8)):
+            with open(self._file(name), "ab") as f:
+                f.truncate(capacity * row_bytes)
+
+    def _map_rows(self):
+        capacity = os.path.getsize(self._file("ids.i64")) // 8
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        used = np.flatnonzero(self._ids)
+        self._rows = {int(self._ids[row]): int(row) for row in used}
+        self._used = int(used[-1]) + 1 if len(used) else 0
+        self._free = [int(row) for row in np.flatnonzero(self._ids[:self._used] == 0)]
+
+    def _save_meta(self):
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self._meta, f)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def candidate_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._rows)
+
+    def needs_rebuild(self, documents: int) -> bool:
+        """索引为空或文档数相对上次全量构建明显增长时需要重建"""
+        built = self._meta.get("built_documents", 0)
+        if documents == 0:
+            return False
+        if not built:
+            return True
+        return documents >= REBUILD_MIN_DOCUMENTS and documents > built * REBUILD_GROWTH
+
+    def _tfidf(self, features: Counter, df: np.ndarray, documents: int, known_only: bool = False):
+        """特征的TF-IDF权重，返回 (特征名, 向量维度, 符号, 权重)"""
+        names = list(features)
+        buckets, dims, signs, counts = _feature_arrays(features, self.dim)
+        if known_only:
+            # 库中没有出现过的词不可能命中任何简历，IDF却最高，保留只会放大哈希冲突带来的噪声
+            known = df[buckets] > 0
+            names = [name for name, keep in zip(names, known) if keep]
+            buckets, dims, signs, counts = buckets[known], dims[known], signs[known], counts[known]
+        idf = np.log((documents + 1) / (df[buckets] + 1)) + 1
+        return names, dims, signs, (1 + np.log(counts)) * idf
+
+    def _embed(self, features: Counter, df: np.ndarray, documents: int, known_only: bool = False) -> np.ndarray:
+        _, dims, signs, weights = self._tfidf(features, df, documents, known_only)
+        vector = np.bincount(dims, weights=weights * signs, minlength=self.dim).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed(self, text: str, known_only: bool = False) -> np.ndarray:
+        """按当前文档频率计算文本向量（L2归一化），known_only时只保留库中出现过的特征"""
+        return self._embed(extract_features(text), self._df, self._meta["documents"], known_only)
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._used >= len(self._ids):
+            self._vectors.flush()
+            self._ids.flush()
+            self._resize_files(max(MIN_CAPACITY, len(self._ids) * 2))
+            self._map_rows()
+        self._used += 1
+        return self._used - 1
+
+    def _upsert(self, candidate_id: int, text: str):
+        features = extract_features(text)
+        row = self._rows.get(candidate_id)
+        if row is None:
+            # 文档频率只在新增文档时累计，删除和更新不回退，全量重建时校正
+            buckets = np.unique(_feature_arrays(features, self.dim)[0])
+            self._df[buckets] += 1
+            self._meta["documents"] += 1
+            row = self._allocate_row()
+            self._rows[candidate_id] = row
+            self._ids[row] = candidate_id
+        self._vectors[row] = self._embed(features, self._df, self._meta["documents"])
+
+    def _remove(self, candidate_id: int):
+        row = self._rows.pop(candidate_id, None)
+        if row is None:
+            return
+        self._ids[row] = 0
+        self._vectors[row] = 0
+        self._free.append(row)
+
+    def apply(self, changes: Dict[int, Optional[str]]):
+        """批量更新索引：{候选人ID: 简历文本}，文本为None表示从索引中移除"""
+        if not changes:
+            return
+        with self._lock:
+            if self._rebuilding:
+                self._pending.update(changes)
+            for candidate_id, text in changes.items():
+                if text:
+                    self._upsert(candidate_id, text)
+                else:
+                    self._remove(candidate_id)
+            self._flush()
+
+    def _flush(self):
+        self._vectors.flush()
+        self._ids.flush()
+        self._df.flush()
+        self._save_meta()
+
+    def rebuild(self, load_items: Callable[[], Iterable[Tuple[int, str]]]) -> int:
+        """全量重建：第一遍统计文档频率，第二遍写入向量，完成后替换索引文件
+
+        load_items每次调用返回一个新的 (候选人ID, 简历文本) 迭代器。重建期间的增量变更在替换后重新应用。
+        """
+        with self._lock:
+            self._rebuilding = True
+            self._pending = {}
+        try:
+            df = np.zeros(HASH_BUCKETS, dtype=np.int32)
+            documents = 0
+            for _, text in load_items():
+                df[np.unique(_feature_arrays(extract_features(text), self.dim)[0])] += 1
+                documents += 1
+
+            capacity = max(MIN_CAPACITY, 1 << math.ceil(math.log2(max(documents, 1))))
+            vectors = np.memmap(self._file("vectors.f32.tmp"), dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+            ids = np.memmap(self._file("ids.i64.tmp"), dtype=np.int64, mode="w+", shape=(capacity,))
+            row = 0
+            for candidate_id, text in load_items():
+                if row >= documents:
+                    break
+                vectors[row] = self._embed(extract_features(text), df, documents)
+                ids[row] = candidate_id
+                row += 1
+            vectors.flush()
+            ids.flush()
+            del vectors, ids
+            df.tofile(self._file("df.i32.tmp"))
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+            raise
+
+        with self._lock:
+            for name in ("vectors.f32", "ids.i64", "df.i32"):
+                os.replace(self._file(f"{name}.tmp"), self._file(name))
+            self._meta.update({"documents": documents, "built_documents": documents})
+            self._df = np.memmap(self._file("df.i32"), dtype=np.int32, mode="r+", shape=(HASH_BUCKETS,))
+            self._map_rows()
+            self._rebuilding = False
+            pending, self._pending = self._pending, {}
+            for candidate_id, text in pending.items():
+                if text:
+                    self._upsert(candidate_id, text)
+                else:
+                    self._remove(candidate_id)
+            self._flush()
+        return row
+
+    def _exact_scores(self, text: str, documents: Dict[int, str]) -> Dict[int, float]:
+        """按未经哈希投影的TF-IDF精确计算余弦相似度"""
+        names, _, _, weights = self._tfidf(extract_features(text), self._df, self._meta["documents"], known_only=True)
+        norm = np.linalg.norm(weights)
+        if not norm:
+            return {candidate_id: 0.0 for candidate_id in documents}
+        query = dict(zip(names, weights / norm))
+        scores = {}
+        for candidate_id, document in documents.items():
+            names, _, _, weights = self._tfidf(extract_features(document), self._df, self._meta["documents"])
+            norm = np.linalg.norm(weights)
+            scores[candidate_id] = float(sum(
+                query[name] * weight for name, weight in zip(names, weights) if name in query
+            ) / norm) if norm else 0.0
+        return scores
+
+    def search(self, text: str, limit: int = 20,
+               load_texts: Optional[Callable[[List[int]], Dict[int, str]]] = None,
+               rerank: int = VECTOR_RERANK_CANDIDATES) -> List[Tuple[int, float]]:
+        """返回与文本余弦相似度最高的 [(候选人ID, 相似度)]
+
+        哈希投影的相似度带有冲突噪声，库越大排在最前面的越容易是噪声；提供load_texts时先按向量取rerank个
+        候选，再读取其简历文本按精确TF-IDF余弦重新排序。
+        """
+        shortlist = max(limit, rerank) if load_texts else limit
+        with self._lock:
+            query = self.embed(text, known_only=True)
+            vectors, ids = self._vectors[:self._used], self._ids[:self._used]
+            if not self._rows or not query.any():
+                return []
+            scores = vectors @ query
+            scores[ids == 0] = -np.inf
+            k = min(shortlist, len(self._rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            hits = [(int(ids[row]), float(scores[row])) for row in top]
+
+        if load_texts is None:
+            return hits
+        exact = self._exact_scores(text, load_texts([candidate_id for candidate_id, _ in hits]))
+        return sorted(exact.items(), key=lambda item: -item[1])[:limit]
+
+_vector_index: Optional[VectorIndex] = None
+_vector_index_lock = threading.Lock()
+
+def get_vector_index() -> VectorIndex:
+    """获取进程内共享的向量索引"""
+    global _vector_index
+    if _vector_index is None:
+        with _vector_index_lock:
+            if _vector_index is None:
+                _vector_index = VectorIndex(VECTOR_INDEX_DIR)
+    return _vector_index
+
+def _record_change(target: Candidate, text: Optional[str]):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("vector_changes", {})[target.id] = text
+
+@event.listens_for(Candidate, "after_insert")
+def _vector_after_insert(mapper, connection, target):
+    text = indexable_text(target)
+    if text:
+        _record_change(target, text)
+
+@event.listens_for(Candidate, "after_update")
+def _vector_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in INDEXED_ATTRIBUTES):
+        _record_change(target, indexable_text(target))
+
+@event.listens_for(Candidate, "after_delete")
+def _vector_after_delete(mapper, connection, target):
+    _record_change(target, None)
+
+@event.listens_for(Session, "after_commit")
+def _apply_vector_changes(session):
+    changes = session.info.pop("vector_changes", None)
+    if changes:
+        try:
+            get_vector_index().apply(changes)
+        except Exception as e:
+            print(f"⚠️ 更新简历向量索引失败（启动时会重新对账）: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_vector_changes(session):
+    session.info.pop("vector_changes", None)
+
+def _load_indexable(batch_size: int = 500, candidate_ids: Optional[List[int]] = None) -> Iterable[Tuple[int, str]]:
+    db = SessionLocal()
+    try:
+        query = db.query(Candidate.id, Candidate.resume_content, Candidate.duplicate_of).filter(
+            Candidate.duplicate_of.is_(None),
+            Candidate.resume_content.isnot(None)
+        )
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(candidate_ids))
+        for row in query.order_by(Candidate.id).yield_per(batch_size):
+            text = indexable_text(row)
+            if text:
+                yield row.id, text
+    finally:
+        db.close()
+
+def sync_vector_index() -> int:
+    """与数据库对账：补齐缺失的向量、移除已删除的候选人，必要时全量重建，返回变更数"""
+    index = get_vector_index()
+    db = SessionLocal()
+    try:
+        expected = {row.id for row in db.query(Candidate.id).filter(
+            Candidate.duplicate_of.is_(None),
+            Candidate.resume_content.isnot(None),
+            ~Candidate.resume_content.startswith("文件解析失败")
+        )}
+    finally:
+        db.close()
+
+    if index.needs_rebuild(len(expected)):
+        count = index.rebuild(_load_indexable)
+        print(f"🧭 简历向量索引已重建: {count} 份")
+        return count
+
+    indexed = set(index.candidate_ids())
+    changes: Dict[int, Optional[str]] = {candidate_id: None for candidate_id in indexed - expected}
+    missing = sorted(expected - indexed)
+    for start in range(0, len(missing), 500):
+        changes.update(_load_indexable(candidate_ids=missing[start:start + 500]))
+    index.apply(changes)
+    if changes:
+        print(f"🧭 简历向量索引对账完成: 更新 {len(changes)} 份")
+    return len(changes)
@@ -68,6 +68,17 @@ export const apiService = {
     })
   },
 
+  // 批量上传（多个简历文件或ZIP压缩包）
+  uploadBatch: (files) => {
+    const formData = new FormData()
+    files.forEach(file => formData.append('files', file))
+    return longTimeoutApi.post('/upload/batch', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data'
+      }
+    })
+  },
+
   // 获取文件信息
   getFileInfo: (fileId) => {
     return api.get(`/file/${fileId}`)
@@ -78,14 +89,19 @@ export const apiService = {
     return api.delete(`/file/${fileId}`)
   },
 
-  // 获取文件列表
-  getFileList: () => {
-    return api.get('/files')
+  // 获取文件列表（游标分页）
+  getFileList: (params = {}) => {
+    return api.get('/files', { params })
   },
 
-  // 处理分析
+  // 提交分析任务（立即返回任务ID）
   processAnalysis: (data) => {
-    return longTimeoutApi.post('/process', data)
+    return api.post('/process', data)
+  },
+
+  // 查询分析任务状态
+  getJobStatus: (jobId) => {
+    return api.get(`/jobs/${jobId}`)
   },
 
   // 获取分析历史
@@ -103,6 +119,11 @@ export const apiService = {
     return api.post(`/process/${analysisId}/regenerate`)
   },
 
+  // 流式生成分析报告的SSE地址
+  getReportStreamUrl: (fileId) => {
+    return `/api/process/${fileId}/report-stream`
+  },
+
   // 获取候选人报告
   getCandidateReport: (fileId) => {
     return api.get(`/report/${fileId}`)
@@ -128,9 +149,14 @@ export const apiService = {
     return longTimeoutApi.post(`/process/${analysisId}/generate-questions`)
   },
 
-  // 获取所有报告
-  getAllReports: () => {
-    return api.get('/reports')
+  // 获取报告列表（游标分页，params支持limit/cursor/sort/min_score/max_score等）
+  getAllReports: (params = {}) => {
+    return api.get('/reports', { params })
+  },
+
+  // 获取报告统计概览
+  getReportsStats: () => {
+    return api.get('/reports/stats')
   },
 
   // 导出报告